@@ -1,24 +1,31 @@
 from django.contrib import admin
-from .models import BlogPost, BlogComment, SavedPost
+from .models import BlogPost, BlogComment, SavedPost, BlogTag
 
 @admin.register(BlogPost)
 class BlogPostAdmin(admin.ModelAdmin):
     list_display = ['title', 'author', 'status', 'views', 'created_at']
     list_filter = ['status']
     search_fields = ['title', 'content']
-    readonly_fields = ['views', 'slug', 'readTime']
+    readonly_fields = ['views', 'comment_count', 'slug', 'readTime', 'content_html', 'content_hash']
     prepopulated_fields = {'slug': ('title',)}
 
 @admin.register(BlogComment)
 class BlogCommentAdmin(admin.ModelAdmin):
-    list_display = ['post', 'user', 'content', 'created_at']
+    list_display = ['post', 'user', 'content', 'depth', 'reply_count', 'created_at']
     list_filter = ['post']
     search_fields = ['content']
-    readonly_fields = ['user', 'created_at']
+    readonly_fields = ['user', 'path', 'depth', 'reply_count', 'created_at']
+    raw_id_fields = ['parent']
 
 @admin.register(SavedPost)
 class SavedPostAdmin(admin.ModelAdmin):
     list_display = ['user', 'post', 'saved_at']
     list_filter = ['user']
     search_fields = ['post__title']
-    readonly_fields = ['user', 'saved_at'] 
\ No newline at end of file
+    readonly_fields = ['user', 'saved_at'] 
+
+@admin.register(BlogTag)
+class BlogTagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'post_count']
+    search_fields = ['name']
+    readonly_fields = ['post_count']
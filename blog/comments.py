@@ -0,0 +1,66 @@
+from django.db.models import Count, F
+from .models import BlogPost, BlogComment
+
+# Deepest reply level accepted; the path column holds 11 characters per level
+MAX_COMMENT_DEPTH = 8
+# Sorts after every character a path can contain (digits and '/')
+PATH_END = '~'
+
+def subtree(comment):
+    """A comment and all of its replies, in reading order, as one range over the path index."""
+    return BlogComment.objects.filter(
+        path__gte=comment.path, path__lt=comment.path + PATH_END
+    ).select_related('user').order_by('path')
+
+def post_details(comments):
+    """Title and slug of the posts a page of comments belongs to, in one query."""
+    post_ids = {comment.post_id for comment in comments}
+    return {
+        post['id']: {'title': post['title'], 'slug': post['slug']}
+        for post in BlogPost.objects.filter(id__in=post_ids).values('id', 'title', 'slug')
+    }
+
+def _shift(model, pk, field, delta, cached=None):
+    if pk is None:
+        return
+    model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+    # Keep a cached instance in step so a later full save does not write back a stale count
+    if cached is not None and cached.pk == pk:
+        setattr(cached, field, max(getattr(cached, field) + delta, 0))
+
+def comment_added(comment):
+    cache = comment._state.fields_cache
+    _shift(BlogPost, comment.post_id, 'comment_count', 1, cache.get('post'))
+    _shift(BlogComment, comment.parent_id, 'reply_count', 1, cache.get('parent'))
+
+def comment_removed(comment):
+    cache = comment._state.fields_cache
+    _shift(BlogPost, comment.post_id, 'comment_count', -1, cache.get('post'))
+    _shift(BlogComment, comment.parent_id, 'reply_count', -1, cache.get('parent'))
+
+def rebuild_comment_counts(batch_size=500):
+    """Recount comment_count and reply_count from the comments. Returns how many rows changed."""
+    changed = 0
+    for model, group_field, count_field in (
+        (BlogPost, 'post_id', 'comment_count'),
+        (BlogComment, 'parent_id', 'reply_count'),
+    ):
+        counts = dict(
+            BlogComment.objects.order_by().exclude(**{group_field: None})
+            .values_list(group_field).annotate(count=Count('pk'))
+        )
+        batch = []
+        for item in model.objects.only('pk', count_field).iterator():
+            expected = counts.get(item.pk, 0)
+            if getattr(item, count_field) == expected:
+                continue
+            setattr(item, count_field, expected)
+            batch.append(item)
+            if len(batch) >= batch_size:
+                model.objects.bulk_update(batch, [count_field])
+                changed += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, [count_field])
+            changed += len(batch)
+    return changed
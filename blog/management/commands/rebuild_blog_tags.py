@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from blog.tags import rebuild_tag_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the blog tag index and per-tag post counts from the posts'
+
+    def handle(self, *args, **options):
+        tags = rebuild_tag_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {tags} tags'))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from blog.comments import rebuild_comment_counts
+
+class Command(BaseCommand):
+    help = 'Recount blog post comment counts and comment reply counts from the comments'
+
+    def handle(self, *args, **options):
+        changed = rebuild_comment_counts()
+        self.stdout.write(self.style.SUCCESS(f'Corrected {changed} counters'))
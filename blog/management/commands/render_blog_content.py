@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from blog.models import BlogPost
+
+class Command(BaseCommand):
+    help = 'Render blog post content to HTML for posts whose content changed since the last render'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-render every post, not only changed ones')
+
+    def handle(self, *args, **options):
+        rendered = 0
+        for post in BlogPost.objects.iterator():
+            excerpt = post.excerpt
+            if post.render(force=options['force']) or post.excerpt != excerpt:
+                post.save(update_fields=['content_html', 'content_hash', 'readTime', 'excerpt', 'excerpt_is_auto'])
+                rendered += 1
+        self.stdout.write(self.style.SUCCESS(f'Rendered {rendered} posts'))
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
 from django.utils import timezone
+from .utils import content_hash, render_content, read_time, make_excerpt
 
 User = get_user_model()
 
@@ -16,8 +17,14 @@ class BlogPost(models.Model):
     slug = models.SlugField(unique=True, blank=True)
     excerpt = models.TextField(blank=True)
     content = models.TextField()
+    # Rendered once per distinct content, see BlogPost.render
+    content_html = models.TextField(blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    excerpt_is_auto = models.BooleanField(default=False, editable=False)
     tags = models.JSONField(default=list)
     imageUrl = models.URLField(max_length=500, blank=True)
+    # Responsive variants keyed by original image URL, filled in by uploads.tasks.process_image
+    image_variants = models.JSONField(default=dict, blank=True)
     
     # Author Information
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blog_posts')
@@ -31,7 +38,9 @@ class BlogPost(models.Model):
         default='draft'
     )
     views = models.PositiveIntegerField(default=0)
-    readTime = models.PositiveIntegerField()
+    # Kept in step by the comment signals, see blog.comments
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    readTime = models.PositiveIntegerField(default=1)
     featured = models.BooleanField(default=False)
     
     # Timestamps
@@ -48,11 +57,64 @@ class BlogPost(models.Model):
             self.slug = slugify(self.title)
         if not self.authorName and self.author:
             self.authorName = self.author.get_full_name() or self.author.username
+        self.render()
         super().save(*args, **kwargs)
 
+    def render(self, force=False):
+        """
+        Refresh the rendered HTML and read time when the content differs from
+        what was last rendered, and fill in an excerpt unless the author wrote
+        one. Returns True if the content was re-rendered.
+        """
+        digest = content_hash(self.content)
+        changed = force or digest != self.content_hash
+        if changed:
+            self.content_html = render_content(self.content)
+            self.readTime = read_time(self.content)
+            self.content_hash = digest
+        if not self.excerpt or (changed and self.excerpt_is_auto):
+            self.excerpt = make_excerpt(self.content)
+            self.excerpt_is_auto = True
+        return changed
+
     def __str__(self):
         return self.title
 
+class BlogTag(models.Model):
+    """
+    Tag index for blog posts. ``name`` is the normalized (stripped,
+    lower-case) tag and ``post_count`` the number of published posts using it.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    post_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-post_count', 'name']
+        indexes = [
+            models.Index(fields=['post_count']),
+        ]
+
+    @staticmethod
+    def normalize(name):
+        return str(name).strip().lower()[:100]
+
+    def __str__(self):
+        return self.name
+
+class BlogPostTag(models.Model):
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(BlogTag, on_delete=models.CASCADE, related_name='post_links')
+
+    class Meta:
+        unique_together = ('tag', 'post')
+        indexes = [
+            models.Index(fields=['tag', 'post']),
+            models.Index(fields=['post']),
+        ]
+
+    def __str__(self):
+        return f"{self.tag_id} -> {self.post_id}"
+
 class BlogComment(models.Model):
     post = models.ForeignKey(
         BlogPost, 
@@ -64,6 +126,18 @@ class BlogComment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments'
     )
+    parent = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='replies'
+    )
+    # Materialized path of zero-padded ids from the root, e.g. "0000000012/0000000040/".
+    # Sorting by path gives a thread in reading order and a subtree is one range.
+    path = models.CharField(max_length=255, blank=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -71,6 +145,20 @@ class BlogComment(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Blog Comment'
         verbose_name_plural = 'Blog Comments'
+        indexes = [
+            models.Index(fields=['post', 'depth', '-created_at']),
+            models.Index(fields=['path']),
+        ]
+
+    def save(self, *args, **kwargs):
+        creating = self._state.adding
+        if creating:
+            self.depth = self.parent.depth + 1 if self.parent_id else 0
+        super().save(*args, **kwargs)
+        if creating:
+            # The path ends in this comment's own id, which only exists after the insert
+            self.path = f"{self.parent.path if self.parent_id else ''}{self.pk:010d}/"
+            BlogComment.objects.filter(pk=self.pk).update(path=self.path)
 
     def __str__(self):
         return f"Comment by {self.user.username} on {self.post.title}"
@@ -95,4 +183,18 @@ class SavedPost(models.Model):
         verbose_name_plural = 'Saved Posts'
 
     def __str__(self):
-        return f"{self.user.username} saved {self.post.title}"
\ No newline at end of file
+        return f"{self.user.username} saved {self.post.title}"
+
+class BlogPostRelated(models.Model):
+    """
+    Precomputed "you may also like" list for one post: neighbour ids,
+    similarity scores and the fields needed to render a card, so serving it
+    is a single primary-key lookup. Rebuilt by core.related.refresh_related.
+    """
+    post = models.OneToOneField(BlogPost, on_delete=models.CASCADE, primary_key=True, related_name='related')
+    signature = models.CharField(max_length=40)
+    neighbors = models.JSONField(default=list, blank=True)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Related to {self.post_id}"
@@ -0,0 +1,15 @@
+from rest_framework.pagination import CursorPagination
+
+class CommentCursorPagination(CursorPagination):
+    """Top-level comments, newest first. A cursor stays stable while new comments arrive."""
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+
+class CommentThreadPagination(CursorPagination):
+    """A comment's subtree in reading order, paged along the materialized path."""
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    ordering = 'path'
@@ -0,0 +1,16 @@
+from core.related import refresh_related
+from core.similarity import document
+from .models import BlogPost, BlogPostRelated
+
+def post_document(post):
+    return document(post.title, post.excerpt, weights=[3, 1],
+                    labels=[f'tag:{tag}' for tag in post.tags or []])
+
+def post_summary(post):
+    return {'title': post.title, 'slug': post.slug, 'excerpt': post.excerpt, 'imageUrl': post.imageUrl}
+
+def refresh_related_posts(full=False):
+    posts = list(BlogPost.objects.filter(status='published').only(
+        'id', 'title', 'slug', 'excerpt', 'tags', 'imageUrl'
+    ).order_by('pk'))
+    return refresh_related(posts, BlogPostRelated, 'post', post_document, post_summary, full=full)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import BlogPost, BlogComment, SavedPost
+from .models import BlogPost, BlogComment, SavedPost, BlogTag
+from .comments import MAX_COMMENT_DEPTH
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
 from django.utils import timezone
@@ -23,14 +24,14 @@ class BlogPostSerializer(serializers.ModelSerializer):
     class Meta:
         model = BlogPost
         fields = [
-            'id', 'title', 'slug', 'excerpt', 'content', 'tags', 'imageUrl',
+            'id', 'title', 'slug', 'excerpt', 'content', 'content_html', 'tags', 'imageUrl', 'image_variants',
             'author', 'author_details', 'authorName', 'authorImage',
-            'status', 'views', 'readTime', 'featured',
+            'status', 'views', 'comment_count', 'readTime', 'featured',
             'created_at', 'updated_at'
         ]
         read_only_fields = [
-            'id', 'slug', 'views', 'author_details',
-            'created_at', 'updated_at'
+            'id', 'slug', 'views', 'comment_count', 'author_details', 'image_variants',
+            'content_html', 'readTime', 'created_at', 'updated_at'
         ]
         extra_kwargs = {
             'author': {'write_only': True, 'required': False},
@@ -38,7 +39,6 @@ class BlogPostSerializer(serializers.ModelSerializer):
             'authorImage': {'required': False, 'allow_null': True},
             'status': {'default': 'draft'},
             'featured': {'default': False},
-            'readTime': {'required': False, 'default': 5}
         }
 
     def create(self, validated_data):
@@ -61,26 +61,76 @@ class BlogPostSerializer(serializers.ModelSerializer):
             if user:
                 validated_data['authorName'] = user.get_full_name() or user.username
         
+        # A hand-written excerpt is kept; an empty one is generated from the content
+        validated_data['excerpt_is_auto'] = not validated_data.get('excerpt')
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
         if 'title' in validated_data:
             validated_data['slug'] = slugify(validated_data['title'])
+        if 'excerpt' in validated_data:
+            validated_data['excerpt_is_auto'] = not validated_data['excerpt']
         return super().update(instance, validated_data)
 
+class BlogPostListSerializer(serializers.ModelSerializer):
+    """Card view of a post for lists: everything but the content body."""
+    author_details = UserSerializer(source='author', read_only=True)
+
+    class Meta:
+        model = BlogPost
+        fields = [
+            'id', 'title', 'slug', 'excerpt', 'tags', 'imageUrl', 'image_variants',
+            'author_details', 'authorName', 'authorImage',
+            'status', 'views', 'readTime', 'featured',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+class BlogTagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BlogTag
+        fields = ['name', 'post_count']
+        read_only_fields = fields
+
 class BlogCommentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     post_details = serializers.SerializerMethodField()
 
     class Meta:
         model = BlogComment
-        fields = ['id', 'post', 'post_details', 'user', 'content', 'created_at']
-        read_only_fields = ['user', 'created_at']
+        fields = [
+            'id', 'post', 'post_details', 'parent', 'depth', 'reply_count',
+            'user', 'content', 'created_at'
+        ]
+        read_only_fields = ['user', 'depth', 'reply_count', 'created_at']
         extra_kwargs = {
-            'post': {'write_only': True}
+            'post': {'write_only': True, 'required': False},
+            'parent': {'required': False, 'allow_null': True}
         }
 
+    def validate(self, attrs):
+        parent = attrs.get('parent')
+        if self.instance is not None:
+            if 'parent' in attrs and parent != self.instance.parent:
+                raise serializers.ValidationError({'parent': 'A reply cannot be moved to another comment.'})
+            return attrs
+        view = self.context.get('view')
+        post_pk = view.kwargs.get('post_pk') if view else None
+        post_id = int(post_pk) if post_pk else getattr(attrs.get('post'), 'pk', None)
+        if post_id is None:
+            raise serializers.ValidationError({'post': 'This field is required.'})
+        if parent is not None:
+            if parent.post_id != post_id:
+                raise serializers.ValidationError({'parent': 'The parent comment belongs to another post.'})
+            if parent.depth + 1 > MAX_COMMENT_DEPTH:
+                raise serializers.ValidationError({'parent': 'Replies cannot be nested any deeper.'})
+        return attrs
+
     def get_post_details(self, obj):
+        # Views put the details of every post on the page in the context up front
+        details = self.context.get('post_details', {})
+        if obj.post_id in details:
+            return details[obj.post_id]
         return {
             'title': obj.post.title,
             'slug': obj.post.slug
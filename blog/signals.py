@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import BlogPost
+from .models import BlogPost, BlogPostTag, BlogComment
+from .comments import comment_added, comment_removed
+from .tags import tag_names, sync_post_tags, refresh_tag_counts
 
 @receiver(post_save, sender=BlogPost)
 def update_published_at(sender, instance, created, **kwargs):
@@ -10,4 +12,37 @@ def update_published_at(sender, instance, created, **kwargs):
     """
     if instance.status == 'published' and not instance.created_at:
         instance.created_at = timezone.now()
-        instance.save(update_fields=['created_at']) 
\ No newline at end of file
+        instance.save(update_fields=['created_at']) 
+
+@receiver(pre_save, sender=BlogPost)
+def snapshot_post_tags(sender, instance, **kwargs):
+    instance._previous_tags = None
+    if not instance._state.adding:
+        instance._previous_tags = BlogPost.objects.filter(pk=instance.pk).values('tags', 'status').first()
+
+@receiver(post_save, sender=BlogPost)
+def update_tag_index(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_tags', None)
+    if created or previous is None:
+        sync_post_tags(instance, status_changed=True)
+        return
+    status_changed = previous['status'] != instance.status
+    if status_changed or tag_names(instance.tags) != tag_names(previous['tags']):
+        sync_post_tags(instance, status_changed=status_changed)
+
+@receiver(pre_delete, sender=BlogPost)
+def remember_post_tags(sender, instance, **kwargs):
+    instance._tag_ids = list(BlogPostTag.objects.filter(post=instance).values_list('tag_id', flat=True))
+
+@receiver(post_delete, sender=BlogPost)
+def update_tag_counts_on_delete(sender, instance, **kwargs):
+    refresh_tag_counts(getattr(instance, '_tag_ids', []))
+
+@receiver(post_save, sender=BlogComment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        comment_added(instance)
+
+@receiver(post_delete, sender=BlogComment)
+def count_deleted_comment(sender, instance, **kwargs):
+    comment_removed(instance)
@@ -0,0 +1,56 @@
+from django.db import transaction
+from .models import BlogPost, BlogTag, BlogPostTag
+
+def tag_names(tags):
+    """Normalized, de-duplicated tag names in their original order."""
+    names = []
+    for tag in tags or []:
+        name = BlogTag.normalize(tag)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def refresh_tag_counts(tag_ids):
+    for tag_id in tag_ids:
+        count = BlogPostTag.objects.filter(tag_id=tag_id, post__status='published').count()
+        BlogTag.objects.filter(pk=tag_id).update(post_count=count)
+
+def sync_post_tags(post, status_changed=False):
+    """
+    Bring a post's rows in the tag index in line with its tags list and
+    recount the tags it gained or lost (all of its tags if its publication
+    status changed).
+    """
+    names = tag_names(post.tags)
+    with transaction.atomic():
+        tags = {tag.name: tag for tag in BlogTag.objects.filter(name__in=names)}
+        for name in names:
+            if name not in tags:
+                tags[name], _ = BlogTag.objects.get_or_create(name=name)
+        wanted = {tag.pk for tag in tags.values()}
+        current = set(BlogPostTag.objects.filter(post=post).values_list('tag_id', flat=True))
+        removed, added = current - wanted, wanted - current
+        if removed:
+            BlogPostTag.objects.filter(post=post, tag_id__in=removed).delete()
+        BlogPostTag.objects.bulk_create([BlogPostTag(post=post, tag_id=tag_id) for tag_id in added])
+        refresh_tag_counts((wanted | removed) if status_changed else (added | removed))
+
+def post_ids_with_tags(names):
+    """Ids of posts carrying every one of the given tags, read from the index."""
+    post_ids = None
+    for name in {normalized for normalized in map(BlogTag.normalize, names) if normalized}:
+        ids = set(BlogPostTag.objects.filter(tag__name=name).values_list('post_id', flat=True))
+        post_ids = ids if post_ids is None else post_ids & ids
+        if not post_ids:
+            return set()
+    return post_ids or set()
+
+def rebuild_tag_index():
+    """Recreate the whole tag index from the posts' tags lists. Returns the number of tags."""
+    with transaction.atomic():
+        BlogPostTag.objects.all().delete()
+        BlogTag.objects.all().delete()
+        for post in BlogPost.objects.only('id', 'tags', 'status').iterator():
+            sync_post_tags(post)
+        refresh_tag_counts(BlogTag.objects.values_list('pk', flat=True))
+    return BlogTag.objects.count()
@@ -53,6 +53,34 @@ class BlogPostTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
 
+    def test_list_omits_content(self):
+        response = self.client.get(reverse('blog:post-list'))
+        self.assertNotIn('content', response.data['results'][0])
+
+    def test_filter_by_tags_uses_index(self):
+        BlogPost.objects.create(
+            title='Other Post', content='Other content', tags=['Travel'],
+            author=self.user, status='published', readTime=1
+        )
+        response = self.client.get(reverse('blog:post-list'), {'tags': 'travel'})
+        self.assertEqual([post['title'] for post in response.data['results']], ['Other Post'])
+        response = self.client.get(reverse('blog:post-list'), {'tags': 'test,blog'})
+        self.assertEqual([post['title'] for post in response.data['results']], ['Test Post'])
+
+    def test_tag_counts_follow_edits(self):
+        response = self.client.get(reverse('blog:post-tags'))
+        self.assertEqual({tag['name']: tag['post_count'] for tag in response.data}, {'test': 1, 'blog': 1})
+        self.post.tags = ['blog']
+        self.post.save()
+        response = self.client.get(reverse('blog:post-tags'))
+        self.assertEqual({tag['name']: tag['post_count'] for tag in response.data}, {'blog': 1})
+
+    def test_list_etag_returns_not_modified(self):
+        url = reverse('blog:post-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
     def test_retrieve_blog_post(self):
         url = reverse('blog:post-detail', args=[self.post.id])
         response = self.client.get(url)
@@ -70,6 +98,14 @@ class BlogPostTests(APITestCase):
         self.post.refresh_from_db()
         self.assertEqual(self.post.title, 'Updated Test Post')
 
+    def test_content_rendered_on_save(self):
+        self.post.content = '<script>alert(1)</script>\n\nSee https://example.com'
+        self.post.save()
+        self.assertNotIn('<script>', self.post.content_html)
+        self.assertIn('rel="nofollow"', self.post.content_html)
+        self.assertEqual(self.post.readTime, 1)
+        self.assertEqual(self.post.excerpt, 'Test excerpt')
+
     def test_delete_blog_post(self):
         url = reverse('blog:post-detail', args=[self.post.id])
         response = self.client.delete(url)
@@ -130,6 +166,27 @@ class BlogCommentTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
 
+    def test_reply_builds_thread_and_counts(self):
+        root = BlogComment.objects.create(post=self.post, user=self.user, content='Root')
+        url = reverse('blog:post-comments', args=[self.post.id])
+        response = self.client.post(url, {'content': 'Reply', 'parent': root.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        reply = BlogComment.objects.get(pk=response.data['id'])
+        self.assertEqual(reply.depth, 1)
+        self.assertTrue(reply.path.startswith(root.path))
+        self.post.refresh_from_db()
+        root.refresh_from_db()
+        self.assertEqual((self.post.comment_count, root.reply_count), (2, 1))
+
+        response = self.client.get(url)
+        self.assertEqual([comment['content'] for comment in response.data['results']], ['Root'])
+        response = self.client.get(reverse('blog:comment-thread', args=[self.post.id, root.id]))
+        self.assertEqual([comment['content'] for comment in response.data['results']], ['Root', 'Reply'])
+
+        root.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
     def test_update_comment(self):
         comment = BlogComment.objects.create(
             post=self.post,
@@ -4,6 +4,7 @@ from .views import (
     BlogPostViewSet, BlogCommentViewSet,
     SavedPostViewSet
 )
+from .pagination import CommentThreadPagination
 
 app_name = 'blog'
 
@@ -32,6 +33,10 @@ urlpatterns = [
         'put': 'update',
         'delete': 'destroy'
     }), name='comment-detail'),
+    # as_view bypasses the router, so the @action pagination_class has to be passed here
+    path('posts/<int:post_pk>/comments/<int:pk>/thread/', BlogCommentViewSet.as_view(
+        {'get': 'thread'}, pagination_class=CommentThreadPagination
+    ), name='comment-thread'),
     path('posts/<int:post_pk>/comments/<int:pk>/report/', BlogCommentViewSet.as_view({'post': 'report'}), name='report-comment'),
     path('posts/<int:post_pk>/comments/<int:pk>/helpful/', BlogCommentViewSet.as_view({'post': 'mark_helpful'}), name='helpful-comment'),
     
@@ -1,2 +1,29 @@
-# This file can be empty or removed since we no longer need any utility functions
-# after removing the category functionality 
\ No newline at end of file
+import hashlib
+import math
+from django.utils.html import strip_tags, urlize, linebreaks
+from django.utils.text import Truncator
+
+WORDS_PER_MINUTE = 200
+EXCERPT_WORDS = 40
+
+def content_hash(content):
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+def render_content(content):
+    """
+    Render post content to HTML that is safe to inject as-is: every tag the
+    author typed is escaped, blank lines become paragraphs, single newlines
+    become <br>, and bare links become rel="nofollow" anchors.
+    """
+    escaped_paragraphs = linebreaks(content or '', autoescape=True)
+    return urlize(escaped_paragraphs, nofollow=True, autoescape=False)
+
+def plain_text(content):
+    return ' '.join(strip_tags(content or '').split())
+
+def read_time(content):
+    """Minutes to read at WORDS_PER_MINUTE, never less than one."""
+    return max(1, math.ceil(len(plain_text(content).split()) / WORDS_PER_MINUTE))
+
+def make_excerpt(content, words=EXCERPT_WORDS):
+    return Truncator(plain_text(content)).words(words, truncate='…')
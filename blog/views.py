@@ -1,13 +1,18 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
-from .models import BlogPost, BlogComment, SavedPost
+from core.conditional import make_etag, queryset_etag, etag_matches, not_modified
+from .models import BlogPost, BlogComment, SavedPost, BlogTag, BlogPostTag, BlogPostRelated
 from .serializers import (
-    BlogPostSerializer, BlogCommentSerializer,
-    SavedPostSerializer
+    BlogPostSerializer, BlogPostListSerializer, BlogCommentSerializer,
+    SavedPostSerializer, BlogTagSerializer
 )
+from .tags import post_ids_with_tags
+from .comments import subtree, post_details
+from .pagination import CommentCursorPagination, CommentThreadPagination
 from django.utils.text import slugify
 from bson import ObjectId
 from drf_yasg.utils import swagger_auto_schema
@@ -19,25 +24,37 @@ class BlogPostViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('author')
         status_param = self.request.query_params.get('status', None)
         featured_param = self.request.query_params.get('featured', None)
         search_param = self.request.query_params.get('search', None)
+        tags_param = self.request.query_params.get('tags', None)
         
         if status_param:
             queryset = queryset.filter(status=status_param)
         if featured_param:
             featured = featured_param.lower() == 'true'
             queryset = queryset.filter(featured=featured)
+        if tags_param:
+            # Posts carrying all of the given tags, resolved through the tag index
+            tag_list = [tag for tag in tags_param.split(',') if tag.strip()]
+            if tag_list:
+                queryset = queryset.filter(id__in=list(post_ids_with_tags(tag_list)))
         if search_param:
+            tagged = BlogPostTag.objects.filter(tag__name__icontains=search_param.strip().lower())
             queryset = queryset.filter(
                 Q(title__icontains=search_param) |
                 Q(content__icontains=search_param) |
                 Q(excerpt__icontains=search_param) |
-                Q(tags__name__icontains=search_param)
-            ).distinct()
+                Q(id__in=list(tagged.values_list('post_id', flat=True)))
+            )
         return queryset
 
+    def get_serializer_class(self):
+        if self.action in ['list', 'featured']:
+            return BlogPostListSerializer
+        return BlogPostSerializer
+
     @swagger_auto_schema(
         tags=['Blog Posts'],
         operation_description="Create a new blog post",
@@ -90,41 +107,40 @@ class BlogPostViewSet(viewsets.ModelViewSet):
                 required=False
             )
         ],
-        responses={200: BlogPostSerializer(many=True)}
+        responses={200: BlogPostListSerializer(many=True), 304: "Not Modified"}
     )
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        
-        # Filter by status
-        status = request.query_params.get('status')
-        if status:
-            queryset = queryset.filter(status=status)
-            
-        # Filter by featured
-        featured = request.query_params.get('featured')
-        if featured is not None:
-            featured = featured.lower() == 'true'
-            queryset = queryset.filter(featured=featured)
-            
-        # Filter by tags
-        tags = request.query_params.get('tags')
-        if tags:
-            tag_list = [tag.strip() for tag in tags.split(',')]
-            queryset = queryset.filter(tags__contains=tag_list)
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = queryset_etag(queryset, request.get_full_path())
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            response = Response(serializer.data)
+        response['ETag'] = etag
+        return response
 
     @swagger_auto_schema(
         tags=['Blog Posts'],
         operation_description="Retrieve a specific blog post",
         responses={
             200: BlogPostSerializer,
+            304: "Not Modified",
             404: "Not Found"
         }
     )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        post = self.get_object()
+        etag = make_etag(post.pk, post.updated_at.isoformat(), post.comment_count)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response = Response(self.get_serializer(post).data)
+        response['ETag'] = etag
+        return response
 
     @swagger_auto_schema(
         tags=['Blog Posts'],
@@ -166,7 +182,7 @@ class BlogPostViewSet(viewsets.ModelViewSet):
     @swagger_auto_schema(
         tags=['Blog Posts'],
         operation_description="Get featured blog posts",
-        responses={200: BlogPostSerializer(many=True)}
+        responses={200: BlogPostListSerializer(many=True)}
     )
     @action(detail=False, methods=['get'])
     def featured(self, request):
@@ -174,6 +190,44 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(featured_posts, many=True)
         return Response(serializer.data)
 
+    @swagger_auto_schema(
+        tags=['Blog Posts'],
+        operation_description="Posts similar to this one, precomputed from titles, excerpts and tags",
+        responses={200: "List of related posts with similarity scores", 404: "Not Found"}
+    )
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        if not str(pk).isdigit():
+            return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
+        neighbors = BlogPostRelated.objects.filter(post_id=pk).values_list('neighbors', flat=True).first()
+        if neighbors is None:
+            # Not computed yet (new or unpublished post); only the miss pays for the existence check
+            get_object_or_404(BlogPost, pk=pk)
+            neighbors = []
+        return Response(neighbors)
+
+    @swagger_auto_schema(
+        tags=['Blog Posts'],
+        operation_description="List tags with the number of published posts using each, most used first",
+        manual_parameters=[
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Maximum number of tags (default 50)")
+        ],
+        responses={200: BlogTagSerializer(many=True), 304: "Not Modified"}
+    )
+    @action(detail=False, methods=['get'])
+    def tags(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), 500)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        tags = list(BlogTag.objects.filter(post_count__gt=0).order_by('-post_count', 'name')[:limit])
+        etag = make_etag(*[f'{tag.name}:{tag.post_count}' for tag in tags])
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response = Response(BlogTagSerializer(tags, many=True).data)
+        response['ETag'] = etag
+        return response
+
     @swagger_auto_schema(
         tags=['Blog Posts'],
         operation_description="Increment post views",
@@ -200,22 +254,44 @@ class BlogPostViewSet(viewsets.ModelViewSet):
 class BlogCommentViewSet(viewsets.ModelViewSet):
     serializer_class = BlogCommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = CommentCursorPagination
 
     def get_queryset(self):
-        return BlogComment.objects.filter(post_id=self.kwargs['post_pk'])
+        queryset = BlogComment.objects.select_related('user')
+        post_pk = self.kwargs.get('post_pk') or self.request.query_params.get('post')
+        if post_pk:
+            try:
+                queryset = queryset.filter(post_id=int(post_pk))
+            except ValueError:
+                raise ValidationError({'post': 'Must be a post id.'})
+        if self.action == 'list':
+            # Threads are listed by their root comment; replies load through `thread`
+            queryset = queryset.filter(depth=0)
+        return queryset
 
     def perform_create(self, serializer):
-        post = get_object_or_404(BlogPost, pk=self.kwargs['post_pk'])
-        serializer.save(post=post, user=self.request.user)
+        if 'post_pk' in self.kwargs:
+            post = get_object_or_404(BlogPost, pk=self.kwargs['post_pk'])
+            serializer.save(post=post, user=self.request.user)
+        else:
+            serializer.save(user=self.request.user)
+
+    def paginated_comments(self, queryset):
+        page = self.paginate_queryset(queryset)
+        context = self.get_serializer_context()
+        context['post_details'] = post_details(page)
+        serializer = self.get_serializer(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
 
     @swagger_auto_schema(
         tags=['Blog Comments'],
-        operation_description="Create a new comment",
+        operation_description="Create a new comment, or a reply when parent is given",
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
             required=['content'],
             properties={
-                'content': openapi.Schema(type=openapi.TYPE_STRING)
+                'content': openapi.Schema(type=openapi.TYPE_STRING),
+                'parent': openapi.Schema(type=openapi.TYPE_INTEGER)
             }
         ),
         responses={
@@ -228,11 +304,20 @@ class BlogCommentViewSet(viewsets.ModelViewSet):
 
     @swagger_auto_schema(
         tags=['Blog Comments'],
-        operation_description="List all comments for a post",
+        operation_description="List the top-level comments for a post, newest first (cursor paginated)",
         responses={200: BlogCommentSerializer(many=True)}
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self.paginated_comments(self.filter_queryset(self.get_queryset()))
+
+    @swagger_auto_schema(
+        tags=['Blog Comments'],
+        operation_description="A comment and all of its replies in reading order (cursor paginated)",
+        responses={200: BlogCommentSerializer(many=True)}
+    )
+    @action(detail=True, methods=['get'], pagination_class=CommentThreadPagination)
+    def thread(self, request, *args, **kwargs):
+        return self.paginated_comments(subtree(self.get_object()))
 
 class SavedPostViewSet(viewsets.ModelViewSet):
     serializer_class = SavedPostSerializer
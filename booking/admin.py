@@ -1,20 +1,24 @@
 from django.contrib import admin
-from .models import Booking, Payment, BookingReview
+from .models import Booking, Payment, BookingReview, DailyRollup, DepartureOccupancy
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
-    list_display = ('user', 'event', 'business', 'package', 'status', 'number_of_people', 'created_at', 'updated_at')
-    list_filter = ('status', 'created_at', 'updated_at')
-    search_fields = ('user__email', 'event__title', 'business__name', 'package__title')
-    readonly_fields = ('created_at', 'updated_at')
+    list_display = ('user', 'target_type', 'target_title', 'status', 'number_of_people', 'created_at', 'updated_at')
+    list_filter = ('status', 'target_type', 'created_at', 'updated_at')
+    search_fields = ('user__email', 'target_title')
+    readonly_fields = ('target_type', 'target_title', 'target_start_date', 'target_image', 'created_at', 'updated_at')
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('user', 'event', 'business', 'package', 'status')
+            'fields': ('user', 'event', 'business', 'package', 'departure', 'status')
         }),
         ('Booking Details', {
             'fields': ('number_of_people', 'special_requests')
         }),
+        ('Target Summary', {
+            'fields': ('target_type', 'target_title', 'target_start_date', 'target_image'),
+            'classes': ('collapse',)
+        }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -54,4 +58,18 @@ class BookingReviewAdmin(admin.ModelAdmin):
         ('Status', {
             'fields': ('helpful', 'reported')
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'business', 'package', 'gross', 'refunded', 'booking_count', 'headcount')
+    list_filter = ('day',)
+    search_fields = ('business__name', 'package__title', 'owner__email')
+    readonly_fields = ('owner', 'business', 'package', 'day', 'gross', 'refunded',
+                       'booking_count', 'headcount', 'updated_at')
+
+@admin.register(DepartureOccupancy)
+class DepartureOccupancyAdmin(admin.ModelAdmin):
+    list_display = ('departure', 'booking_count', 'headcount', 'updated_at')
+    search_fields = ('departure__package__title',)
+    readonly_fields = ('departure', 'booking_count', 'headcount', 'updated_at')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from booking.rollups import rebuild_rollups, rebuild_occupancy
+
+class Command(BaseCommand):
+    help = 'Rebuild daily revenue rollups and departure occupancy from bookings and payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--skip-occupancy', action='store_true',
+                            help='Do not rebuild departure occupancy')
+
+    def handle(self, *args, **options):
+        start = self._parse(options['start'])
+        end = self._parse(options['end'])
+        if start and end and start > end:
+            raise CommandError('--start must not be after --end')
+
+        written = rebuild_rollups(start=start, end=end)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} daily rollups'))
+        if not options['skip_occupancy']:
+            departures = rebuild_occupancy()
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt occupancy for {departures} departures'))
+
+    def _parse(self, value):
+        if not value:
+            return None
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'Invalid date: {value}')
+        return day
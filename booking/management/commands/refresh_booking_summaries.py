@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from booking.models import Booking
+
+SUMMARY_FIELDS = ['target_type', 'target_title', 'target_start_date', 'target_image']
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized target summary stored on every booking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Booking.objects.select_related('event', 'business', 'package', 'departure').order_by('pk')
+        batch = []
+        updated = 0
+        for booking in queryset.iterator(chunk_size=batch_size):
+            booking.refresh_target_summary()
+            batch.append(booking)
+            if len(batch) >= batch_size:
+                updated += len(batch)
+                Booking.objects.bulk_update(batch, SUMMARY_FIELDS)
+                batch = []
+        if batch:
+            updated += len(batch)
+            Booking.objects.bulk_update(batch, SUMMARY_FIELDS)
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {updated} booking summaries'))
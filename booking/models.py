@@ -5,8 +5,9 @@ from business.models import Business
 from django.utils.translation import gettext_lazy as _
 import uuid
 from events.models import Event
-from packages.models import Package
+from packages.models import Package, Departure
 from djongo.models import JSONField
+from datetime import datetime, time
 
 User = get_user_model()
 
@@ -23,26 +24,66 @@ class Booking(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, null=True, blank=True)
     business = models.ForeignKey(Business, on_delete=models.CASCADE, null=True, blank=True)
     package = models.ForeignKey(Package, on_delete=models.CASCADE, null=True, blank=True)
+    departure = models.ForeignKey(Departure, on_delete=models.SET_NULL, null=True, blank=True, related_name='bookings')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     number_of_people = models.IntegerField(default=1)
     special_requests = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Denormalized summary of the booked event, business or package
+    target_type = models.CharField(max_length=20, blank=True)
+    target_title = models.CharField(max_length=200, blank=True)
+    target_start_date = models.DateTimeField(null=True, blank=True)
+    target_image = models.CharField(max_length=500, blank=True)
+    
     def __str__(self):
-        if self.event:
-            return f"{self.user.username}'s booking for {self.event.title}"
-        elif self.business:
-            return f"{self.user.username}'s booking for {self.business.name}"
-        else:
-            return f"{self.user.username}'s booking for {self.package.title}"
+        return f"{self.user.username}'s booking for {self.target_title}"
+
+    @staticmethod
+    def target_summary(event=None, business=None, package=None, departure=None):
+        if event:
+            return {
+                'target_type': 'event',
+                'target_title': event.title,
+                'target_start_date': event.start_date,
+                'target_image': event.images[0] if event.images else '',
+            }
+        if business:
+            return {
+                'target_type': 'business',
+                'target_title': business.name,
+                'target_start_date': None,
+                'target_image': business.main_image or '',
+            }
+        if package:
+            return {
+                'target_type': 'package',
+                'target_title': package.title,
+                'target_start_date': Booking.departure_start(departure),
+                'target_image': package.image or '',
+            }
+        return {}
+
+    @staticmethod
+    def departure_start(departure):
+        if not departure or not departure.start_date:
+            return None
+        return timezone.make_aware(datetime.combine(departure.start_date, time.min))
+
+    def refresh_target_summary(self):
+        summary = self.target_summary(self.event, self.business, self.package, self.departure)
+        for field, value in summary.items():
+            setattr(self, field, value)
     
     class Meta:
         indexes = [
             models.Index(fields=['user']),
+            models.Index(fields=['user', 'status', 'target_start_date']),
             models.Index(fields=['event']),
             models.Index(fields=['business']),
             models.Index(fields=['package']),
+            models.Index(fields=['departure']),
             models.Index(fields=['status']),
         ]
 
@@ -97,4 +138,52 @@ class BookingReview(models.Model):
         indexes = [
             models.Index(fields=['booking']),
             models.Index(fields=['rating']),
-        ]
\ No newline at end of file
+        ]
+
+class DailyRollup(models.Model):
+    """
+    Revenue and booking totals for one business or package on one day,
+    maintained incrementally from Booking and Payment transitions.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='booking_rollups')
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, null=True, blank=True, related_name='rollups')
+    package = models.ForeignKey(Package, on_delete=models.CASCADE, null=True, blank=True, related_name='rollups')
+    day = models.DateField()
+    gross = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    refunded = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    booking_count = models.IntegerField(default=0)
+    headcount = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def net(self):
+        return self.gross - self.refunded
+
+    def __str__(self):
+        target = self.business_id and f"business {self.business_id}" or f"package {self.package_id}"
+        return f"Rollup for {target} on {self.day}"
+
+    class Meta:
+        unique_together = ['business', 'package', 'day']
+        indexes = [
+            models.Index(fields=['owner', 'day']),
+            models.Index(fields=['business', 'day']),
+            models.Index(fields=['package', 'day']),
+        ]
+
+class DepartureOccupancy(models.Model):
+    """Confirmed bookings and headcount per package departure."""
+    departure = models.OneToOneField(Departure, on_delete=models.CASCADE, primary_key=True, related_name='occupancy')
+    booking_count = models.IntegerField(default=0)
+    headcount = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def occupancy(self):
+        # available_slots holds the seats still open on the departure
+        capacity = self.headcount + max(self.departure.available_slots or 0, 0)
+        return round(self.headcount / capacity, 4) if capacity else 0.0
+
+    def __str__(self):
+        return f"Occupancy for {self.departure}"
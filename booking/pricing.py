@@ -0,0 +1,135 @@
+from decimal import Decimal, ROUND_HALF_UP
+from django.core import signing
+from django.core.cache import cache
+from events.models import Event
+from packages.models import Package, Departure
+
+CURRENCY = 'ETB'
+QUOTE_SALT = 'booking.quote'
+QUOTE_MAX_AGE = 60 * 30
+PRICE_TABLE_TIMEOUT = 60 * 60 * 6
+CENT = Decimal('0.01')
+
+class QuoteError(Exception):
+    pass
+
+def _key(kind, pk):
+    return f'pricing:{kind}:{pk}'
+
+def _money(value):
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+def package_unit_price(package):
+    # A zero or missing discount means no discount, as in Package.effective_price
+    if package.discounted_price is not None and 0 < package.discounted_price < package.price:
+        return package.discounted_price
+    return package.price
+
+def _package_table(package):
+    return {
+        'package': package.pk,
+        'departure': None,
+        'unit_price': str(_money(package_unit_price(package))),
+        'max_group_size': package.max_group_size,
+    }
+
+def departure_price_table(departure_id):
+    """Price table for one departure: its own price, or the package price when it has none."""
+    table = cache.get(_key('departure', departure_id))
+    if table is None:
+        departure = Departure.objects.select_related('package').filter(pk=departure_id).first()
+        if departure is None or departure.package is None:
+            raise QuoteError('Departure not found.')
+        table = _package_table(departure.package)
+        table['departure'] = departure.pk
+        if departure.price is not None:
+            table['unit_price'] = str(_money(departure.price))
+        cache.set(_key('departure', departure_id), table, PRICE_TABLE_TIMEOUT)
+    return table
+
+def package_price_table(package_id):
+    table = cache.get(_key('package', package_id))
+    if table is None:
+        package = Package.objects.filter(pk=package_id).first()
+        if package is None:
+            raise QuoteError('Package not found.')
+        table = _package_table(package)
+        cache.set(_key('package', package_id), table, PRICE_TABLE_TIMEOUT)
+    return table
+
+def event_price_table(event_id):
+    table = cache.get(_key('event', event_id))
+    if table is None:
+        event = Event.objects.filter(pk=event_id).values('price').first()
+        if event is None:
+            raise QuoteError('Event not found.')
+        table = {'event': event_id, 'unit_price': str(_money(event['price']))}
+        cache.set(_key('event', event_id), table, PRICE_TABLE_TIMEOUT)
+    return table
+
+def invalidate_package(package_id, departure_ids=()):
+    cache.delete_many([_key('package', package_id)] + [_key('departure', pk) for pk in departure_ids])
+
+def invalidate_departure(departure_id):
+    cache.delete(_key('departure', departure_id))
+
+def invalidate_event(event_id):
+    cache.delete(_key('event', event_id))
+
+def compute_quote(number_of_people, event=None, business=None, package=None, departure=None):
+    """
+    Price a booking. Targets are given as primary keys; the result is a
+    plain dict that can be signed into a quote token.
+    """
+    if number_of_people is None or number_of_people < 1:
+        raise QuoteError('number_of_people must be at least 1.')
+    if business:
+        raise QuoteError('Businesses do not publish prices; bookings are paid on site.')
+    if event:
+        table = event_price_table(event)
+        quote = {'event': event}
+    elif package:
+        if departure:
+            table = departure_price_table(departure)
+            if table['package'] != package:
+                raise QuoteError('Departure does not belong to this package.')
+        else:
+            table = package_price_table(package)
+        if table['max_group_size'] and number_of_people > table['max_group_size']:
+            raise QuoteError(f"This package takes at most {table['max_group_size']} people per booking.")
+        quote = {'package': package, 'departure': departure}
+    else:
+        raise QuoteError('Provide an event or a package to quote.')
+    unit_price = Decimal(table['unit_price'])
+    quote.update({
+        'number_of_people': number_of_people,
+        'unit_price': str(unit_price),
+        'total': str(_money(unit_price * number_of_people)),
+        'currency': CURRENCY,
+    })
+    return quote
+
+def quote_for_booking(booking):
+    return compute_quote(
+        booking.number_of_people, event=booking.event_id, business=booking.business_id,
+        package=booking.package_id, departure=booking.departure_id
+    )
+
+def sign_quote(quote):
+    return signing.dumps(quote, salt=QUOTE_SALT, compress=True)
+
+def verify_quote(token):
+    try:
+        return signing.loads(token, salt=QUOTE_SALT, max_age=QUOTE_MAX_AGE)
+    except signing.SignatureExpired:
+        raise QuoteError('Quote has expired, request a new one.')
+    except signing.BadSignature:
+        raise QuoteError('Quote token is invalid.')
+
+def quote_matches_booking(quote, booking):
+    return (
+        quote.get('event') == booking.event_id and
+        quote.get('package') == booking.package_id and
+        quote.get('departure') == booking.departure_id and
+        quote.get('number_of_people') == booking.number_of_people
+    )
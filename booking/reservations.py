@@ -0,0 +1,40 @@
+from django.db.models import F
+from packages.models import Departure
+from packages.pricing import refresh_effective_price
+from packages.departure_calendar import invalidate_calendar
+
+class ReservationError(Exception):
+    pass
+
+def reserve_seats(departure_id, seats):
+    """
+    Take seats from a departure in one conditional update, so concurrent
+    bookings cannot oversell it.
+    """
+    if not departure_id or seats <= 0:
+        return
+    updated = Departure.objects.filter(
+        pk=departure_id, available_slots__gte=seats
+    ).update(available_slots=F('available_slots') - seats)
+    if not updated:
+        raise ReservationError(f'Not enough seats left on departure {departure_id}.')
+    _seats_changed(departure_id, sold_out=True, seats=seats)
+
+def release_seats(departure_id, seats):
+    if not departure_id or seats <= 0:
+        return
+    Departure.objects.filter(pk=departure_id, available_slots__isnull=False).update(
+        available_slots=F('available_slots') + seats
+    )
+    _seats_changed(departure_id, sold_out=False, seats=seats)
+
+def _seats_changed(departure_id, sold_out, seats):
+    # These updates bypass Departure signals. The calendar shows remaining seats,
+    # so it is always dropped; the effective price only depends on whether a
+    # departure has seats, so it is refreshed when that flips.
+    departure = Departure.objects.filter(pk=departure_id).values('package_id', 'available_slots').first()
+    if not departure or not departure['package_id']:
+        return
+    invalidate_calendar(departure['package_id'])
+    if departure['available_slots'] == (0 if sold_out else seats):
+        refresh_effective_price(departure['package_id'])
@@ -0,0 +1,214 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from business.models import Business
+from packages.models import Package
+from .models import Booking, Payment, DailyRollup, DepartureOccupancy
+
+# Booking statuses that count towards booking_count/headcount
+COUNTED_BOOKING_STATUSES = ('confirmed', 'completed')
+
+def rollup_day(value):
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+def booking_contribution(status, number_of_people):
+    if status in COUNTED_BOOKING_STATUSES:
+        return 1, number_of_people or 0
+    return 0, 0
+
+def payment_contribution(status, amount):
+    """
+    A refunded payment was collected first, so it stays in gross and is
+    also counted as refunded.
+    """
+    amount = Decimal(amount or 0)
+    if status == 'completed':
+        return amount, Decimal('0')
+    if status == 'refunded':
+        return amount, amount
+    return Decimal('0'), Decimal('0')
+
+def snapshot_booking(booking):
+    """Return the stored state of a booking before it is saved, or None if it is new."""
+    if booking._state.adding:
+        return None
+    return Booking.objects.filter(pk=booking.pk).values(
+        'status', 'number_of_people', 'event_id', 'business_id', 'package_id', 'departure_id'
+    ).first()
+
+def snapshot_payment(payment):
+    if payment._state.adding:
+        return None
+    return Payment.objects.filter(pk=payment.pk).values('status', 'amount').first()
+
+def _owner_id(business_id, package_id):
+    if business_id:
+        return Business.objects.filter(pk=business_id).values_list('owner_id', flat=True).first()
+    return Package.objects.filter(pk=package_id).values_list('user_id', flat=True).first()
+
+def _increment(model, lookup, deltas):
+    deltas = {field: value for field, value in deltas.items() if value}
+    if deltas:
+        model.objects.filter(**lookup).update(**{field: F(field) + value for field, value in deltas.items()})
+
+def add_to_rollup(business_id, package_id, day, **deltas):
+    if not (business_id or package_id) or not any(deltas.values()):
+        return
+    lookup = {'business_id': business_id, 'package_id': package_id, 'day': day}
+    if not DailyRollup.objects.filter(**lookup).exists():
+        owner_id = _owner_id(business_id, package_id)
+        if owner_id is None:
+            return
+        DailyRollup.objects.get_or_create(defaults={'owner_id': owner_id}, **lookup)
+    _increment(DailyRollup, lookup, deltas)
+
+def add_to_occupancy(departure_id, booking_count, headcount):
+    if not departure_id or not (booking_count or headcount):
+        return
+    DepartureOccupancy.objects.get_or_create(departure_id=departure_id)
+    _increment(DepartureOccupancy, {'departure_id': departure_id},
+               {'booking_count': booking_count, 'headcount': headcount})
+
+def apply_booking_change(booking, previous):
+    """Move a booking's contribution from its previous state to its current one."""
+    day = rollup_day(booking.created_at)
+    current = {
+        'status': booking.status, 'number_of_people': booking.number_of_people,
+        'event_id': booking.event_id, 'business_id': booking.business_id, 'package_id': booking.package_id,
+        'departure_id': booking.departure_id,
+    }
+    if previous == current:
+        return
+    if previous:
+        count, people = booking_contribution(previous['status'], previous['number_of_people'])
+        if count:
+            add_to_rollup(previous['business_id'], previous['package_id'], day,
+                          booking_count=-count, headcount=-people)
+            add_to_occupancy(previous['departure_id'], -count, -people)
+    count, people = booking_contribution(booking.status, booking.number_of_people)
+    if count:
+        add_to_rollup(booking.business_id, booking.package_id, day,
+                      booking_count=count, headcount=people)
+        add_to_occupancy(booking.departure_id, count, people)
+
+def add_created_bookings(bookings):
+    """
+    Add bookings written with bulk_create (no post_save) to the rollups,
+    one increment per rollup row and per departure rather than per booking.
+    """
+    rollup_deltas = defaultdict(lambda: [0, 0])
+    occupancy_deltas = defaultdict(lambda: [0, 0])
+    for booking in bookings:
+        count, people = booking_contribution(booking.status, booking.number_of_people)
+        if not count:
+            continue
+        for deltas in (rollup_deltas[booking.business_id, booking.package_id, rollup_day(booking.created_at)],
+                       occupancy_deltas[booking.departure_id]):
+            deltas[0] += count
+            deltas[1] += people
+    for (business_id, package_id, day), (count, people) in rollup_deltas.items():
+        add_to_rollup(business_id, package_id, day, booking_count=count, headcount=people)
+    for departure_id, (count, people) in occupancy_deltas.items():
+        add_to_occupancy(departure_id, count, people)
+
+def apply_payment_change(payment, previous):
+    gross, refunded = payment_contribution(payment.status, payment.amount)
+    if previous:
+        old_gross, old_refunded = payment_contribution(previous['status'], previous['amount'])
+        gross, refunded = gross - old_gross, refunded - old_refunded
+    if not (gross or refunded):
+        return
+    booking = payment.booking
+    add_to_rollup(booking.business_id, booking.package_id, rollup_day(payment.created_at),
+                  gross=gross, refunded=refunded)
+
+def remove_booking(booking):
+    count, people = booking_contribution(booking.status, booking.number_of_people)
+    if count:
+        add_to_rollup(booking.business_id, booking.package_id, rollup_day(booking.created_at),
+                      booking_count=-count, headcount=-people)
+        add_to_occupancy(booking.departure_id, -count, -people)
+
+def remove_payment(payment):
+    gross, refunded = payment_contribution(payment.status, payment.amount)
+    if not (gross or refunded):
+        return
+    target = Booking.objects.filter(pk=payment.booking_id).values('business_id', 'package_id').first()
+    if target:
+        add_to_rollup(target['business_id'], target['package_id'], rollup_day(payment.created_at),
+                      gross=-gross, refunded=-refunded)
+
+def rebuild_rollups(start=None, end=None):
+    """
+    Recompute rollups for bookings and payments created between start and end
+    (inclusive dates, both optional). Rows are streamed and accumulated per
+    (business, package, day), so memory grows with the number of rollups only.
+    Returns the number of rollup rows written.
+    """
+    bookings = Booking.objects.filter(status__in=COUNTED_BOOKING_STATUSES)
+    payments = Payment.objects.filter(status__in=('completed', 'refunded'))
+    rollups = DailyRollup.objects.all()
+    if start:
+        bookings = bookings.filter(created_at__date__gte=start)
+        payments = payments.filter(created_at__date__gte=start)
+        rollups = rollups.filter(day__gte=start)
+    if end:
+        bookings = bookings.filter(created_at__date__lte=end)
+        payments = payments.filter(created_at__date__lte=end)
+        rollups = rollups.filter(day__lte=end)
+
+    totals = defaultdict(lambda: {'gross': Decimal('0'), 'refunded': Decimal('0'),
+                                  'booking_count': 0, 'headcount': 0})
+    rows = bookings.values_list('business_id', 'package_id', 'created_at', 'status', 'number_of_people')
+    for business_id, package_id, created_at, status, people in rows.iterator():
+        if not (business_id or package_id):
+            continue
+        count, headcount = booking_contribution(status, people)
+        entry = totals[(business_id, package_id, rollup_day(created_at))]
+        entry['booking_count'] += count
+        entry['headcount'] += headcount
+    rows = payments.values_list('booking__business_id', 'booking__package_id', 'created_at', 'status', 'amount')
+    for business_id, package_id, created_at, status, amount in rows.iterator():
+        if not (business_id or package_id):
+            continue
+        gross, refunded = payment_contribution(status, amount)
+        entry = totals[(business_id, package_id, rollup_day(created_at))]
+        entry['gross'] += gross
+        entry['refunded'] += refunded
+
+    business_owners = dict(Business.objects.filter(
+        pk__in={key[0] for key in totals if key[0]}
+    ).values_list('id', 'owner_id'))
+    package_owners = dict(Package.objects.filter(
+        pk__in={key[1] for key in totals if key[1]}
+    ).values_list('id', 'user_id'))
+    objects = []
+    for (business_id, package_id, day), values in totals.items():
+        owner_id = business_owners.get(business_id) if business_id else package_owners.get(package_id)
+        if owner_id is None:
+            continue
+        objects.append(DailyRollup(owner_id=owner_id, business_id=business_id,
+                                   package_id=package_id, day=day, **values))
+    with transaction.atomic():
+        rollups.delete()
+        DailyRollup.objects.bulk_create(objects, batch_size=1000)
+    return len(objects)
+
+def rebuild_occupancy():
+    """Recompute DepartureOccupancy from confirmed bookings. Returns the row count."""
+    totals = defaultdict(lambda: [0, 0])
+    rows = Booking.objects.filter(
+        status__in=COUNTED_BOOKING_STATUSES, departure__isnull=False
+    ).values_list('departure_id', 'number_of_people')
+    for departure_id, people in rows.iterator():
+        totals[departure_id][0] += 1
+        totals[departure_id][1] += people or 0
+    with transaction.atomic():
+        DepartureOccupancy.objects.all().delete()
+        DepartureOccupancy.objects.bulk_create([
+            DepartureOccupancy(departure_id=departure_id, booking_count=count, headcount=headcount)
+            for departure_id, (count, headcount) in totals.items()
+        ], batch_size=1000)
+    return len(totals)
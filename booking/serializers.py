@@ -1,9 +1,15 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from business.models import Business
 from business.serializers import BusinessListSerializer
-from .models import Booking, Payment, BookingReview
+from events.models import Event
+from packages.models import Package, Departure
+from .models import Booking, Payment, BookingReview, DailyRollup, DepartureOccupancy
 from events.serializers import EventListSerializer
 from packages.serializers import PackageListSerializer
+from decimal import Decimal
+from . import pricing, reservations
 
 User = get_user_model()
 
@@ -17,7 +23,7 @@ class BookingListSerializer(serializers.ModelSerializer):
         model = Booking
         fields = [
             'id', 'user', 'user_email', 'event', 'business', 'package',
-            'status', 'number_of_people', 'special_requests',
+            'departure', 'status', 'number_of_people', 'special_requests',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'user', 'user_email', 'created_at', 'updated_at']
@@ -25,34 +31,218 @@ class BookingListSerializer(serializers.ModelSerializer):
     def get_user_email(self, obj):
         return obj.user.email if obj.user else None
 
+class BookingSummarySerializer(serializers.ModelSerializer):
+    """Renders a booking from its own row using the denormalized target summary."""
+    user_email = serializers.EmailField(source='user.email', read_only=True)
+
+    class Meta:
+        model = Booking
+        fields = [
+            'id', 'user', 'user_email', 'event', 'business', 'package',
+            'departure', 'status', 'number_of_people', 'special_requests',
+            'target_type', 'target_title', 'target_start_date', 'target_image',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
 class BookingCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = [
-            'event', 'business', 'package', 'number_of_people',
+            'event', 'business', 'package', 'departure', 'number_of_people',
             'special_requests', 'status'
         ]
 
     def validate(self, data):
         if ('event' in data and 'business' in data) or ('event' in data and 'package' in data) or ('business' in data and 'package' in data):
             raise serializers.ValidationError("Provide exactly one of event, business, or package.")
-        if 'event' not in data and 'business' not in data and 'package' not in data:
+        if self.instance is None and 'event' not in data and 'business' not in data and 'package' not in data:
             raise serializers.ValidationError("Must provide one of event, business, or package.")
+        departure = data.get('departure')
+        package = data.get('package', getattr(self.instance, 'package', None))
+        if departure and departure.package_id != getattr(package, 'id', None):
+            raise serializers.ValidationError("Departure must belong to the booked package.")
         return data
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
+        departure = validated_data.get('departure')
+        with transaction.atomic():
+            if departure and validated_data.get('status') != 'cancelled':
+                try:
+                    reservations.reserve_seats(departure.pk, validated_data.get('number_of_people', 1))
+                except reservations.ReservationError as exc:
+                    raise serializers.ValidationError(str(exc))
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        """
+        Move the booking's seat hold along with an edit: the difference on the
+        same departure, or a new hold plus a release when the departure
+        changes. Cancellations are released by the booking post_save signal.
+        """
+        status = validated_data.get('status', instance.status)
+        departure = validated_data.get('departure', instance.departure)
+        seats = validated_data.get('number_of_people', instance.number_of_people)
+        held_departure, held_seats = instance.departure_id, instance.number_of_people
+        if instance.status == 'cancelled':
+            held_departure, held_seats = None, 0
+        with transaction.atomic():
+            if status != 'cancelled':
+                departure_id = departure.pk if departure else None
+                try:
+                    if departure_id == held_departure:
+                        if seats > held_seats:
+                            reservations.reserve_seats(departure_id, seats - held_seats)
+                        else:
+                            reservations.release_seats(departure_id, held_seats - seats)
+                    else:
+                        reservations.reserve_seats(departure_id, seats)
+                        reservations.release_seats(held_departure, held_seats)
+                except reservations.ReservationError as exc:
+                    raise serializers.ValidationError(str(exc))
+            return super().update(instance, validated_data)
+
+class BulkBookingItemSerializer(serializers.Serializer):
+    event = serializers.IntegerField(required=False)
+    business = serializers.IntegerField(required=False)
+    package = serializers.IntegerField(required=False)
+    departure = serializers.IntegerField(required=False)
+    number_of_people = serializers.IntegerField(min_value=1, default=1)
+    special_requests = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, data):
+        if len([field for field in ('event', 'business', 'package') if data.get(field)]) != 1:
+            raise serializers.ValidationError("Provide exactly one of event, business, or package.")
+        if data.get('departure') and not data.get('package'):
+            raise serializers.ValidationError("A departure can only be booked with its package.")
+        return data
+
+class BulkBookingSerializer(serializers.Serializer):
+    """
+    Validates a batch of bookings together: targets are loaded with one query
+    per model, departure seats are checked and reserved once per departure,
+    and all rows are written with a single bulk insert. Events only get an
+    advisory check against their registrations (current_attendees); event
+    places are not reserved, as with single bookings.
+    """
+    MAX_BATCH_SIZE = 200
+
+    bookings = BulkBookingItemSerializer(many=True, allow_empty=False)
+
+    def validate_bookings(self, items):
+        if len(items) > self.MAX_BATCH_SIZE:
+            raise serializers.ValidationError(f"At most {self.MAX_BATCH_SIZE} bookings can be created at once.")
+        return items
+
+    def validate(self, data):
+        items = data['bookings']
+        targets = {
+            'event': Event.objects.in_bulk({item['event'] for item in items if item.get('event')}),
+            'business': Business.objects.in_bulk({item['business'] for item in items if item.get('business')}),
+            'package': Package.objects.in_bulk({item['package'] for item in items if item.get('package')}),
+            'departure': Departure.objects.in_bulk({item['departure'] for item in items if item.get('departure')}),
+        }
+        errors = {}
+        event_seats, departure_seats = {}, {}
+        for index, item in enumerate(items):
+            missing = [field for field, objects in targets.items()
+                       if item.get(field) and item[field] not in objects]
+            if missing:
+                errors[index] = f"Unknown {', '.join(missing)}."
+                continue
+            departure = targets['departure'].get(item.get('departure'))
+            package = targets['package'].get(item.get('package'))
+            if departure and departure.package_id != item['package']:
+                errors[index] = "Departure must belong to the booked package."
+            elif package and package.max_group_size and item['number_of_people'] > package.max_group_size:
+                errors[index] = f"This package takes at most {package.max_group_size} people per booking."
+            if item.get('event'):
+                event_seats[item['event']] = event_seats.get(item['event'], 0) + item['number_of_people']
+            if departure:
+                departure_seats[departure.pk] = departure_seats.get(departure.pk, 0) + item['number_of_people']
+        for event_id, seats in event_seats.items():
+            event = targets['event'][event_id]
+            if event.capacity and event.current_attendees + seats > event.capacity:
+                errors[f'event:{event_id}'] = f"Only {max(event.capacity - event.current_attendees, 0)} places left for {event.title}."
+        for departure_id, seats in departure_seats.items():
+            available = targets['departure'][departure_id].available_slots
+            if available is not None and seats > available:
+                errors[f'departure:{departure_id}'] = f"Only {available} seats left on departure {departure_id}."
+        if errors:
+            raise serializers.ValidationError({'bookings': errors})
+        data['targets'] = targets
+        data['departure_seats'] = departure_seats
+        return data
+
+    def create(self, validated_data):
+        user = self.context['request'].user
+        targets = validated_data['targets']
+        bookings = []
+        for item in validated_data['bookings']:
+            booking = Booking(
+                user=user,
+                event=targets['event'].get(item.get('event')),
+                business=targets['business'].get(item.get('business')),
+                package=targets['package'].get(item.get('package')),
+                departure=targets['departure'].get(item.get('departure')),
+                number_of_people=item['number_of_people'],
+                special_requests=item.get('special_requests'),
+                status='pending',
+            )
+            booking.refresh_target_summary()
+            bookings.append(booking)
+        with transaction.atomic():
+            for departure_id, seats in validated_data['departure_seats'].items():
+                try:
+                    reservations.reserve_seats(departure_id, seats)
+                except reservations.ReservationError as exc:
+                    raise serializers.ValidationError({'bookings': str(exc)})
+            Booking.objects.bulk_create(bookings, batch_size=self.MAX_BATCH_SIZE)
+        return bookings
+
+class QuoteRequestSerializer(serializers.Serializer):
+    event = serializers.IntegerField(required=False)
+    business = serializers.IntegerField(required=False)
+    package = serializers.IntegerField(required=False)
+    departure = serializers.IntegerField(required=False)
+    number_of_people = serializers.IntegerField(min_value=1, default=1)
+
+    def validate(self, data):
+        targets = [field for field in ('event', 'business', 'package') if data.get(field)]
+        if len(targets) != 1:
+            raise serializers.ValidationError("Provide exactly one of event, business, or package.")
+        if data.get('departure') and not data.get('package'):
+            raise serializers.ValidationError("A departure can only be quoted with its package.")
+        try:
+            data['quote'] = pricing.compute_quote(
+                data['number_of_people'], event=data.get('event'), business=data.get('business'),
+                package=data.get('package'), departure=data.get('departure')
+            )
+        except pricing.QuoteError as exc:
+            raise serializers.ValidationError(str(exc))
+        return data
+
+class QuoteSerializer(serializers.Serializer):
+    event = serializers.IntegerField(required=False, allow_null=True)
+    package = serializers.IntegerField(required=False, allow_null=True)
+    departure = serializers.IntegerField(required=False, allow_null=True)
+    number_of_people = serializers.IntegerField()
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    currency = serializers.CharField()
+    quote_token = serializers.CharField()
 
 class PaymentSerializer(serializers.ModelSerializer):
     booking_details = BookingListSerializer(source='booking', read_only=True)
+    quote_token = serializers.CharField(write_only=True, required=False)
 
     class Meta:
         model = Payment
         fields = [
             'id', 'booking', 'booking_details', 'amount',
             'payment_method', 'status', 'transaction_id',
-            'payment_details', 'created_at'
+            'payment_details', 'quote_token', 'created_at'
         ]
         read_only_fields = ['id', 'booking_details', 'created_at']
 
@@ -61,6 +251,30 @@ class PaymentSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("You can only make payments for your own bookings.")
         return value
 
+    def validate(self, data):
+        booking = data.get('booking') or getattr(self.instance, 'booking', None)
+        token = data.pop('quote_token', None)
+        if booking is None or ('amount' not in data and not token):
+            return data
+        try:
+            if token:
+                # The signed quote already carries the price, so no lookups are needed
+                quote = pricing.verify_quote(token)
+                if not pricing.quote_matches_booking(quote, booking):
+                    raise serializers.ValidationError("Quote does not match this booking.")
+            elif booking.business_id:
+                return data
+            else:
+                quote = pricing.quote_for_booking(booking)
+        except pricing.QuoteError as exc:
+            raise serializers.ValidationError(str(exc))
+        expected = Decimal(quote['total'])
+        if 'amount' not in data:
+            data['amount'] = expected
+        elif data['amount'] != expected:
+            raise serializers.ValidationError(f"Amount must equal the quoted total of {expected} {quote['currency']}.")
+        return data
+
 class BookingReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = BookingReview
@@ -72,4 +286,29 @@ class BookingReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("You can only review your own bookings.")
         if data['rating'] < 1 or data['rating'] > 5:
             raise serializers.ValidationError("Rating must be between 1 and 5.")
-        return data
\ No newline at end of file
+        return data
+
+class DailyRollupSerializer(serializers.ModelSerializer):
+    net = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = DailyRollup
+        fields = [
+            'day', 'business', 'package', 'gross', 'refunded', 'net',
+            'booking_count', 'headcount'
+        ]
+        read_only_fields = fields
+
+class DepartureOccupancySerializer(serializers.ModelSerializer):
+    package = serializers.IntegerField(source='departure.package_id', read_only=True)
+    start_date = serializers.DateField(source='departure.start_date', read_only=True)
+    available_slots = serializers.IntegerField(source='departure.available_slots', read_only=True)
+    occupancy = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = DepartureOccupancy
+        fields = [
+            'departure', 'package', 'start_date', 'booking_count',
+            'headcount', 'available_slots', 'occupancy'
+        ]
+        read_only_fields = fields
@@ -1,24 +1,70 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
+from events.models import Event
+from business.models import Business
+from packages.models import Package, Departure
 from .models import Booking, Payment
+from . import rollups, pricing, reservations
+
+TARGET_FIELDS = ('event_id', 'business_id', 'package_id', 'departure_id')
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_state(sender, instance, **kwargs):
+    previous = rollups.snapshot_booking(instance)
+    instance._previous_state = previous
+    if (previous is None or not instance.target_type or
+            any(previous[field] != getattr(instance, field) for field in TARGET_FIELDS)):
+        instance.refresh_target_summary()
+
+@receiver(pre_save, sender=Payment)
+def remember_payment_state(sender, instance, **kwargs):
+    instance._previous_state = rollups.snapshot_payment(instance)
+
+def refresh_booking_counters(event=None, business=None):
+    if event:
+        event.current_attendance = Booking.objects.filter(
+            event=event,
+            status='confirmed'
+        ).count()
+        event.save()
+    if business:
+        business.total_bookings = Booking.objects.filter(
+            business=business,
+            status='confirmed'
+        ).count()
+        business.save()
 
 @receiver(post_save, sender=Booking)
 def booking_post_save(sender, instance, created, **kwargs):
     if created or instance.status == 'confirmed':
-        if instance.event:
-            event = instance.event
-            event.current_attendance = Booking.objects.filter(
-                event=event,
-                status='confirmed'
-            ).count()
-            event.save()
-        if instance.business:
-            business = instance.business
-            business.total_bookings = Booking.objects.filter(
-                business=business,
-                status='confirmed'
-            ).count()
-            business.save()
+        refresh_booking_counters(event=instance.event, business=instance.business)
+
+@receiver(post_save, sender=Booking)
+def release_cancelled_seats(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_state', None)
+    if previous and previous['status'] != 'cancelled' and instance.status == 'cancelled':
+        reservations.release_seats(previous['departure_id'], previous['number_of_people'])
+
+@receiver(post_delete, sender=Booking)
+def release_deleted_seats(sender, instance, **kwargs):
+    if instance.status != 'cancelled':
+        reservations.release_seats(instance.departure_id, instance.number_of_people)
+
+@receiver(post_save, sender=Booking)
+def update_booking_rollups(sender, instance, **kwargs):
+    rollups.apply_booking_change(instance, getattr(instance, '_previous_state', None))
+
+@receiver(post_save, sender=Payment)
+def update_payment_rollups(sender, instance, **kwargs):
+    rollups.apply_payment_change(instance, getattr(instance, '_previous_state', None))
+
+@receiver(post_delete, sender=Booking)
+def remove_booking_from_rollups(sender, instance, **kwargs):
+    rollups.remove_booking(instance)
+
+@receiver(post_delete, sender=Payment)
+def remove_payment_from_rollups(sender, instance, **kwargs):
+    rollups.remove_payment(instance)
 
 @receiver(post_save, sender=Payment)
 def update_booking_status(sender, instance, **kwargs):
@@ -30,4 +76,73 @@ def update_booking_status(sender, instance, **kwargs):
         instance.booking.save()
     elif instance.status == 'refunded':
         instance.booking.status = 'cancelled'
-        instance.booking.save()
\ No newline at end of file
+        instance.booking.save()
+
+# Fields of each target copied into its bookings' summary columns
+SUMMARY_SOURCE_FIELDS = {
+    Event: ('title', 'start_date', 'images'),
+    Business: ('name', 'main_image'),
+    Package: ('title', 'image'),
+    Departure: ('start_date',),
+}
+
+@receiver(pre_save, sender=Event)
+@receiver(pre_save, sender=Business)
+@receiver(pre_save, sender=Package)
+@receiver(pre_save, sender=Departure)
+def snapshot_summary_fields(sender, instance, update_fields=None, **kwargs):
+    fields = SUMMARY_SOURCE_FIELDS[sender]
+    instance._previous_summary = None
+    if instance.pk is None or (update_fields is not None and not set(fields) & set(update_fields)):
+        instance._summary_unchanged = True
+        return
+    instance._summary_unchanged = False
+    instance._previous_summary = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+
+def summary_changed(instance, created):
+    """
+    Whether a saved target's bookings need their summary columns rewritten.
+    Counter updates (attendance, total bookings) save the target on every
+    booking write; skipping those keeps each booking write O(1).
+    """
+    if created or getattr(instance, '_summary_unchanged', False):
+        return False
+    previous = getattr(instance, '_previous_summary', None)
+    current = tuple(getattr(instance, field) for field in SUMMARY_SOURCE_FIELDS[type(instance)])
+    return previous != current
+
+@receiver(post_save, sender=Event)
+def refresh_event_booking_summaries(sender, instance, created, **kwargs):
+    if summary_changed(instance, created):
+        Booking.objects.filter(event=instance).update(**Booking.target_summary(event=instance))
+
+@receiver(post_save, sender=Business)
+def refresh_business_booking_summaries(sender, instance, created, **kwargs):
+    if summary_changed(instance, created):
+        Booking.objects.filter(business=instance).update(**Booking.target_summary(business=instance))
+
+@receiver(post_save, sender=Package)
+def refresh_package_booking_summaries(sender, instance, created, **kwargs):
+    if summary_changed(instance, created):
+        Booking.objects.filter(package=instance).update(
+            target_title=instance.title, target_image=instance.image or ''
+        )
+
+@receiver(post_save, sender=Departure)
+def refresh_departure_booking_summaries(sender, instance, created, **kwargs):
+    if summary_changed(instance, created):
+        Booking.objects.filter(departure=instance).update(
+            target_start_date=Booking.departure_start(instance)
+        )
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_event_prices(sender, instance, **kwargs):
+    pricing.invalidate_event(instance.pk)
+
+@receiver([post_save, post_delete], sender=Package)
+def invalidate_package_prices(sender, instance, **kwargs):
+    pricing.invalidate_package(instance.pk, instance.departures.values_list('pk', flat=True))
+
+@receiver([post_save, post_delete], sender=Departure)
+def invalidate_departure_prices(sender, instance, **kwargs):
+    pricing.invalidate_departure(instance.pk)
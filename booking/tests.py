@@ -0,0 +1,211 @@
+from datetime import time, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from business.models import Business
+from packages.models import Package, Departure
+from .models import Booking, Payment, DailyRollup, DepartureOccupancy
+from .rollups import booking_contribution, payment_contribution
+from .pricing import QuoteError, compute_quote, package_unit_price
+from .reservations import ReservationError, reserve_seats, release_seats
+
+User = get_user_model()
+
+def make_business(owner, **fields):
+    values = {
+        'name': 'Lalibela Lodge', 'business_type': 'hotel', 'description': 'Rooms', 'contact_email': 'lodge@example.com',
+        'contact_phone': '0911000000', 'region': 'Amhara', 'city': 'Lalibela', 'address': 'Main road',
+        'main_image': 'https://example.com/lodge.jpg', 'status': 'approved', 'owner': owner,
+    }
+    values.update(fields)
+    return Business.objects.create(**values)
+
+def make_package(user, **fields):
+    values = {
+        'user': user, 'title': 'Simien Trek', 'description': 'Trek', 'short_description': 'Trek',
+        'location': 'Simien', 'region': 'Amhara', 'price': Decimal('500'), 'duration': '3 days',
+        'duration_in_days': 3, 'departure': 'Gondar', 'departure_time': time(7), 'return_time': time(18),
+        'max_group_size': 10, 'min_age': 12, 'difficulty': 'Moderate', 'tour_guide': 'Guide', 'status': 'active',
+    }
+    values.update(fields)
+    return Package.objects.create(**values)
+
+def make_departure(package, **fields):
+    start = timezone.localdate() + timedelta(days=30)
+    values = {'package': package, 'start_date': start, 'end_date': start + timedelta(days=2), 'available_slots': 10}
+    values.update(fields)
+    return Departure.objects.create(**values)
+
+class ContributionTests(SimpleTestCase):
+    def test_only_confirmed_and_completed_bookings_count(self):
+        self.assertEqual(booking_contribution('pending', 3), (0, 0))
+        self.assertEqual(booking_contribution('confirmed', 3), (1, 3))
+        self.assertEqual(booking_contribution('completed', None), (1, 0))
+
+    def test_refunds_stay_in_gross(self):
+        self.assertEqual(payment_contribution('completed', '80'), (Decimal('80'), Decimal('0')))
+        self.assertEqual(payment_contribution('refunded', '80'), (Decimal('80'), Decimal('80')))
+        self.assertEqual(payment_contribution('failed', '80'), (Decimal('0'), Decimal('0')))
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass')
+        self.customer = User.objects.create_user(username='customer', email='customer@example.com', password='pass')
+        self.business = make_business(self.owner)
+        self.package = make_package(self.owner)
+        self.departure = make_departure(self.package)
+
+    def rollup(self, **target):
+        row = DailyRollup.objects.filter(**target).first()
+        return (row.booking_count, row.headcount) if row else (0, 0)
+
+    def test_confirmed_booking_is_added_on_create(self):
+        Booking.objects.create(user=self.customer, business=self.business, number_of_people=3, status='confirmed')
+        self.assertEqual(self.rollup(business=self.business), (1, 3))
+        self.assertEqual(DailyRollup.objects.get(business=self.business).owner, self.owner)
+
+    def test_status_changes_move_the_contribution(self):
+        booking = Booking.objects.create(
+            user=self.customer, package=self.package, departure=self.departure, number_of_people=2
+        )
+        self.assertEqual(self.rollup(package=self.package), (0, 0))
+        booking.status = 'confirmed'
+        booking.save()
+        self.assertEqual(self.rollup(package=self.package), (1, 2))
+        occupancy = DepartureOccupancy.objects.get(departure=self.departure)
+        self.assertEqual((occupancy.booking_count, occupancy.headcount), (1, 2))
+        booking.status = 'cancelled'
+        booking.save()
+        self.assertEqual(self.rollup(package=self.package), (0, 0))
+
+    def test_delete_removes_the_contribution(self):
+        booking = Booking.objects.create(user=self.customer, business=self.business, number_of_people=4, status='confirmed')
+        booking.delete()
+        self.assertEqual(self.rollup(business=self.business), (0, 0))
+
+    def test_payments_add_gross_and_refunds(self):
+        booking = Booking.objects.create(user=self.customer, business=self.business, number_of_people=1)
+        payment = Payment.objects.create(booking=booking, amount=Decimal('120'), payment_method='cash', status='completed')
+        payment.status = 'refunded'
+        payment.save()
+        row = DailyRollup.objects.get(business=self.business)
+        self.assertEqual((row.gross, row.refunded, row.net), (Decimal('120'), Decimal('120'), Decimal('0')))
+
+class TargetSummaryTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass')
+        self.business = make_business(self.owner)
+        self.booking = Booking.objects.create(user=self.owner, business=self.business)
+        # Mark the stored summary so a rewrite is visible
+        Booking.objects.filter(pk=self.booking.pk).update(target_title='marker')
+
+    def stored_title(self):
+        return Booking.objects.get(pk=self.booking.pk).target_title
+
+    def test_counter_saves_leave_bookings_alone(self):
+        self.business.total_reviews = 5
+        self.business.save()
+        self.business.save(update_fields=['total_reviews'])
+        self.assertEqual(self.stored_title(), 'marker')
+
+    def test_renaming_the_target_rewrites_bookings(self):
+        self.business.name = 'Roha Lodge'
+        self.business.save()
+        self.assertEqual(self.stored_title(), 'Roha Lodge')
+
+class QuoteTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass')
+        self.package = make_package(self.owner, price=Decimal('500'), discounted_price=Decimal('450'))
+        self.departure = make_departure(self.package, price=Decimal('420.50'))
+
+    def test_unit_price_uses_positive_lower_discounts_only(self):
+        package = lambda discount: SimpleNamespace(price=Decimal('500'), discounted_price=discount)
+        self.assertEqual(package_unit_price(package(Decimal('450'))), Decimal('450'))
+        self.assertEqual(package_unit_price(package(Decimal('0'))), Decimal('500'))
+        self.assertEqual(package_unit_price(package(None)), Decimal('500'))
+        self.assertEqual(package_unit_price(package(Decimal('600'))), Decimal('500'))
+
+    def test_package_and_departure_totals(self):
+        quote = compute_quote(3, package=self.package.pk)
+        self.assertEqual((quote['unit_price'], quote['total']), ('450.00', '1350.00'))
+        quote = compute_quote(3, package=self.package.pk, departure=self.departure.pk)
+        self.assertEqual((quote['unit_price'], quote['total']), ('420.50', '1261.50'))
+
+    def test_group_size_and_business_are_rejected(self):
+        with self.assertRaises(QuoteError):
+            compute_quote(11, package=self.package.pk)
+        with self.assertRaises(QuoteError):
+            compute_quote(1, business=1)
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass')
+        self.departure = make_departure(make_package(self.owner), available_slots=4)
+
+    def slots(self):
+        self.departure.refresh_from_db()
+        return self.departure.available_slots
+
+    def test_reserve_and_release(self):
+        reserve_seats(self.departure.pk, 3)
+        self.assertEqual(self.slots(), 1)
+        release_seats(self.departure.pk, 2)
+        self.assertEqual(self.slots(), 3)
+
+    def test_oversell_is_rejected_without_taking_seats(self):
+        reserve_seats(self.departure.pk, 3)
+        with self.assertRaises(ReservationError):
+            reserve_seats(self.departure.pk, 2)
+        self.assertEqual(self.slots(), 1)
+
+class BulkBookingTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='traveller', email='traveller@example.com', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.package = make_package(self.user)
+        self.departure = make_departure(self.package, available_slots=10)
+        self.business = make_business(self.user)
+        self.url = reverse('booking:booking-bulk')
+
+    def item(self, seats):
+        return {'package': self.package.pk, 'departure': self.departure.pk, 'number_of_people': seats}
+
+    def slots(self):
+        self.departure.refresh_from_db()
+        return self.departure.available_slots
+
+    def test_batch_is_created_and_seats_reserved(self):
+        response = self.client.post(self.url, {'bookings': [
+            self.item(4), self.item(3), {'business': self.business.pk, 'number_of_people': 2},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Booking.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(self.slots(), 3)
+
+    def test_overbooked_departure_rejects_the_whole_batch(self):
+        response = self.client.post(self.url, {'bookings': [self.item(6), self.item(6)]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(self.slots(), 10)
+
+    def test_one_invalid_item_rejects_the_whole_batch(self):
+        response = self.client.post(self.url, {'bookings': [
+            self.item(2), {'business': self.business.pk + 1000, 'number_of_people': 1},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(self.slots(), 10)
+
+    def test_editing_party_size_moves_the_seat_hold(self):
+        response = self.client.post(self.url, {'bookings': [self.item(2)]}, format='json')
+        booking_id = response.data[0]['id']
+        response = self.client.patch(reverse('booking:booking-detail', args=[booking_id]),
+                                     {'number_of_people': 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.slots(), 5)
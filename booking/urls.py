@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BookingViewSet, PaymentViewSet, BookingReviewViewSet
+from .views import BookingViewSet, PaymentViewSet, BookingReviewViewSet, AnalyticsViewSet, ExportViewSet
 
 app_name = 'booking'
 
@@ -8,6 +8,8 @@ router = DefaultRouter()
 router.register(r'bookings', BookingViewSet, basename='booking')
 router.register(r'payments', PaymentViewSet, basename='payment')
 router.register(r'reviews', BookingReviewViewSet, basename='review')
+router.register(r'analytics', AnalyticsViewSet, basename='analytics')
+router.register(r'exports', ExportViewSet, basename='export')
 
 urlpatterns = [
     path('', include(router.urls)),
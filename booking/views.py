@@ -4,11 +4,22 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from .models import Booking, Payment, BookingReview
+from django.utils.dateparse import parse_date
+from django.db.models import Sum, Q
+from collections import Counter
+from datetime import timedelta
+from core.exports import stream_export
+from business.activity import record_activity
+from .models import Booking, Payment, BookingReview, DailyRollup, DepartureOccupancy
 from .serializers import (
-    BookingListSerializer, BookingCreateSerializer,
-    PaymentSerializer, BookingReviewSerializer
+    BookingListSerializer, BookingCreateSerializer, BookingSummarySerializer,
+    BulkBookingSerializer,
+    PaymentSerializer, BookingReviewSerializer,
+    QuoteRequestSerializer, QuoteSerializer,
+    DailyRollupSerializer, DepartureOccupancySerializer
 )
+from . import pricing, rollups
+from .signals import refresh_booking_counters
 from .permissions import IsBookingOwner, IsPaymentOwner, IsReviewOwner
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -18,11 +29,16 @@ class BookingViewSet(viewsets.ModelViewSet):
     serializer_class = BookingListSerializer
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user)
+        queryset = Booking.objects.filter(user=self.request.user).select_related('user')
+        if self.action == 'retrieve':
+            queryset = queryset.select_related('event', 'business', 'package', 'departure')
+        return queryset.order_by('-created_at')
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return BookingCreateSerializer
+        if self.action in ['list', 'upcoming']:
+            return BookingSummarySerializer
         return BookingListSerializer
 
     def perform_create(self, serializer):
@@ -44,7 +60,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         tags=['Booking'],
         operation_description="List all bookings",
         responses={
-            200: BookingListSerializer(many=True)
+            200: BookingSummarySerializer(many=True)
         }
     )
     def list(self, request, *args, **kwargs):
@@ -118,18 +134,61 @@ class BookingViewSet(viewsets.ModelViewSet):
         tags=['Booking'],
         operation_description="List upcoming bookings",
         responses={
-            200: BookingListSerializer(many=True)
+            200: BookingSummarySerializer(many=True)
         }
     )
     @action(detail=False, methods=['get'])
     def upcoming(self, request):
         queryset = self.get_queryset().filter(
             status='confirmed',
-            event__start_date__gt=timezone.now()
-        )
+            target_start_date__gt=timezone.now()
+        ).order_by('target_start_date')
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    @swagger_auto_schema(
+        tags=['Booking'],
+        operation_description="Price a booking and return a signed quote token to submit with the payment",
+        request_body=QuoteRequestSerializer,
+        responses={
+            200: QuoteSerializer,
+            400: "Bad Request"
+        }
+    )
+    @action(detail=False, methods=['post'])
+    def quote(self, request):
+        serializer = QuoteRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quote = serializer.validated_data['quote']
+        return Response(dict(quote, quote_token=pricing.sign_quote(quote)))
+
+    @swagger_auto_schema(
+        tags=['Booking'],
+        operation_description="Create many pending bookings in one transaction",
+        request_body=BulkBookingSerializer,
+        responses={
+            201: BookingSummarySerializer(many=True),
+            400: "Bad Request"
+        }
+    )
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        data = request.data if isinstance(request.data, dict) else {'bookings': request.data}
+        serializer = BulkBookingSerializer(data=data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        bookings = serializer.save()
+        # bulk_create skips post_save, so counters, rollups and activity are updated once per target
+        targets = serializer.validated_data['targets']
+        for event in targets['event'].values():
+            refresh_booking_counters(event=event)
+        for business in targets['business'].values():
+            refresh_booking_counters(business=business)
+        rollups.add_created_bookings(bookings)
+        per_business = Counter(booking.business_id for booking in bookings if booking.business_id)
+        for business_id, count in per_business.items():
+            record_activity(business_id, 'bookings', amount=count)
+        return Response(BookingSummarySerializer(bookings, many=True).data, status=status.HTTP_201_CREATED)
+
 class PaymentViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsPaymentOwner]
     serializer_class = PaymentSerializer
@@ -138,12 +197,8 @@ class PaymentViewSet(viewsets.ModelViewSet):
         return Payment.objects.filter(booking__user=self.request.user)
 
     def perform_create(self, serializer):
-        booking = get_object_or_404(
-            Booking,
-            id=self.request.data.get('booking'),
-            user=self.request.user
-        )
-        serializer.save(booking=booking)
+        # The serializer has already resolved the booking and checked ownership
+        serializer.save()
 
     @swagger_auto_schema(
         tags=['Booking'],
@@ -261,4 +316,194 @@ class BookingReviewViewSet(viewsets.ModelViewSet):
         review = self.get_object()
         review.reported = True
         review.save()
-        return Response({'message': 'Review reported successfully'})
\ No newline at end of file
+        return Response({'message': 'Review reported successfully'})
+
+class AnalyticsViewSet(viewsets.GenericViewSet):
+    """
+    Owner-scoped revenue and occupancy reporting served from the
+    DailyRollup and DepartureOccupancy tables.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = DailyRollupSerializer
+    pagination_class = None
+    max_range_days = 366
+
+    def get_queryset(self):
+        queryset = DailyRollup.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(owner=self.request.user)
+        return queryset
+
+    def _date_range(self, request):
+        end = parse_date(request.query_params.get('end', '')) or timezone.localdate()
+        start = parse_date(request.query_params.get('start', '')) or end - timedelta(days=29)
+        if start > end:
+            start, end = end, start
+        return max(start, end - timedelta(days=self.max_range_days - 1)), end
+
+    def _target_ids(self, request, *names):
+        """Integer business/package ids from the query string; raises ValueError on anything else."""
+        ids = {}
+        for name in names:
+            value = request.query_params.get(name)
+            if value:
+                try:
+                    ids[name] = int(value)
+                except ValueError:
+                    raise ValueError(f'{name} must be an integer.')
+        return ids
+
+    @swagger_auto_schema(
+        tags=['Booking Analytics'],
+        operation_description="Daily revenue, refunds, bookings and headcount for the current owner's businesses and packages",
+        manual_parameters=[
+            openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, description="First day (defaults to 30 days before end)"),
+            openapi.Parameter('end', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, description="Last day (defaults to today)"),
+            openapi.Parameter('business', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Restrict to one business"),
+            openapi.Parameter('package', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Restrict to one package"),
+        ],
+        responses={200: DailyRollupSerializer(many=True)}
+    )
+    def list(self, request):
+        try:
+            start, end = self._date_range(request)
+            ids = self._target_ids(request, 'business', 'package')
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.get_queryset().filter(day__gte=start, day__lte=end)
+        if 'business' in ids:
+            queryset = queryset.filter(business_id=ids['business'])
+        if 'package' in ids:
+            queryset = queryset.filter(package_id=ids['package'])
+        totals = queryset.aggregate(
+            gross=Sum('gross'), refunded=Sum('refunded'),
+            booking_count=Sum('booking_count'), headcount=Sum('headcount')
+        )
+        totals = {key: value or 0 for key, value in totals.items()}
+        totals['net'] = totals['gross'] - totals['refunded']
+        serializer = self.get_serializer(queryset.order_by('day'), many=True)
+        return Response({
+            'start': start,
+            'end': end,
+            'totals': totals,
+            'days': serializer.data
+        })
+
+    @swagger_auto_schema(
+        tags=['Booking Analytics'],
+        operation_description="Occupancy of upcoming departures for the current owner's packages",
+        responses={200: DepartureOccupancySerializer(many=True)}
+    )
+    @action(detail=False, methods=['get'])
+    def occupancy(self, request):
+        queryset = DepartureOccupancy.objects.select_related('departure').filter(
+            departure__start_date__gte=timezone.localdate()
+        )
+        if not request.user.is_staff:
+            queryset = queryset.filter(departure__package__user=request.user)
+        try:
+            ids = self._target_ids(request, 'package')
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if 'package' in ids:
+            queryset = queryset.filter(departure__package_id=ids['package'])
+        serializer = DepartureOccupancySerializer(queryset.order_by('departure__start_date'), many=True)
+        return Response(serializer.data)
+
+EXPORT_PARAMETERS = [
+    openapi.Parameter('output', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['csv', 'ndjson'], description="Export format (default csv)"),
+    openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, description="Only rows created on or after this day"),
+    openapi.Parameter('end', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, description="Only rows created on or before this day"),
+]
+
+class ExportViewSet(viewsets.ViewSet):
+    """
+    Streaming exports of the bookings and payments made on the current
+    user's businesses, packages and events.
+    """
+    permission_classes = [IsAuthenticated]
+
+    booking_columns = [
+        ('id', 'id'),
+        ('created_at', 'created_at'),
+        ('status', 'status'),
+        ('number_of_people', 'number_of_people'),
+        ('customer_email', 'user__email'),
+        ('customer_name', 'user__username'),
+        ('event_id', 'event_id'),
+        ('event', 'event__title'),
+        ('business_id', 'business_id'),
+        ('business', 'business__name'),
+        ('package_id', 'package_id'),
+        ('package', 'package__title'),
+        ('departure_date', 'departure__start_date'),
+        ('special_requests', 'special_requests'),
+    ]
+    payment_columns = [
+        ('id', 'id'),
+        ('created_at', 'created_at'),
+        ('booking_id', 'booking_id'),
+        ('amount', 'amount'),
+        ('payment_method', 'payment_method'),
+        ('status', 'status'),
+        ('transaction_id', 'transaction_id'),
+        ('customer_email', 'booking__user__email'),
+        ('event', 'booking__event__title'),
+        ('business', 'booking__business__name'),
+        ('package', 'booking__package__title'),
+    ]
+
+    def _owned(self, queryset, prefix=''):
+        user = self.request.user
+        if user.is_staff and self.request.query_params.get('all') == 'true':
+            return queryset
+        return queryset.filter(
+            Q(**{f'{prefix}business__owner': user}) |
+            Q(**{f'{prefix}package__user': user}) |
+            Q(**{f'{prefix}event__organizer': user})
+        )
+
+    def _date_filtered(self, queryset):
+        start = parse_date(self.request.query_params.get('start', ''))
+        end = parse_date(self.request.query_params.get('end', ''))
+        if start:
+            queryset = queryset.filter(created_at__date__gte=start)
+        if end:
+            queryset = queryset.filter(created_at__date__lte=end)
+        return queryset
+
+    @swagger_auto_schema(
+        tags=['Booking Exports'],
+        operation_description="Stream bookings on the current user's businesses, packages and events",
+        manual_parameters=EXPORT_PARAMETERS + [
+            openapi.Parameter('status', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Filter by booking status"),
+        ],
+        responses={200: "CSV or NDJSON stream"}
+    )
+    @action(detail=False, methods=['get'])
+    def bookings(self, request):
+        queryset = self._date_filtered(self._owned(Booking.objects.all()))
+        if request.query_params.get('status'):
+            queryset = queryset.filter(status=request.query_params['status'])
+        return stream_export(
+            queryset.order_by('created_at'), self.booking_columns,
+            'bookings', request.query_params.get('output', 'csv')
+        )
+
+    @swagger_auto_schema(
+        tags=['Booking Exports'],
+        operation_description="Stream payments for bookings on the current user's businesses, packages and events",
+        manual_parameters=EXPORT_PARAMETERS + [
+            openapi.Parameter('status', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Filter by payment status"),
+        ],
+        responses={200: "CSV or NDJSON stream"}
+    )
+    @action(detail=False, methods=['get'])
+    def payments(self, request):
+        queryset = self._date_filtered(self._owned(Payment.objects.all(), prefix='booking__'))
+        if request.query_params.get('status'):
+            queryset = queryset.filter(status=request.query_params['status'])
+        return stream_export(
+            queryset.order_by('created_at'), self.payment_columns,
+            'payments', request.query_params.get('output', 'csv')
+        )
@@ -0,0 +1,104 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import BusinessActivityHour, BusinessActivityBucket
+
+ACTIVITY_METRICS = ('views', 'saves', 'reviews', 'bookings')
+MAX_DASHBOARD_DAYS = 366
+
+def current_hour(moment=None):
+    moment = timezone.localtime(moment or timezone.now())
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def record_activity(business_id, metric, amount=1, moment=None):
+    """Add to the hourly buffer for a business. Cheap enough to call inline from views and signals."""
+    if not business_id or metric not in ACTIVITY_METRICS:
+        return
+    hour = current_hour(moment)
+    updated = BusinessActivityHour.objects.filter(business_id=business_id, hour=hour).update(
+        **{metric: F(metric) + amount}
+    )
+    if not updated:
+        row, created = BusinessActivityHour.objects.get_or_create(
+            business_id=business_id, hour=hour, defaults={metric: amount}
+        )
+        if not created:
+            BusinessActivityHour.objects.filter(pk=row.pk).update(**{metric: F(metric) + amount})
+
+def _add_to_bucket(business_id, period, start, counts):
+    counts = {metric: value for metric, value in counts.items() if value}
+    if not counts:
+        return
+    lookup = {'business_id': business_id, 'period': period, 'start': start}
+    if not BusinessActivityBucket.objects.filter(**lookup).update(
+        **{metric: F(metric) + value for metric, value in counts.items()}
+    ):
+        BusinessActivityBucket.objects.create(**lookup, **counts)
+
+def compact_activity(before=None):
+    """
+    Fold closed hourly rows (those before the current hour) into day and
+    month buckets and delete them. Returns the number of hourly rows folded.
+    """
+    before = before or current_hour()
+    hours = BusinessActivityHour.objects.filter(hour__lt=before)
+    days = defaultdict(lambda: dict.fromkeys(ACTIVITY_METRICS, 0))
+    compacted = []
+    for row in hours.values('pk', 'business_id', 'hour', *ACTIVITY_METRICS).iterator():
+        day = timezone.localdate(row['hour'])
+        counts = days[(row['business_id'], day)]
+        for metric in ACTIVITY_METRICS:
+            counts[metric] += row[metric]
+        compacted.append(row['pk'])
+    if not compacted:
+        return 0
+
+    months = defaultdict(lambda: dict.fromkeys(ACTIVITY_METRICS, 0))
+    for (business_id, day), counts in days.items():
+        month = months[(business_id, day.replace(day=1))]
+        for metric in ACTIVITY_METRICS:
+            month[metric] += counts[metric]
+    with transaction.atomic():
+        for (business_id, day), counts in days.items():
+            _add_to_bucket(business_id, 'day', day, counts)
+        for (business_id, month), counts in months.items():
+            _add_to_bucket(business_id, 'month', month, counts)
+        for offset in range(0, len(compacted), 1000):
+            BusinessActivityHour.objects.filter(pk__in=compacted[offset:offset + 1000]).delete()
+    return len(compacted)
+
+def activity_trend(business_id, days=90):
+    """
+    Daily series for the last `days` days, read from the day buckets plus
+    whatever is still waiting in the hourly buffer.
+    """
+    end = timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    series = {start + timedelta(days=offset): dict.fromkeys(ACTIVITY_METRICS, 0) for offset in range(days)}
+    buckets = BusinessActivityBucket.objects.filter(
+        business_id=business_id, period='day', start__gte=start, start__lte=end
+    ).values('start', *ACTIVITY_METRICS)
+    for row in buckets:
+        for metric in ACTIVITY_METRICS:
+            series[row['start']][metric] += row[metric]
+    pending = BusinessActivityHour.objects.filter(business_id=business_id).values('hour', *ACTIVITY_METRICS)
+    for row in pending:
+        day = timezone.localdate(row['hour'])
+        if day in series:
+            for metric in ACTIVITY_METRICS:
+                series[day][metric] += row[metric]
+    totals = {metric: sum(values[metric] for values in series.values()) for metric in ACTIVITY_METRICS}
+    return {
+        'start': start,
+        'end': end,
+        'totals': totals,
+        'days': [dict(date=day, **values) for day, values in sorted(series.items())],
+    }
+
+def monthly_activity(business_id, months=12):
+    rows = BusinessActivityBucket.objects.filter(
+        business_id=business_id, period='month'
+    ).order_by('-start').values('start', *ACTIVITY_METRICS)[:months]
+    return [dict(month=row.pop('start'), **row) for row in reversed(list(rows))]
@@ -1,12 +1,12 @@
 from django.contrib import admin
-from .models import Business, BusinessReview, SavedBusiness
+from .models import Business, BusinessReview, SavedBusiness, BusinessActivityBucket
 
 @admin.register(Business)
 class BusinessAdmin(admin.ModelAdmin):
     list_display = ('name', 'business_type', 'region', 'city', 'status', 'is_verified', 'is_featured')
     list_filter = ('status', 'is_verified', 'is_featured', 'business_type', 'region', 'city')
     search_fields = ('name', 'description', 'contact_email', 'contact_phone')
-    readonly_fields = ('slug', 'average_rating', 'total_reviews')
+    readonly_fields = ('slug', 'average_rating', 'total_reviews', 'opening_intervals')
     fieldsets = (
         ('Basic Information', {
             'fields': ('name', 'slug', 'business_type', 'description', 'contact_email', 'contact_phone', 'website')
@@ -21,7 +21,7 @@ class BusinessAdmin(admin.ModelAdmin):
             'fields': ('social_media_links',)
         }),
         ('Operational Details', {
-            'fields': ('opening_hours', 'facilities', 'services', 'team')
+            'fields': ('opening_hours', 'opening_intervals', 'facilities', 'services', 'team')
         }),
         ('Status', {
             'fields': ('status', 'is_verified', 'is_featured', 'verification_date')
@@ -48,4 +48,10 @@ class BusinessReviewAdmin(admin.ModelAdmin):
 class SavedBusinessAdmin(admin.ModelAdmin):
     list_display = ('user', 'business', 'saved_at')
     list_filter = ('saved_at',)
-    search_fields = ('user__username', 'business__name') 
\ No newline at end of file
+    search_fields = ('user__username', 'business__name') 
+
+@admin.register(BusinessActivityBucket)
+class BusinessActivityBucketAdmin(admin.ModelAdmin):
+    list_display = ('business', 'period', 'start', 'views', 'saves', 'reviews', 'bookings')
+    list_filter = ('period',)
+    search_fields = ('business__name',)
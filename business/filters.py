@@ -0,0 +1,46 @@
+from django_filters import rest_framework as filters
+from .models import Business, BusinessOpeningBucket
+from .hours import BUCKET_MINUTES, minute_of_week
+
+class BusinessFilter(filters.FilterSet):
+    """
+    Filters are exact matches on indexed columns, declared in the order of the
+    compound indexes in Business.Meta (region/city, business_type, status), so
+    each combination is served by the index with the longest matching prefix.
+    """
+    region = filters.CharFilter()
+    city = filters.CharFilter()
+    business_type = filters.CharFilter()
+    status = filters.ChoiceFilter(choices=Business.STATUS_CHOICES)
+    is_featured = filters.BooleanFilter()
+    is_verified = filters.BooleanFilter()
+    open_at = filters.IsoDateTimeFilter(method='filter_open_at')
+    open_now = filters.BooleanFilter(method='filter_open_now')
+    order_by = filters.OrderingFilter(
+        fields=(
+            ('average_rating', 'rating'),
+            ('created_at', 'date'),
+            ('name', 'name'),
+        )
+    )
+
+    def _open_at_minute(self, queryset, minute):
+        open_ids = BusinessOpeningBucket.objects.filter(
+            bucket=minute // BUCKET_MINUTES, start_minute__lte=minute, end_minute__gt=minute
+        ).values_list('business_id', flat=True)
+        return queryset.filter(id__in=list(open_ids))
+
+    def filter_open_at(self, queryset, name, value):
+        if value is None:
+            return queryset
+        return self._open_at_minute(queryset, minute_of_week(value))
+
+    def filter_open_now(self, queryset, name, value):
+        if not value:
+            return queryset
+        return self._open_at_minute(queryset, minute_of_week())
+
+    class Meta:
+        model = Business
+        fields = ['region', 'city', 'business_type', 'status', 'is_featured', 'is_verified']
+
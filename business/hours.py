@@ -0,0 +1,142 @@
+import re
+import pytz
+from django.utils import timezone
+
+# Opening hours are interpreted in local Ethiopian time
+BUSINESS_TIMEZONE = pytz.timezone('Africa/Addis_Ababa')
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+BUCKET_MINUTES = 60
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+DAY_ALIASES = {day[:3]: index for index, day in enumerate(DAYS)}
+DAY_ALIASES.update({day: index for index, day in enumerate(DAYS)})
+DAY_ALIASES.update({'tues': 1, 'wed': 2, 'thur': 3, 'thurs': 3})
+
+CLOSED_VALUES = {'', 'closed', 'close', 'none', 'n/a', '-'}
+OPEN_ALL_DAY_VALUES = {'24h', '24 hours', '24/7', 'open 24 hours', 'always open'}
+TIME_RANGE = re.compile(
+    r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*(?:-|–|to)\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?',
+    re.IGNORECASE
+)
+
+def _minutes(hour, minute, meridiem):
+    hour, minute = int(hour), int(minute or 0)
+    if meridiem:
+        meridiem = meridiem.lower()
+        if meridiem == 'pm' and hour < 12:
+            hour += 12
+        elif meridiem == 'am' and hour == 12:
+            hour = 0
+    if hour > 24 or minute > 59:
+        raise ValueError('Invalid time')
+    return min(hour * 60 + minute, MINUTES_PER_DAY)
+
+def _day_ranges(value):
+    """Parse one day's value into (open, close) minute pairs within that day."""
+    if value is None or value is False:
+        return []
+    if isinstance(value, dict):
+        if value.get('closed') or value.get('is_closed'):
+            return []
+        opens = value.get('open') or value.get('opens') or value.get('from') or value.get('start')
+        closes = value.get('close') or value.get('closes') or value.get('to') or value.get('end')
+        if opens and closes:
+            return _day_ranges(f'{opens}-{closes}')
+        return []
+    if isinstance(value, (list, tuple)):
+        ranges = []
+        for part in value:
+            ranges.extend(_day_ranges(part))
+        return ranges
+    text = str(value).strip().lower()
+    if text in CLOSED_VALUES:
+        return []
+    if text in OPEN_ALL_DAY_VALUES:
+        return [(0, MINUTES_PER_DAY)]
+    ranges = []
+    for match in TIME_RANGE.finditer(text):
+        try:
+            end = _minutes(match.group(4), match.group(5), match.group(6))
+            start = _minutes(match.group(1), match.group(2), match.group(3))
+            if not match.group(3) and match.group(6):
+                # '1-5pm' shares the end's meridiem; '9-5pm' and '11-1pm' start in the morning
+                borrowed = _minutes(match.group(1), match.group(2), match.group(6))
+                if borrowed < end:
+                    start = borrowed
+        except ValueError:
+            continue
+        ranges.append((start, end))
+    return ranges
+
+def _day_indexes(key):
+    """Map a key such as 'monday', 'mon-fri' or 'weekends' to day indexes."""
+    key = str(key).strip().lower()
+    if key in ('daily', 'everyday', 'every day', 'all'):
+        return list(range(7))
+    if key in ('weekdays',):
+        return list(range(5))
+    if key in ('weekend', 'weekends'):
+        return [5, 6]
+    if '-' in key:
+        first, _, last = key.partition('-')
+        first, last = DAY_ALIASES.get(first.strip()), DAY_ALIASES.get(last.strip())
+        if first is None or last is None:
+            return []
+        return [(first + offset) % 7 for offset in range((last - first) % 7 + 1)]
+    index = DAY_ALIASES.get(key)
+    return [] if index is None else [index]
+
+def normalize_opening_hours(opening_hours):
+    """
+    Convert free-form opening hours into sorted, merged [start, end) minute
+    intervals within the week, where minute 0 is Monday 00:00 local time.
+    Ranges that close after midnight continue into the next day, and Sunday
+    night ranges wrap around to Monday morning.
+    """
+    if not isinstance(opening_hours, dict):
+        return []
+    intervals = []
+    for key, value in opening_hours.items():
+        for day in _day_indexes(key):
+            for start, end in _day_ranges(value):
+                start += day * MINUTES_PER_DAY
+                end += day * MINUTES_PER_DAY
+                if end <= start:
+                    end += MINUTES_PER_DAY
+                if end > MINUTES_PER_WEEK:
+                    intervals.append([0, end - MINUTES_PER_WEEK])
+                    end = MINUTES_PER_WEEK
+                intervals.append([start, end])
+    intervals.sort()
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def interval_buckets(intervals):
+    """
+    Split intervals at bucket boundaries, yielding (bucket, start, end) so
+    that every piece lies inside a single BUCKET_MINUTES bucket.
+    """
+    for start, end in intervals:
+        while start < end:
+            bucket = start // BUCKET_MINUTES
+            piece_end = min(end, (bucket + 1) * BUCKET_MINUTES)
+            yield bucket, start, piece_end
+            start = piece_end
+
+def minute_of_week(moment=None):
+    """Minute of the week in Addis Ababa time for an aware datetime (default: now)."""
+    moment = moment or timezone.now()
+    if timezone.is_naive(moment):
+        moment = BUSINESS_TIMEZONE.localize(moment)
+    local = moment.astimezone(BUSINESS_TIMEZONE)
+    return local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+def is_open(intervals, minute):
+    return any(start <= minute < end for start, end in intervals)
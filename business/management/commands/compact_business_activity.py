@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from business.activity import compact_activity
+
+class Command(BaseCommand):
+    help = 'Fold closed hourly business activity rows into daily and monthly buckets'
+
+    def handle(self, *args, **options):
+        compacted = compact_activity()
+        self.stdout.write(self.style.SUCCESS(f'Compacted {compacted} hourly activity rows'))
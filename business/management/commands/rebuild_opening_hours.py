@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from business.hours import normalize_opening_hours
+from business.models import Business
+from business.signals import rebuild_opening_buckets
+
+class Command(BaseCommand):
+    help = 'Normalize opening hours for every business and rebuild the open-at bucket index'
+
+    def handle(self, *args, **options):
+        rebuilt = 0
+        for business in Business.objects.only('id', 'opening_hours', 'opening_intervals').iterator():
+            business.opening_intervals = normalize_opening_hours(business.opening_hours)
+            Business.objects.filter(pk=business.pk).update(opening_intervals=business.opening_intervals)
+            rebuild_opening_buckets(business)
+            rebuilt += 1
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt opening hours for {rebuilt} businesses'))
@@ -4,10 +4,12 @@ from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import json
+from core.ratings import RatingHistogramMixin
+from .hours import normalize_opening_hours
 
 User = get_user_model()
 
-class Business(models.Model):
+class Business(RatingHistogramMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('approved', 'Approved'),
@@ -33,12 +35,16 @@ class Business(models.Model):
     # Multimedia
     main_image = models.URLField(max_length=500)
     gallery_images = models.JSONField(default=list, blank=True)
+    # Responsive variants keyed by original image URL, filled in by uploads.tasks.process_image
+    image_variants = models.JSONField(default=dict, blank=True)
 
     # Social Media
     social_media_links = models.JSONField(default=dict, blank=True)
 
     # Operational Details
     opening_hours = models.JSONField(default=dict, blank=True)
+    # Merged [start, end) minute-of-week intervals derived from opening_hours
+    opening_intervals = models.JSONField(default=list, blank=True, editable=False)
     facilities = models.JSONField(default=list, blank=True)
     services = models.JSONField(default=list, blank=True)
     team = models.JSONField(default=list, blank=True)
@@ -70,16 +76,44 @@ class Business(models.Model):
             models.Index(fields=['city']),
             models.Index(fields=['status']),
             models.Index(fields=['is_featured']),
+            models.Index(fields=['region', 'business_type', 'status']),
+            models.Index(fields=['city', 'business_type', 'status']),
+            models.Index(fields=['status', 'average_rating']),
+            models.Index(fields=['status', 'created_at']),
         ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        intervals = normalize_opening_hours(self.opening_hours)
+        # Read by the post_save signal to decide whether the bucket index needs rebuilding
+        self._opening_intervals_changed = intervals != self.opening_intervals
+        self.opening_intervals = intervals
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
 
+class BusinessOpeningBucket(models.Model):
+    """
+    One piece of a business's opening intervals, cut at hour boundaries.
+    "Open at minute m" is an equality lookup on bucket=m // 60 plus a range
+    check on start/end, answered from the (bucket, start_minute) index.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='opening_buckets')
+    bucket = models.PositiveSmallIntegerField()
+    start_minute = models.PositiveIntegerField()
+    end_minute = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['bucket', 'start_minute', 'end_minute']),
+            models.Index(fields=['business']),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} open {self.start_minute}-{self.end_minute}"
+
 class BusinessReview(models.Model):
     business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='reviews')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='business_reviews')
@@ -129,4 +163,50 @@ class SavedBusiness(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.user.username} saved {self.business.name}" 
\ No newline at end of file
+        return f"{self.user.username} saved {self.business.name}" 
+
+class BusinessActivityHour(models.Model):
+    """
+    Write buffer for owner analytics: one row per business per hour, bumped
+    with F() increments as interactions happen and folded into
+    BusinessActivityBucket by the compaction job once the hour has closed.
+    """
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='activity_hours')
+    hour = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    saves = models.PositiveIntegerField(default=0)
+    reviews = models.PositiveIntegerField(default=0)
+    bookings = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('business', 'hour')
+        indexes = [
+            models.Index(fields=['hour']),
+            models.Index(fields=['business', 'hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} @ {self.hour:%Y-%m-%d %H:00}"
+
+class BusinessActivityBucket(models.Model):
+    PERIOD_CHOICES = [
+        ('day', 'Day'),
+        ('month', 'Month'),
+    ]
+
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='activity_buckets')
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    start = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    saves = models.PositiveIntegerField(default=0)
+    reviews = models.PositiveIntegerField(default=0)
+    bookings = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('business', 'period', 'start')
+        indexes = [
+            models.Index(fields=['business', 'period', 'start']),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} {self.period} {self.start}"
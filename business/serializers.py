@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from rest_framework.reverse import reverse
+from core.reviews import EMBEDDED_REVIEW_LIMIT, recent_reviews
 from .models import Business, BusinessReview, SavedBusiness
 from django.contrib.auth import get_user_model
 
@@ -20,32 +22,48 @@ class BusinessReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'helpful_votes', 'is_reported', 'report_reason']
 
 class BusinessListSerializer(serializers.ModelSerializer):
+    rating_histogram = serializers.ReadOnlyField()
+
     class Meta:
         model = Business
         fields = [
             'id', 'name', 'slug', 'business_type', 'description',
             'contact_email', 'contact_phone', 'website', 'region', 'city',
-            'address', 'latitude', 'longitude', 'main_image', 'gallery_images',
+            'address', 'latitude', 'longitude', 'main_image', 'gallery_images', 'image_variants',
             'social_media_links', 'opening_hours', 'facilities', 'services',
             'team', 'status', 'is_verified', 'is_featured', 'verification_date',
-            'average_rating', 'total_reviews', 'created_at', 'updated_at'
+            'average_rating', 'total_reviews', 'rating_histogram', 'created_at', 'updated_at'
         ]
 
 class BusinessDetailSerializer(serializers.ModelSerializer):
-    reviews = BusinessReviewSerializer(many=True, read_only=True)
+    """
+    Embeds only the latest reviews so the payload stays the same size however
+    many reviews a business collects; the full list is at reviews_url.
+    """
+    reviews = serializers.SerializerMethodField()
+    rating_histogram = serializers.ReadOnlyField()
+    reviews_url = serializers.SerializerMethodField()
     owner = UserSerializer(read_only=True)
     
     class Meta:
         model = Business
         fields = ['id', 'name', 'slug', 'business_type', 'description',
                  'contact_email', 'contact_phone', 'website', 'region', 'city',
-                 'address', 'latitude', 'longitude', 'main_image', 'gallery_images',
+                 'address', 'latitude', 'longitude', 'main_image', 'gallery_images', 'image_variants',
                  'social_media_links', 'opening_hours', 'facilities', 'services',
                  'team', 'status', 'is_verified', 'is_featured', 'verification_date',
                  'average_rating', 'total_reviews', 'additional_data', 'created_at',
-                 'updated_at', 'owner', 'reviews']
+                 'updated_at', 'owner', 'reviews', 'rating_histogram', 'reviews_url']
         read_only_fields = ['slug', 'status', 'is_verified', 'is_featured',
-                           'verification_date', 'average_rating', 'total_reviews']
+                           'verification_date', 'average_rating', 'total_reviews', 'image_variants']
+
+    def get_reviews(self, obj):
+        reviews = recent_reviews(obj.reviews.all(), EMBEDDED_REVIEW_LIMIT)
+        return BusinessReviewSerializer(reviews, many=True, context=self.context).data
+
+    def get_reviews_url(self, obj):
+        return reverse('business:business-review-list', kwargs={'business_pk': obj.pk},
+                       request=self.context.get('request'))
 
 class BusinessCreateSerializer(serializers.ModelSerializer):
     business_name = serializers.CharField(source='name', required=True)
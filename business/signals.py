@@ -1,6 +1,10 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import Business, BusinessReview
+from core.ratings import snapshot_review, apply_review_change, remove_review
+from geo.index import sync_instance, remove_point
+from .models import Business, BusinessReview, BusinessOpeningBucket, SavedBusiness
+from .activity import record_activity
+from .hours import interval_buckets
 
 @receiver([post_save, post_delete], sender=BusinessReview)
 def update_business_rating(sender, instance, **kwargs):
@@ -19,4 +23,55 @@ def update_business_rating(sender, instance, **kwargs):
         business.average_rating = 0
         business.total_reviews = 0
     
-    business.save() 
\ No newline at end of file
+    business.save() 
+
+def rebuild_opening_buckets(business):
+    BusinessOpeningBucket.objects.filter(business=business).delete()
+    BusinessOpeningBucket.objects.bulk_create([
+        BusinessOpeningBucket(business=business, bucket=bucket, start_minute=start, end_minute=end)
+        for bucket, start, end in interval_buckets(business.opening_intervals)
+    ])
+
+@receiver(post_save, sender=Business)
+def update_opening_buckets(sender, instance, created, **kwargs):
+    """
+    Keep the opening-hours bucket index in step with opening_intervals. Saves
+    that leave the hours untouched (e.g. rating updates) skip the rebuild.
+    """
+    if created or getattr(instance, '_opening_intervals_changed', True):
+        rebuild_opening_buckets(instance)
+
+@receiver(post_save, sender=Business)
+def index_business_on_map(sender, instance, **kwargs):
+    sync_instance('business', instance)
+
+@receiver(post_delete, sender=Business)
+def remove_business_from_map(sender, instance, **kwargs):
+    remove_point('business', instance.pk)
+
+@receiver(pre_save, sender=BusinessReview)
+def snapshot_business_review_rating(sender, instance, **kwargs):
+    snapshot_review(instance, 'business')
+
+@receiver(post_save, sender=BusinessReview)
+def update_business_rating_histogram(sender, instance, **kwargs):
+    apply_review_change(instance, Business, 'business')
+
+@receiver(post_delete, sender=BusinessReview)
+def update_business_rating_histogram_on_delete(sender, instance, **kwargs):
+    remove_review(instance, Business, 'business')
+
+@receiver(post_save, sender=SavedBusiness)
+def record_business_save(sender, instance, created, **kwargs):
+    if created:
+        record_activity(instance.business_id, 'saves')
+
+@receiver(post_save, sender=BusinessReview)
+def record_business_review(sender, instance, created, **kwargs):
+    if created:
+        record_activity(instance.business_id, 'reviews')
+
+@receiver(post_save, sender='booking.Booking')
+def record_business_booking(sender, instance, created, **kwargs):
+    if created and instance.business_id:
+        record_activity(instance.business_id, 'bookings')
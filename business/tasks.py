@@ -0,0 +1,7 @@
+from celery import shared_task
+from .activity import compact_activity
+
+@shared_task
+def compact_business_activity():
+    """Fold closed hours of business activity into day and month buckets."""
+    return compact_activity()
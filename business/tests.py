@@ -0,0 +1,41 @@
+from datetime import datetime
+from django.test import SimpleTestCase
+from .hours import (
+    BUSINESS_TIMEZONE, MINUTES_PER_DAY, MINUTES_PER_WEEK,
+    normalize_opening_hours, interval_buckets, minute_of_week, is_open
+)
+import pytz
+
+class OpeningHoursTests(SimpleTestCase):
+    def test_day_ranges_and_closed_days(self):
+        intervals = normalize_opening_hours({
+            'mon-fri': '08:00-17:30',
+            'saturday': {'open': '9:00', 'close': '13:00'},
+            'sunday': 'Closed',
+        })
+        self.assertEqual(intervals[0], [8 * 60, 17 * 60 + 30])
+        self.assertEqual(len(intervals), 6)
+        self.assertEqual(intervals[-1], [5 * MINUTES_PER_DAY + 9 * 60, 5 * MINUTES_PER_DAY + 13 * 60])
+
+    def test_start_borrows_end_meridiem_only_when_it_precedes_the_end(self):
+        self.assertEqual(normalize_opening_hours({'monday': '9-5pm'}), [[9 * 60, 17 * 60]])
+        self.assertEqual(normalize_opening_hours({'monday': '11-1pm'}), [[11 * 60, 13 * 60]])
+        self.assertEqual(normalize_opening_hours({'monday': '1-5pm'}), [[13 * 60, 17 * 60]])
+
+    def test_overnight_range_wraps_into_monday(self):
+        intervals = normalize_opening_hours({'sunday': '8pm-2am'})
+        self.assertEqual(intervals, [[0, 120], [6 * MINUTES_PER_DAY + 20 * 60, MINUTES_PER_WEEK]])
+
+    def test_adjacent_days_are_merged(self):
+        self.assertEqual(normalize_opening_hours({'daily': '24h'}), [[0, MINUTES_PER_WEEK]])
+
+    def test_buckets_stay_within_an_hour(self):
+        pieces = list(interval_buckets([[90, 200]]))
+        self.assertEqual(pieces, [(1, 90, 120), (2, 120, 180), (3, 180, 200)])
+
+    def test_minute_of_week_uses_addis_ababa_time(self):
+        # Monday 06:30 UTC is 09:30 in Addis Ababa
+        moment = pytz.utc.localize(datetime(2024, 1, 1, 6, 30))
+        self.assertEqual(minute_of_week(moment), 9 * 60 + 30)
+        local = BUSINESS_TIMEZONE.localize(datetime(2024, 1, 1, 9, 30))
+        self.assertTrue(is_open([[9 * 60, 10 * 60]], minute_of_week(local)))
@@ -26,6 +26,7 @@ urlpatterns = [
     path('businesses/my-businesses/', BusinessViewSet.as_view({'get': 'my_businesses'}), name='my-businesses'),
     path('businesses/<int:pk>/toggle-featured/', BusinessViewSet.as_view({'post': 'toggle_featured'}), name='business-toggle-featured'),
     path('businesses/<int:pk>/verify/', BusinessViewSet.as_view({'post': 'verify'}), name='business-verify'),
+    path('businesses/<int:pk>/analytics/', BusinessViewSet.as_view({'get': 'analytics'}), name='business-analytics'),
     
     # Business reviews
     path('businesses/<int:business_pk>/reviews/', BusinessReviewViewSet.as_view({
@@ -62,6 +63,7 @@ urlpatterns = [
 # GET /api/business/businesses/my_businesses/ - List user's businesses
 # POST /api/business/businesses/{id}/toggle_featured/ - Toggle featured status (admin only)
 # POST /api/business/businesses/{id}/verify/ - Verify a business (admin only)
+# GET /api/business/businesses/{id}/analytics/ - Views, saves, reviews and bookings over time (owner only)
 # GET /api/business/businesses/{business_pk}/reviews/ - List reviews for a business
 # POST /api/business/businesses/{business_pk}/reviews/ - Create a review for a business
 # GET /api/business/businesses/{business_pk}/reviews/{id}/ - Retrieve a specific review
@@ -1,9 +1,12 @@
-from rest_framework import viewsets, status, permissions
+from rest_framework import viewsets, status, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
+from django_filters.rest_framework import DjangoFilterBackend
 from .models import Business, BusinessReview, SavedBusiness
+from .filters import BusinessFilter
+from .activity import MAX_DASHBOARD_DAYS, activity_trend, monthly_activity, record_activity
 from .serializers import (
     BusinessListSerializer, BusinessDetailSerializer, BusinessCreateSerializer,
     BusinessReviewSerializer, BusinessReviewCreateSerializer, SavedBusinessSerializer
@@ -26,6 +29,22 @@ class IsAdminOrReadOnly(permissions.BasePermission):
 class BusinessViewSet(viewsets.ModelViewSet):
     queryset = Business.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filterset_class = BusinessFilter
+    search_fields = ['name', 'description']
+
+    def get_queryset(self):
+        # Only approved businesses are public; owners also see their own pending/rejected ones
+        queryset = self.queryset
+        user = self.request.user
+        if not user.is_staff:
+            visible = Q(status='approved')
+            if user.is_authenticated:
+                visible |= Q(owner=user)
+            queryset = queryset.filter(visible)
+        if self.action in ['retrieve', 'update', 'partial_update']:
+            queryset = queryset.select_related('owner')
+        return queryset.order_by('-created_at')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -84,7 +103,9 @@ class BusinessViewSet(viewsets.ModelViewSet):
             openapi.Parameter('region', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Filter by region"),
             openapi.Parameter('city', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Filter by city"),
             openapi.Parameter('search', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Search by name or description"),
-            openapi.Parameter('order_by', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Order by rating or date")
+            openapi.Parameter('open_at', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME, description="Only businesses open at this ISO datetime (Addis Ababa time if no offset is given)"),
+            openapi.Parameter('open_now', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, description="Only businesses open right now"),
+            openapi.Parameter('order_by', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Order by rating, date or name (prefix with - for descending)")
         ],
         responses={
             200: BusinessListSerializer(many=True)
@@ -102,7 +123,10 @@ class BusinessViewSet(viewsets.ModelViewSet):
         }
     )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        response = super().retrieve(request, *args, **kwargs)
+        if (response.data.get('owner') or {}).get('id') != request.user.pk:
+            record_activity(response.data['id'], 'views')
+        return response
 
     @swagger_auto_schema(
         tags=['Business'],
@@ -154,6 +178,32 @@ class BusinessViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(my_businesses, many=True)
         return Response(serializer.data)
 
+    @swagger_auto_schema(
+        tags=['Business'],
+        operation_description="Owner dashboard: daily views, saves, reviews and bookings for the last N days "
+                              "plus monthly totals, read from pre-aggregated buckets",
+        manual_parameters=[
+            openapi.Parameter('days', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Days to cover (default 90, max 366)"),
+            openapi.Parameter('months', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Monthly buckets to include (default 12)")
+        ],
+        responses={200: "Activity trend", 403: "Forbidden"}
+    )
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def analytics(self, request, pk=None):
+        business = self.get_object()
+        if business.owner_id != request.user.pk and not request.user.is_staff:
+            return Response({'error': 'Only the owner can view business analytics'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            days = int(request.query_params.get('days', 90))
+            months = int(request.query_params.get('months', 12))
+        except ValueError:
+            return Response({'error': 'days and months must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= days <= MAX_DASHBOARD_DAYS or not 1 <= months <= 120:
+            return Response({'error': f'days must be between 1 and {MAX_DASHBOARD_DAYS}'}, status=status.HTTP_400_BAD_REQUEST)
+        trend = activity_trend(business.pk, days)
+        trend['months'] = monthly_activity(business.pk, months)
+        return Response(trend)
+
     @swagger_auto_schema(
         tags=['Business'],
         operation_description="Toggle business featured status",
@@ -215,7 +265,9 @@ class BusinessReviewViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        return BusinessReview.objects.filter(business_id=self.kwargs['business_pk'])
+        return BusinessReview.objects.filter(
+            business_id=self.kwargs['business_pk']
+        ).select_related('user').order_by('-created_at')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -0,0 +1,26 @@
+import hashlib
+from django.db.models import Count, Max
+from rest_framework import status
+from rest_framework.response import Response
+
+def make_etag(*parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+def queryset_etag(queryset, *parts, field='updated_at'):
+    """
+    Weak ETag for a list response: one aggregate over the filtered queryset
+    (row count and latest modification) plus whatever else shapes the
+    payload, such as the query string. Adds, edits and deletes all change it.
+    """
+    state = queryset.order_by().aggregate(count=Count('pk'), latest=Max(field))
+    return make_etag(state['count'], state['latest'], *parts)
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    return etag in [tag.strip() for tag in header.split(',')] or header.strip() == '*'
+
+def not_modified(etag):
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response['ETag'] = etag
+    return response
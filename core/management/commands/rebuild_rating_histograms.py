@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from business.models import Business, BusinessReview
+from core.ratings import rebuild_histograms
+from destinations.models import Destination, DestinationReview
+from events.models import Event, EventReview
+from packages.models import Package, PackageReview
+
+# label: (reviewed model, review model, review foreign key)
+HISTOGRAMS = {
+    'events': (Event, EventReview, 'event'),
+    'destinations': (Destination, DestinationReview, 'destination'),
+    'packages': (Package, PackageReview, 'package'),
+    'businesses': (Business, BusinessReview, 'business'),
+}
+
+class Command(BaseCommand):
+    help = 'Recompute the per-entity star-rating histograms from the reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only report entities whose counters differ from their reviews')
+        parser.add_argument('--only', choices=sorted(HISTOGRAMS), action='append',
+                            help='Limit to one kind of entity (repeatable)')
+
+    def handle(self, *args, **options):
+        check_only = options['check']
+        drifted_total = 0
+        for label in options['only'] or HISTOGRAMS:
+            parent_model, review_model, parent_field = HISTOGRAMS[label]
+            drifted = rebuild_histograms(parent_model, review_model, parent_field, check_only=check_only)
+            drifted_total += len(drifted)
+            verb = 'out of sync' if check_only else 'fixed'
+            self.stdout.write(f'{label}: {len(drifted)} {verb}')
+            if check_only and drifted:
+                self.stdout.write(f"  ids: {', '.join(str(pk) for pk in drifted[:50])}")
+        if check_only and drifted_total:
+            raise CommandError(f'{drifted_total} rating histograms are out of sync')
+        self.stdout.write(self.style.SUCCESS('Rating histograms are consistent'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from blog.related import refresh_related_posts
+from destinations.related import refresh_related_destinations
+
+JOBS = {
+    'posts': refresh_related_posts,
+    'destinations': refresh_related_destinations,
+}
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed related-items lists for blog posts and destinations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every list, not just the affected ones')
+        parser.add_argument('--only', choices=sorted(JOBS), action='append')
+
+    def handle(self, *args, **options):
+        for label in options['only'] or JOBS:
+            rewritten, removed = JOBS[label](full=options['full'])
+            self.stdout.write(f'{label}: {rewritten} lists rewritten, {removed} removed')
+        self.stdout.write(self.style.SUCCESS('Related items are up to date'))
@@ -0,0 +1,105 @@
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import models
+from django.db.models import Count, F
+
+RATING_LEVELS = (1, 2, 3, 4, 5)
+HISTOGRAM_FIELDS = tuple(f'rating_{level}_count' for level in RATING_LEVELS)
+
+class RatingHistogramMixin(models.Model):
+    """
+    Five review counters, one per star level, kept up to date by deltas from
+    the review signals instead of grouping the reviews on every request.
+    """
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def rating_histogram(self):
+        return {str(level): getattr(self, field) for level, field in zip(RATING_LEVELS, HISTOGRAM_FIELDS)}
+
+def rating_level(rating):
+    """Star level a rating counts towards; fractional ratings round to the nearest star."""
+    if rating is None:
+        return None
+    level = int(Decimal(rating).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+    return min(max(level, RATING_LEVELS[0]), RATING_LEVELS[-1])
+
+def histogram_field(level):
+    return f'rating_{level}_count'
+
+def snapshot_review(review, parent_field):
+    """Remember the stored rating and parent of a review before it is saved."""
+    if review._state.adding:
+        review._previous_rating = None
+        return
+    review._previous_rating = type(review).objects.filter(pk=review.pk).values(
+        'rating', f'{parent_field}_id'
+    ).first()
+
+def _shift(parent_model, parent_id, level, delta, parent=None):
+    if parent_id is None or level is None:
+        return
+    field = histogram_field(level)
+    parent_model.objects.filter(pk=parent_id).update(**{field: F(field) + delta})
+    # Keep a cached parent instance in step so a later full save does not write back stale counts
+    if parent is not None and parent.pk == parent_id:
+        setattr(parent, field, max(getattr(parent, field) + delta, 0))
+
+def apply_review_change(review, parent_model, parent_field):
+    parent_id = getattr(review, f'{parent_field}_id')
+    parent = review._state.fields_cache.get(parent_field)
+    previous = getattr(review, '_previous_rating', None)
+    level = rating_level(review.rating)
+    if previous:
+        old_parent_id, old_level = previous[f'{parent_field}_id'], rating_level(previous['rating'])
+        if (old_parent_id, old_level) == (parent_id, level):
+            return
+        _shift(parent_model, old_parent_id, old_level, -1, parent)
+    _shift(parent_model, parent_id, level, 1, parent)
+
+def remove_review(review, parent_model, parent_field):
+    _shift(parent_model, getattr(review, f'{parent_field}_id'), rating_level(review.rating), -1,
+           review._state.fields_cache.get(parent_field))
+
+def count_histograms(review_model, parent_field):
+    """Histogram per parent id computed from the reviews themselves."""
+    totals = {}
+    rows = review_model.objects.order_by().values_list(f'{parent_field}_id', 'rating').annotate(count=Count('pk'))
+    for parent_id, rating, count in rows:
+        level = rating_level(rating)
+        if parent_id is None or level is None:
+            continue
+        counts = totals.setdefault(parent_id, dict.fromkeys(HISTOGRAM_FIELDS, 0))
+        counts[histogram_field(level)] += count
+    return totals
+
+def rebuild_histograms(parent_model, review_model, parent_field, check_only=False, batch_size=500):
+    """
+    Compare stored counters with the reviews and, unless check_only, fix the
+    ones that drifted. Returns the ids of the parents whose counters differed.
+    """
+    expected = count_histograms(review_model, parent_field)
+    empty = dict.fromkeys(HISTOGRAM_FIELDS, 0)
+    drifted, batch = [], []
+    for parent in parent_model.objects.only('pk', *HISTOGRAM_FIELDS).iterator():
+        counts = expected.get(parent.pk, empty)
+        if all(getattr(parent, field) == counts[field] for field in HISTOGRAM_FIELDS):
+            continue
+        drifted.append(parent.pk)
+        if check_only:
+            continue
+        for field in HISTOGRAM_FIELDS:
+            setattr(parent, field, counts[field])
+        batch.append(parent)
+        if len(batch) >= batch_size:
+            parent_model.objects.bulk_update(batch, HISTOGRAM_FIELDS)
+            batch = []
+    if batch:
+        parent_model.objects.bulk_update(batch, HISTOGRAM_FIELDS)
+    return drifted
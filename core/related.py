@@ -0,0 +1,65 @@
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from .similarity import DEFAULT_NEIGHBORS, signature, tfidf_matrix, top_neighbors, entering_rows
+
+def refresh_related(items, related_model, source_field, build_document, summarize,
+                    k=DEFAULT_NEIGHBORS, full=False):
+    """
+    Recompute stored "related" lists for `items`.
+
+    Every run vectorizes all items, which is cheap, but only rewrites the
+    lists a change can affect: items whose features changed, items whose
+    stored neighbours changed or disappeared, and items a changed item would
+    now enter. IDF weights drift slightly between full runs; pass full=True
+    periodically to recompute everything. Returns (rewritten, removed).
+    """
+    source_id = f'{source_field}_id'
+    documents = [build_document(item) for item in items]
+    signatures = [signature(terms) for terms in documents]
+    position = {item.pk: row for row, item in enumerate(items)}
+    stored = {
+        row[source_id]: row
+        for row in related_model.objects.values(source_id, 'signature', 'neighbors')
+    }
+    removed_ids = set(stored) - set(position)
+    matrix = tfidf_matrix(documents)
+
+    if full:
+        dirty = set(range(len(items)))
+    else:
+        changed = {
+            row for row, item in enumerate(items)
+            if item.pk not in stored or stored[item.pk]['signature'] != signatures[row]
+        }
+        stale_ids = removed_ids | {items[row].pk for row in changed}
+        dirty = set(changed)
+        floors = np.full(len(items), -1.0, dtype=np.float32)
+        for row, item in enumerate(items):
+            neighbors = stored.get(item.pk, {}).get('neighbors') or []
+            if any(neighbor['id'] in stale_ids for neighbor in neighbors):
+                dirty.add(row)
+            if len(neighbors) >= k:
+                floors[row] = min(neighbor['score'] for neighbor in neighbors)
+        if changed:
+            dirty |= entering_rows(matrix, changed, floors)
+
+    neighbors = top_neighbors(matrix, sorted(dirty), k=k)
+    now = timezone.now()
+    rows = []
+    for row, pairs in neighbors.items():
+        item = items[row]
+        rows.append(related_model(**{
+            source_id: item.pk,
+            'signature': signatures[row],
+            'neighbors': [dict(summarize(items[other]), id=items[other].pk, score=score) for other, score in pairs],
+            'computed_at': now,
+        }))
+    with transaction.atomic():
+        rewritten_ids = [getattr(row, source_id) for row in rows]
+        for offset in range(0, len(rewritten_ids), 1000):
+            related_model.objects.filter(**{f'{source_id}__in': rewritten_ids[offset:offset + 1000]}).delete()
+        if removed_ids:
+            related_model.objects.filter(**{f'{source_id}__in': list(removed_ids)}).delete()
+        related_model.objects.bulk_create(rows, batch_size=500)
+    return len(rows), len(removed_ids)
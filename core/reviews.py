@@ -0,0 +1,6 @@
+# Reviews embedded in a detail payload; the rest are served by the paginated review listing
+EMBEDDED_REVIEW_LIMIT = 5
+
+def recent_reviews(reviews, limit=EMBEDDED_REVIEW_LIMIT):
+    """Latest reviews with their authors, fetched in one sliced query."""
+    return reviews.select_related('user').order_by('-created_at')[:limit]
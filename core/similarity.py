@@ -0,0 +1,107 @@
+import hashlib
+import math
+import re
+from collections import Counter
+import numpy as np
+
+TOKEN = re.compile(r'[^\W\d_]{2,}', re.UNICODE)
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+your you our we they their them his her he she not but all can more most into over about than also
+""".split())
+
+DEFAULT_NEIGHBORS = 8
+DEFAULT_MAX_FEATURES = 5000
+BATCH_SIZE = 256
+
+def tokenize(text):
+    return [token for token in TOKEN.findall((text or '').lower()) if token not in STOP_WORDS]
+
+def document(*texts, labels=(), weights=None):
+    """
+    Build a bag of terms from free text plus labelled facets such as tags,
+    categories and regions. Facets become single tokens ('tag:lalibela'), so
+    'Amhara' the region does not blur with the word in a description.
+    ``weights`` repeats the terms of each text that many times.
+    """
+    terms = Counter()
+    weights = weights or [1] * len(texts)
+    for text, weight in zip(texts, weights):
+        for token in tokenize(text):
+            terms[token] += weight
+    for label in labels:
+        if label:
+            terms[str(label).strip().lower()] += 2
+    return terms
+
+def signature(terms):
+    """Stable hash of a document's terms, used to spot items whose features changed."""
+    payload = '|'.join(f'{term}:{count}' for term, count in sorted(terms.items()))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def tfidf_matrix(documents, max_features=DEFAULT_MAX_FEATURES):
+    """
+    L2-normalized TF-IDF rows (float32, one per document) over the
+    `max_features` terms that appear in the most documents. Terms found in
+    only one document cannot make two items similar and are dropped.
+    """
+    document_frequency = Counter()
+    for terms in documents:
+        document_frequency.update(terms.keys())
+    vocabulary = [term for term, count in document_frequency.most_common(max_features) if count > 1]
+    index = {term: column for column, term in enumerate(vocabulary)}
+    total = len(documents)
+    idf = np.array([math.log((1 + total) / (1 + document_frequency[term])) + 1 for term in vocabulary],
+                   dtype=np.float32)
+    matrix = np.zeros((total, len(vocabulary)), dtype=np.float32)
+    for row, terms in enumerate(documents):
+        for term, count in terms.items():
+            column = index.get(term)
+            if column is not None:
+                matrix[row, column] = 1 + math.log(count)
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+def top_neighbors(matrix, rows, k=DEFAULT_NEIGHBORS, batch_size=BATCH_SIZE):
+    """
+    Top-k cosine neighbours for the given row indexes, computed with one
+    matrix product per batch. Returns {row: [(other_row, score), ...]} with
+    the best match first; zero-similarity items are never returned.
+    """
+    rows = list(rows)
+    neighbors = {}
+    total = matrix.shape[0]
+    if total < 2 or not rows:
+        return {row: [] for row in rows}
+    k = min(k, total - 1)
+    for offset in range(0, len(rows), batch_size):
+        batch = rows[offset:offset + batch_size]
+        scores = matrix[batch] @ matrix.T
+        scores[np.arange(len(batch)), batch] = -1
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for position, row in enumerate(batch):
+            picked = candidates[position]
+            picked = picked[np.argsort(-scores[position, picked])]
+            neighbors[row] = [
+                (int(column), round(float(scores[position, column]), 4))
+                for column in picked if scores[position, column] > 0
+            ]
+    return neighbors
+
+def entering_rows(matrix, changed_rows, floors, batch_size=BATCH_SIZE):
+    """
+    Rows whose stored neighbour list a changed row now beats, i.e. where the
+    similarity to a changed row exceeds the row's current weakest neighbour
+    (``floors``, an array with -1 for rows that have room). Lets an
+    incremental run refresh only the lists a change can affect.
+    """
+    affected = set()
+    changed_rows = list(changed_rows)
+    for offset in range(0, len(changed_rows), batch_size):
+        batch = changed_rows[offset:offset + batch_size]
+        scores = matrix[batch] @ matrix.T
+        scores[np.arange(len(batch)), batch] = 0
+        affected.update(np.nonzero(((scores > floors) & (scores > 0)).any(axis=0))[0].tolist())
+    return affected
@@ -0,0 +1,11 @@
+from celery import shared_task
+from blog.related import refresh_related_posts
+from destinations.related import refresh_related_destinations
+
+@shared_task
+def refresh_related_items(full=False):
+    """Incrementally refresh the related-posts and related-destinations lists."""
+    return {
+        'posts': refresh_related_posts(full=full),
+        'destinations': refresh_related_destinations(full=full),
+    }
@@ -0,0 +1,29 @@
+import numpy as np
+from django.test import SimpleTestCase
+from .similarity import document, tfidf_matrix, top_neighbors, entering_rows
+
+class SimilarityTests(SimpleTestCase):
+    def setUp(self):
+        self.documents = [
+            document('Rock churches of Lalibela', labels=['region:amhara', 'category:religious']),
+            document('Lalibela rock hewn churches tour', labels=['region:amhara', 'category:religious']),
+            document('Danakil depression salt flats', labels=['region:afar', 'category:natural']),
+            document('Erta Ale and the Danakil salt lakes', labels=['region:afar', 'category:natural']),
+        ]
+        self.matrix = tfidf_matrix(self.documents)
+
+    def test_rows_are_normalized(self):
+        self.assertTrue(np.allclose(np.linalg.norm(self.matrix, axis=1), 1.0))
+
+    def test_top_neighbors_pairs_similar_items(self):
+        neighbors = top_neighbors(self.matrix, range(4), k=1)
+        self.assertEqual(neighbors[0][0][0], 1)
+        self.assertEqual(neighbors[2][0][0], 3)
+
+    def test_unrelated_items_are_not_neighbors(self):
+        neighbors = top_neighbors(self.matrix, [0], k=3)
+        self.assertEqual([row for row, _ in neighbors[0]], [1])
+
+    def test_entering_rows_finds_lists_a_change_improves(self):
+        floors = np.array([0.99, 0.99, 0.0, 0.99], dtype=np.float32)
+        self.assertEqual(entering_rows(self.matrix, [3], floors), {2})
@@ -0,0 +1,111 @@
+import numpy as np
+from django.core.cache import cache
+from geo.routes import haversine_km, distance_matrix
+from .models import Destination
+
+MATRIX_CACHE_KEY = 'destination-distance-matrix'
+# Bumped on every patch; a cached matrix stamped with another version lost a race and is rebuilt
+MATRIX_VERSION_KEY = 'destination-distance-matrix-version'
+MATRIX_CACHE_TIMEOUT = None
+
+def _coordinates(destination):
+    if destination.status != 'active' or destination.latitude is None or destination.longitude is None:
+        return None
+    return float(destination.latitude), float(destination.longitude)
+
+def build_matrix():
+    """Great-circle distances between every pair of active destinations."""
+    rows = list(Destination.objects.filter(status='active').values_list('id', 'latitude', 'longitude'))
+    rows = [(pk, float(lat), float(lng)) for pk, lat, lng in rows if lat is not None and lng is not None]
+    ids = [pk for pk, _, _ in rows]
+    latitudes = np.array([lat for _, lat, _ in rows])
+    longitudes = np.array([lng for _, _, lng in rows])
+    return {
+        'ids': ids,
+        'latitudes': latitudes,
+        'longitudes': longitudes,
+        'matrix': distance_matrix(latitudes, longitudes),
+    }
+
+def _bump_version():
+    cache.add(MATRIX_VERSION_KEY, 0, None)
+    try:
+        return cache.incr(MATRIX_VERSION_KEY)
+    except ValueError:
+        cache.set(MATRIX_VERSION_KEY, 1, None)
+        return 1
+
+def _current_state():
+    """The cached matrix, or None when there is none or a concurrent patch superseded it."""
+    cached = cache.get_many([MATRIX_CACHE_KEY, MATRIX_VERSION_KEY])
+    state = cached.get(MATRIX_CACHE_KEY)
+    if state is None or state.get('version') != cached.get(MATRIX_VERSION_KEY, 0):
+        return None
+    return state
+
+def destination_matrix(rebuild=False):
+    state = None if rebuild else _current_state()
+    if state is None:
+        version = cache.get(MATRIX_VERSION_KEY, 0)
+        state = build_matrix()
+        # A patch landing while building bumps the version, so the next read rebuilds again
+        state['version'] = version
+        cache.set(MATRIX_CACHE_KEY, state, MATRIX_CACHE_TIMEOUT)
+    return state
+
+def update_destination_distances(destination, deleted=False):
+    """
+    Patch one destination's row and column into the cached matrix, adding
+    or dropping it as needed, instead of recomputing every pair. Does
+    nothing when no matrix is cached; the next read builds a fresh one.
+    The patch is stamped with a version taken after reading; if another
+    patch got in between, the matrix is dropped rather than written back
+    without that patch.
+    """
+    state = _current_state()
+    if state is None:
+        return
+    ids, matrix = state['ids'], state['matrix']
+    coordinates = None if deleted else _coordinates(destination)
+    row = ids.index(destination.pk) if destination.pk in ids else None
+    if row is not None and coordinates == (state['latitudes'][row], state['longitudes'][row]):
+        return
+    if row is not None:
+        keep = np.arange(len(ids)) != row
+        ids = [pk for pk in ids if pk != destination.pk]
+        state['latitudes'], state['longitudes'] = state['latitudes'][keep], state['longitudes'][keep]
+        matrix = matrix[keep][:, keep]
+    if coordinates is not None:
+        latitude, longitude = coordinates
+        distances = haversine_km(state['latitudes'], state['longitudes'], latitude, longitude).astype(np.float32)
+        size = len(ids)
+        grown = np.zeros((size + 1, size + 1), dtype=np.float32)
+        grown[:size, :size] = matrix
+        grown[size, :size] = distances
+        grown[:size, size] = distances
+        matrix = grown
+        ids = ids + [destination.pk]
+        state['latitudes'] = np.append(state['latitudes'], latitude)
+        state['longitudes'] = np.append(state['longitudes'], longitude)
+    state['ids'], state['matrix'] = ids, matrix
+    version = _bump_version()
+    if version != state['version'] + 1:
+        cache.delete(MATRIX_CACHE_KEY)
+        return
+    state['version'] = version
+    cache.set(MATRIX_CACHE_KEY, state, MATRIX_CACHE_TIMEOUT)
+
+def matches_positions(state, destinations):
+    """Whether the matrix knows every destination at its current coordinates."""
+    index = {pk: row for row, pk in enumerate(state['ids'])}
+    for destination in destinations:
+        row = index.get(destination.pk)
+        if row is None or _coordinates(destination) != (state['latitudes'][row], state['longitudes'][row]):
+            return False
+    return True
+
+def submatrix(state, destination_ids):
+    """Rows/columns for the given destinations, in the given order. Raises KeyError for unknown ids."""
+    index = {pk: row for row, pk in enumerate(state['ids'])}
+    rows = [index[pk] for pk in destination_ids]
+    return state['matrix'][np.ix_(rows, rows)]
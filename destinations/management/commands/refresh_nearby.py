@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from destinations.nearby import refresh_nearby
+
+class Command(BaseCommand):
+    help = 'Recompute the stored nearby attractions, events and businesses of each destination'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every list, not just the stale ones')
+
+    def handle(self, *args, **options):
+        written = refresh_nearby(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f'{written} nearby lists rewritten'))
@@ -3,10 +3,11 @@ from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
 from djongo.models import JSONField
+from core.ratings import RatingHistogramMixin
 
 User = get_user_model()
 
-class Destination(models.Model):
+class Destination(RatingHistogramMixin, models.Model):
     CATEGORY_CHOICES = (
         ('historical', 'Historical'),
         ('natural', 'Natural'),
@@ -55,6 +56,8 @@ class Destination(models.Model):
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
     review_count = models.IntegerField(default=0)
     images = JSONField(default=list)
+    # Responsive variants keyed by original image URL, filled in by uploads.tasks.process_image
+    image_variants = JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -75,6 +78,40 @@ class Destination(models.Model):
             models.Index(fields=['status']),
         ]
 
+class DestinationRelated(models.Model):
+    """
+    Precomputed "you may also like" list for one destination: neighbour ids,
+    similarity scores and the fields needed to render a card, so serving it
+    is a single primary-key lookup. Rebuilt by core.related.refresh_related.
+    """
+    destination = models.OneToOneField(Destination, on_delete=models.CASCADE, primary_key=True, related_name='related')
+    signature = models.CharField(max_length=40)
+    neighbors = JSONField(default=list, blank=True)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Related to {self.destination_id}"
+
+class DestinationNearby(models.Model):
+    """
+    Stored "within 50 km" lists for one destination, keyed by kind
+    (destination, event, business) and closest first. Marked stale when an
+    indexed point near it moves, appears or disappears; refreshed by
+    destinations.nearby.refresh_nearby.
+    """
+    destination = models.OneToOneField(Destination, on_delete=models.CASCADE, primary_key=True, related_name='nearby')
+    items = JSONField(default=dict, blank=True)
+    stale = models.BooleanField(default=False)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['stale']),
+        ]
+
+    def __str__(self):
+        return f"Nearby {self.destination_id}"
+
 class DestinationReview(models.Model):
     destination = models.ForeignKey(Destination, on_delete=models.CASCADE, related_name='reviews', null=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='destination_reviews', null=True)
@@ -0,0 +1,52 @@
+from django.utils import timezone
+from geo.index import MAP_SOURCES
+from geo.models import MapPoint
+from geo.nearby import points_within
+from .models import DestinationNearby
+
+NEARBY_RADIUS_KM = 50
+# Items kept per kind, so a dense cluster of businesses cannot crowd out attractions
+NEARBY_PER_KIND = 10
+
+def nearby_items(point):
+    """Closest indexed items of every kind around a destination's map point, itself excluded."""
+    items = {kind: [] for kind in MAP_SOURCES}
+    for distance, other in points_within(point.latitude, point.longitude, NEARBY_RADIUS_KM, MAP_SOURCES):
+        if (other.kind, other.object_id) == (point.kind, point.object_id):
+            continue
+        listed = items[other.kind]
+        if len(listed) < NEARBY_PER_KIND:
+            listed.append(dict(other.summary(), distance_km=round(distance, 2)))
+    return items
+
+def store_nearby(point, now=None):
+    items = nearby_items(point)
+    DestinationNearby.objects.update_or_create(destination_id=point.object_id, defaults={
+        'items': items, 'stale': False, 'computed_at': now or timezone.now(),
+    })
+    return items
+
+def mark_stale_around(latitude, longitude):
+    """Flag the stored lists of destinations close enough to a point to list it."""
+    ids = [point.object_id for _, point in points_within(latitude, longitude, NEARBY_RADIUS_KM, ['destination'])]
+    if ids:
+        DestinationNearby.objects.filter(destination_id__in=ids, stale=False).update(stale=True)
+
+def refresh_nearby(full=False):
+    """
+    Recompute stale lists and lists of newly indexed destinations, or every
+    list with full=True, and drop lists of destinations that left the map.
+    Returns the number of lists written.
+    """
+    points = {point.object_id: point for point in MapPoint.objects.filter(kind='destination')}
+    DestinationNearby.objects.exclude(destination_id__in=list(points)).delete()
+    if full:
+        targets = list(points)
+    else:
+        stored = set(DestinationNearby.objects.values_list('destination_id', flat=True))
+        stale = DestinationNearby.objects.filter(stale=True).values_list('destination_id', flat=True)
+        targets = sorted(set(stale) | (set(points) - stored))
+    now = timezone.now()
+    for destination_id in targets:
+        store_nearby(points[destination_id], now)
+    return len(targets)
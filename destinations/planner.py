@@ -0,0 +1,94 @@
+import numpy as np
+from geo.routes import haversine_km, plan_route
+from packages.availability import available_departures
+from packages.models import Package
+from .distances import destination_matrix, matches_positions, submatrix
+
+MAX_STOPS = 15
+# A package counts as serving a stop when its coordinates are this close
+PACKAGE_RADIUS_KM = 50
+SUGGESTIONS_PER_STOP = 3
+
+def _package_positions():
+    """(package ids, latitudes, longitudes) of active packages with real coordinates."""
+    ids, latitudes, longitudes = [], [], []
+    for pk, coordinates in Package.objects.filter(status='active').values_list('id', 'coordinates'):
+        if not coordinates or len(coordinates) != 2:
+            continue
+        latitude, longitude = float(coordinates[0]), float(coordinates[1])
+        # [0, 0] is the model default, not a real place
+        if latitude == longitude == 0:
+            continue
+        ids.append(pk)
+        latitudes.append(latitude)
+        longitudes.append(longitude)
+    return ids, np.array(latitudes), np.array(longitudes)
+
+def _departure_summary(departure, distance):
+    package = departure.package
+    price = departure.price if departure.price is not None else package.price
+    return {
+        'departure': departure.id,
+        'start_date': departure.start_date.isoformat(),
+        'end_date': departure.end_date.isoformat() if departure.end_date else None,
+        'price': str(price) if price is not None else None,
+        'available_slots': departure.available_slots,
+        'package': {'id': package.id, 'title': package.title, 'slug': package.slug},
+        'distance_km': round(float(distance), 1),
+    }
+
+def _route_matrix(destinations):
+    state = destination_matrix()
+    if not matches_positions(state, destinations):
+        # Cached before one of these destinations became routable or moved; start over
+        state = destination_matrix(rebuild=True)
+    return submatrix(state, [destination.pk for destination in destinations])
+
+def plan_trip(destinations, start_date, end_date, seats=1, start=None):
+    """
+    Order active destinations into a short route (nearest neighbour then
+    2-opt over the cached distance matrix) and list, per stop, departures in
+    the date window of packages based within PACKAGE_RADIUS_KM. `schedule`
+    chains one departure per stop in route order, each leaving no earlier
+    than the previous one returns.
+    """
+    ids = [destination.pk for destination in destinations]
+    first = ids.index(start.pk) if start is not None and start.pk in ids else 0
+    order, total = plan_route(_route_matrix(destinations), start=first)
+    route = [destinations[row] for row in order]
+    matrix = _route_matrix(route)
+
+    package_ids, package_latitudes, package_longitudes = _package_positions()
+    nearby = []
+    for destination in route:
+        distances = haversine_km(package_latitudes, package_longitudes, destination.latitude, destination.longitude)
+        nearby.append({package_ids[row]: float(distances[row])
+                       for row in np.nonzero(distances <= PACKAGE_RADIUS_KM)[0]})
+    wanted = set().union(*nearby)
+    departures = list(available_departures(start_date, end_date, seats).filter(
+        package_id__in=wanted
+    ).order_by('start_date', 'id')) if wanted else []
+
+    stops, schedule, free_from = [], [], start_date
+    for index, destination in enumerate(route):
+        candidates = [departure for departure in departures if departure.package_id in nearby[index]]
+        for departure in candidates:
+            if departure.start_date >= free_from:
+                schedule.append({
+                    'destination': destination.pk,
+                    **_departure_summary(departure, nearby[index][departure.package_id]),
+                })
+                free_from = departure.end_date or departure.start_date
+                break
+        stops.append({
+            'destination': {
+                'id': destination.pk, 'title': destination.title, 'slug': destination.slug,
+                'latitude': str(destination.latitude), 'longitude': str(destination.longitude),
+            },
+            'leg_km': round(float(matrix[index - 1, index]), 1) if index else 0.0,
+            'departures': [
+                _departure_summary(departure, nearby[index][departure.package_id])
+                for departure in candidates[:SUGGESTIONS_PER_STOP]
+            ],
+        })
+    return {'total_km': round(total, 1), 'stops': stops, 'schedule': schedule}
@@ -0,0 +1,26 @@
+from core.related import refresh_related
+from core.similarity import document
+from .models import Destination, DestinationRelated
+
+def destination_document(destination):
+    # The first part of the description plays the role of an excerpt
+    return document(destination.title, destination.description[:500], weights=[3, 1], labels=[
+        f'category:{destination.category}', f'region:{destination.region}', f'city:{destination.city}',
+    ])
+
+def destination_summary(destination):
+    return {
+        'title': destination.title,
+        'slug': destination.slug,
+        'category': destination.category,
+        'region': destination.region,
+        'city': destination.city,
+        'image': (destination.images or [None])[0],
+    }
+
+def refresh_related_destinations(full=False):
+    destinations = list(Destination.objects.filter(status='active').only(
+        'id', 'title', 'slug', 'description', 'category', 'region', 'city', 'images'
+    ).order_by('pk'))
+    return refresh_related(destinations, DestinationRelated, 'destination',
+                           destination_document, destination_summary, full=full)
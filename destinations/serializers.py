@@ -1,16 +1,21 @@
 from rest_framework import serializers
 from .models import Destination, DestinationReview, SavedDestination
+from django.utils import timezone
 from users.serializers import UserSerializer
+from packages.availability import MAX_SEARCH_DAYS
+from .planner import MAX_STOPS
 
 class DestinationSerializer(serializers.ModelSerializer):
+    rating_histogram = serializers.ReadOnlyField()
+
     class Meta:
         model = Destination
         fields = [
             'id', 'user', 'title', 'slug', 'description', 'category', 'region',
             'city', 'address', 'latitude', 'longitude', 'featured', 'status',
-            'rating', 'review_count', 'images', 'created_at', 'updated_at'
+            'rating', 'review_count', 'rating_histogram', 'images', 'image_variants', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'slug', 'rating', 'review_count', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'user', 'slug', 'rating', 'review_count', 'image_variants', 'created_at', 'updated_at']
     
     def validate(self, data):
         if 'latitude' in data and not -90 <= float(data['latitude']) <= 90:
@@ -21,15 +26,16 @@ class DestinationSerializer(serializers.ModelSerializer):
 
 class DestinationDetailSerializer(serializers.ModelSerializer):
     reviews = serializers.SerializerMethodField()
+    rating_histogram = serializers.ReadOnlyField()
     
     class Meta:
         model = Destination
         fields = [
             'id', 'user', 'title', 'slug', 'description', 'category', 'region',
             'city', 'address', 'latitude', 'longitude', 'featured', 'status',
-            'rating', 'review_count', 'images', 'reviews', 'created_at', 'updated_at'
+            'rating', 'review_count', 'rating_histogram', 'images', 'image_variants', 'reviews', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'slug', 'rating', 'review_count', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'user', 'slug', 'rating', 'review_count', 'image_variants', 'created_at', 'updated_at']
     
     def get_reviews(self, obj):
         reviews = obj.reviews.all()[:5]  # Latest 5 reviews
@@ -65,4 +71,29 @@ class SavedDestinationSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+class TripPlanSerializer(serializers.Serializer):
+    destinations = serializers.PrimaryKeyRelatedField(
+        queryset=Destination.objects.filter(status='active'), many=True
+    )
+    start = serializers.PrimaryKeyRelatedField(
+        queryset=Destination.objects.filter(status='active'), required=False
+    )
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    seats = serializers.IntegerField(min_value=1, default=1)
+
+    def validate(self, data):
+        destinations = list({destination.pk: destination for destination in data['destinations']}.values())
+        if not 2 <= len(destinations) <= MAX_STOPS:
+            raise serializers.ValidationError(f'Choose between 2 and {MAX_STOPS} destinations.')
+        if 'start' in data and data['start'] not in destinations:
+            raise serializers.ValidationError('start must be one of the chosen destinations.')
+        data['destinations'] = destinations
+        data['start_date'] = max(data['start_date'], timezone.localdate())
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError('end_date must not be before start_date.')
+        if (data['end_date'] - data['start_date']).days > MAX_SEARCH_DAYS:
+            raise serializers.ValidationError(f'Plan at most {MAX_SEARCH_DAYS} days at a time.')
+        return data
@@ -1,6 +1,13 @@
-from django.db.models.signals import post_save, post_delete
+from django.db import models
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import Destination, DestinationReview
+from core.ratings import snapshot_review, apply_review_change, remove_review
+from facets.counts import snapshot_facets, apply_facet_change, remove_facets
+from geo.index import sync_instance, remove_point
+from geo.models import MapPoint
+from .models import Destination, DestinationReview, DestinationNearby
+from .distances import update_destination_distances
+from .nearby import mark_stale_around
 
 @receiver(post_save, sender=DestinationReview)
 def update_destination_rating(sender, instance, **kwargs):
@@ -16,4 +23,79 @@ def update_destination_rating_on_delete(sender, instance, **kwargs):
     reviews = destination.reviews.all()
     destination.review_count = reviews.count()
     destination.rating = reviews.aggregate(models.Avg('rating'))['rating__avg'] or 0.0
-    destination.save()
\ No newline at end of file
+    destination.save()
+
+@receiver(pre_save, sender=DestinationReview)
+def snapshot_destination_review_rating(sender, instance, **kwargs):
+    snapshot_review(instance, 'destination')
+
+@receiver(post_save, sender=DestinationReview)
+def update_destination_rating_histogram(sender, instance, **kwargs):
+    apply_review_change(instance, Destination, 'destination')
+
+@receiver(post_delete, sender=DestinationReview)
+def update_destination_rating_histogram_on_delete(sender, instance, **kwargs):
+    remove_review(instance, Destination, 'destination')
+
+@receiver(post_save, sender=Destination)
+def index_destination_on_map(sender, instance, **kwargs):
+    sync_instance('destination', instance)
+
+@receiver(post_delete, sender=Destination)
+def remove_destination_from_map(sender, instance, **kwargs):
+    remove_point('destination', instance.pk)
+
+@receiver(pre_save, sender=Destination)
+def snapshot_destination_facets(sender, instance, **kwargs):
+    snapshot_facets('destination', instance)
+
+@receiver(post_save, sender=Destination)
+def update_destination_facets(sender, instance, **kwargs):
+    apply_facet_change('destination', instance)
+
+@receiver(post_delete, sender=Destination)
+def update_destination_facets_on_delete(sender, instance, **kwargs):
+    remove_facets('destination', instance)
+
+@receiver(pre_save, sender=Destination)
+def snapshot_destination_position(sender, instance, **kwargs):
+    instance._previous_position = None
+    if not instance._state.adding:
+        instance._previous_position = Destination.objects.filter(pk=instance.pk).values_list(
+            'status', 'latitude', 'longitude'
+        ).first()
+
+@receiver(post_save, sender=Destination)
+def update_distance_matrix(sender, instance, created, **kwargs):
+    # Most saves (ratings, views) leave the position alone; skip reading the cached matrix then
+    position = (instance.status, instance.latitude, instance.longitude)
+    if created or getattr(instance, '_previous_position', None) != position:
+        update_destination_distances(instance)
+
+@receiver(post_delete, sender=Destination)
+def update_distance_matrix_on_delete(sender, instance, **kwargs):
+    update_destination_distances(instance, deleted=True)
+
+@receiver(pre_save, sender=MapPoint)
+def snapshot_map_point_place(sender, instance, **kwargs):
+    instance._previous_place = None
+    if instance.pk is not None:
+        instance._previous_place = MapPoint.objects.filter(pk=instance.pk).values_list(
+            'latitude', 'longitude', 'label'
+        ).first()
+
+@receiver(post_save, sender=MapPoint)
+def mark_nearby_lists_stale(sender, instance, **kwargs):
+    # Weight-only changes (new ratings) do not alter what is listed or where
+    previous = getattr(instance, '_previous_place', None)
+    if previous == (instance.latitude, instance.longitude, instance.label):
+        return
+    if previous is not None:
+        mark_stale_around(previous[0], previous[1])
+    mark_stale_around(instance.latitude, instance.longitude)
+
+@receiver(post_delete, sender=MapPoint)
+def mark_nearby_lists_stale_on_delete(sender, instance, **kwargs):
+    if instance.kind == 'destination':
+        DestinationNearby.objects.filter(destination_id=instance.object_id).delete()
+    mark_stale_around(instance.latitude, instance.longitude)
@@ -0,0 +1,7 @@
+from celery import shared_task
+from .nearby import refresh_nearby
+
+@shared_task
+def refresh_nearby_lists(full=False):
+    """Recompute the nearby lists marked stale since the last run, or all of them with full=True."""
+    return refresh_nearby(full=full)
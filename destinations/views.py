@@ -5,14 +5,21 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Destination, DestinationReview, SavedDestination
+from .models import Destination, DestinationReview, SavedDestination, DestinationRelated, DestinationNearby
 from .serializers import (
     DestinationSerializer, DestinationDetailSerializer,
-    DestinationReviewSerializer, SavedDestinationSerializer
+    DestinationReviewSerializer, SavedDestinationSerializer, TripPlanSerializer
 )
 from .permissions import IsDestinationOwnerOrReadOnly, IsReviewOwnerOrReadOnly
-
-class DestinationViewSet(viewsets.ModelViewSet):
+from geo.views import MapClustersMixin
+from .planner import plan_trip
+from .nearby import store_nearby
+from geo.models import MapPoint
+from facets.views import FacetsMixin
+
+class DestinationViewSet(MapClustersMixin, FacetsMixin, viewsets.ModelViewSet):
+    map_kind = 'destination'
+    facet_kind = 'destination'
     queryset = Destination.objects.all()
     serializer_class = DestinationSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -64,6 +71,38 @@ class DestinationViewSet(viewsets.ModelViewSet):
         serializer = DestinationReviewSerializer(reviews, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        if not str(pk).isdigit():
+            return Response({'error': 'Destination not found'}, status=status.HTTP_404_NOT_FOUND)
+        neighbors = DestinationRelated.objects.filter(destination_id=pk).values_list('neighbors', flat=True).first()
+        if neighbors is None:
+            get_object_or_404(Destination, pk=pk)
+            neighbors = []
+        return Response(neighbors)
+
+    @action(detail=True, methods=['get'])
+    def nearby(self, request, pk=None):
+        if not str(pk).isdigit():
+            return Response({'error': 'Destination not found'}, status=status.HTTP_404_NOT_FOUND)
+        items = DestinationNearby.objects.filter(destination_id=pk).values_list('items', flat=True).first()
+        if items is None:
+            # Not listed yet (new or never refreshed): compute once and store
+            get_object_or_404(Destination, pk=pk)
+            point = MapPoint.objects.filter(kind='destination', object_id=pk).first()
+            items = store_nearby(point) if point is not None else {}
+        return Response(items)
+
+    @action(detail=False, methods=['post'])
+    def plan(self, request):
+        serializer = TripPlanSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        return Response(plan_trip(
+            data['destinations'], data['start_date'], data['end_date'],
+            seats=data['seats'], start=data.get('start')
+        ))
+
     @action(detail=True, methods=['post'])
     def toggle_featured(self, request, pk=None):
         destination = self.get_object()
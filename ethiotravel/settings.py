@@ -38,6 +38,9 @@ INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'packages',
     'booking',
+    'uploads',
+    'geo',
+    'facets',
     'drf_yasg',
 ]
 
@@ -108,6 +111,10 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploaded images and their variants; the local filesystem unless set to e.g. S3
+IMAGE_STORAGE = os.getenv('IMAGE_STORAGE', 'django.core.files.storage.FileSystemStorage')
+MAX_IMAGE_UPLOAD_SIZE = 15 * 1024 * 1024
+
 # Redis settings
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
@@ -227,6 +234,28 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_BEAT_SCHEDULE = {
+    'compact-business-activity': {
+        'task': 'business.tasks.compact_business_activity',
+        'schedule': 60 * 15,
+    },
+    'purge-stale-upload-sessions': {
+        'task': 'uploads.tasks.purge_stale_upload_sessions',
+        'schedule': 60 * 60,
+    },
+    'refresh-related-items': {
+        'task': 'core.tasks.refresh_related_items',
+        'schedule': 60 * 60,
+    },
+    'refresh-package-prices': {
+        'task': 'packages.tasks.refresh_package_prices',
+        'schedule': 60 * 60,
+    },
+    'refresh-nearby-lists': {
+        'task': 'destinations.tasks.refresh_nearby_lists',
+        'schedule': 60 * 5,
+    },
+}
 
 # Security settings
 if not DEBUG:
@@ -60,6 +60,7 @@ urlpatterns = [
     path('api/packages/', include('packages.urls', namespace='packages')),
     path('api/booking/', include('booking.urls', namespace='booking')),
     path('api/business/', include('business.urls', namespace='business')),
+    path('api/uploads/', include('uploads.urls', namespace='uploads')),
     
     # Authentication endpoints
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
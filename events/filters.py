@@ -0,0 +1,10 @@
+from django_filters import rest_framework as filters
+from facets.dimensions import filter_price_band
+from .models import Event
+
+class EventFilter(filters.FilterSet):
+    price_band = filters.CharFilter(field_name='price', method=filter_price_band)
+
+    class Meta:
+        model = Event
+        fields = ['category', 'featured', 'status', 'price_band']
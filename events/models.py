@@ -3,10 +3,11 @@ from django.contrib.auth import get_user_model
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
 from djongo.models import JSONField
+from core.ratings import RatingHistogramMixin
 
 User = get_user_model()
 
-class Event(models.Model):
+class Event(RatingHistogramMixin, models.Model):
     CATEGORY_CHOICES = [
         ('cultural', 'Cultural'),
         ('music', 'Music'),
@@ -43,6 +44,8 @@ class Event(models.Model):
     current_attendees = models.PositiveIntegerField(default=0)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
     images = JSONField(default=list)  # Replace ArrayField with JSONField
+    # Responsive variants keyed by original image URL, filled in by uploads.tasks.process_image
+    image_variants = JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
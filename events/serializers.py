@@ -23,11 +23,14 @@ class EventReviewSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 class EventListSerializer(serializers.ModelSerializer):
+    rating_histogram = serializers.ReadOnlyField()
+
     class Meta:
         model = Event
         fields = [
             'id', 'title', 'slug', 'category', 'location', 'start_date',
-            'end_date', 'featured', 'status', 'current_attendees', 'rating'
+            'end_date', 'featured', 'status', 'current_attendees', 'rating',
+            'rating_histogram'
         ]
         read_only_fields = ['id', 'slug', 'status', 'current_attendees', 'rating']
 
@@ -35,6 +38,7 @@ class EventDetailSerializer(serializers.ModelSerializer):
     organizer = UserSerializer(read_only=True)
     reviews = serializers.SerializerMethodField()
     registration_count = serializers.SerializerMethodField()
+    rating_histogram = serializers.ReadOnlyField()
     
     class Meta:
         model = Event
@@ -42,10 +46,10 @@ class EventDetailSerializer(serializers.ModelSerializer):
             'id', 'title', 'slug', 'description', 'category', 'start_date',
             'end_date', 'location', 'address', 'latitude', 'longitude',
             'featured', 'status', 'organizer', 'price', 'capacity',
-            'current_attendees', 'rating', 'images', 'reviews',
+            'current_attendees', 'rating', 'rating_histogram', 'images', 'image_variants', 'reviews',
             'registration_count', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'slug', 'current_attendees', 'rating', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'slug', 'current_attendees', 'rating', 'image_variants', 'created_at', 'updated_at']
     
     def get_reviews(self, obj):
         reviews = obj.reviews.all()[:5]
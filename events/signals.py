@@ -1,5 +1,9 @@
-from django.db.models.signals import post_save, post_delete
+from django.db import models
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
+from core.ratings import snapshot_review, apply_review_change, remove_review
+from facets.counts import snapshot_facets, apply_facet_change, remove_facets
+from geo.index import sync_instance, remove_point
 from .models import Event, EventReview, EventRegistration
 
 @receiver(post_save, sender=EventReview)
@@ -26,4 +30,36 @@ def update_event_attendees(sender, instance, **kwargs):
 def update_event_attendees_on_delete(sender, instance, **kwargs):
     event = instance.event
     event.current_attendees = event.registrations.filter(status='confirmed').count()
-    event.save()
\ No newline at end of file
+    event.save()
+
+@receiver(pre_save, sender=EventReview)
+def snapshot_event_review_rating(sender, instance, **kwargs):
+    snapshot_review(instance, 'event')
+
+@receiver(post_save, sender=EventReview)
+def update_event_rating_histogram(sender, instance, **kwargs):
+    apply_review_change(instance, Event, 'event')
+
+@receiver(post_delete, sender=EventReview)
+def update_event_rating_histogram_on_delete(sender, instance, **kwargs):
+    remove_review(instance, Event, 'event')
+
+@receiver(post_save, sender=Event)
+def index_event_on_map(sender, instance, **kwargs):
+    sync_instance('event', instance)
+
+@receiver(post_delete, sender=Event)
+def remove_event_from_map(sender, instance, **kwargs):
+    remove_point('event', instance.pk)
+
+@receiver(pre_save, sender=Event)
+def snapshot_event_facets(sender, instance, **kwargs):
+    snapshot_facets('event', instance)
+
+@receiver(post_save, sender=Event)
+def update_event_facets(sender, instance, **kwargs):
+    apply_facet_change('event', instance)
+
+@receiver(post_delete, sender=Event)
+def update_event_facets_on_delete(sender, instance, **kwargs):
+    remove_facets('event', instance)
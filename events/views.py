@@ -13,14 +13,21 @@ from .serializers import (
     SavedEventSerializer, EventSubscriptionSerializer
 )
 from .permissions import IsEventOwnerOrReadOnly, IsReviewOwnerOrReadOnly
+from core.exports import stream_export
+from geo.views import MapClustersMixin
+from facets.views import FacetsMixin
+from facets.counts import facet_values_list
+from .filters import EventFilter
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(MapClustersMixin, FacetsMixin, viewsets.ModelViewSet):
+    map_kind = 'event'
+    facet_kind = 'event'
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'featured', 'status']
+    filterset_class = EventFilter
     search_fields = ['title', 'description', 'location']
     ordering_fields = ['start_date', 'created_at', 'rating']
     ordering = ['-start_date']
@@ -37,6 +44,8 @@ class EventViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated(), IsEventOwnerOrReadOnly()]
         if self.action == 'toggle_featured':
             return [IsAdminUser()]
+        if self.action == 'export_registrations':
+            return [IsAuthenticated()]
         return []
 
     def get_queryset(self):
@@ -212,6 +221,57 @@ class EventViewSet(viewsets.ModelViewSet):
         serializer = EventRegistrationSerializer(registrations, many=True)
         return Response(serializer.data)
 
+    @swagger_auto_schema(
+        tags=['Events'],
+        operation_description="Stream all registrations for an event as CSV or NDJSON (organizer only)",
+        manual_parameters=[
+            openapi.Parameter(
+                'output',
+                openapi.IN_QUERY,
+                description="Export format",
+                type=openapi.TYPE_STRING,
+                enum=['csv', 'ndjson']
+            ),
+            openapi.Parameter(
+                'status',
+                openapi.IN_QUERY,
+                description="Filter by registration status",
+                type=openapi.TYPE_STRING
+            )
+        ],
+        responses={
+            200: "CSV or NDJSON stream",
+            403: "Forbidden",
+            404: "Not Found"
+        }
+    )
+    @action(detail=True, methods=['get'], url_path='registrations/export')
+    def export_registrations(self, request, pk=None):
+        event = self.get_object()
+        if event.organizer_id != request.user.pk and not request.user.is_staff:
+            return Response(
+                {'error': 'Only the organizer can export registrations'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        registrations = EventRegistration.objects.filter(event=event)
+        if request.query_params.get('status'):
+            registrations = registrations.filter(status=request.query_params['status'])
+        columns = [
+            ('id', 'id'),
+            ('status', 'status'),
+            ('email', 'user__email'),
+            ('username', 'user__username'),
+            ('first_name', 'user__first_name'),
+            ('last_name', 'user__last_name'),
+            ('created_at', 'created_at'),
+            ('updated_at', 'updated_at'),
+        ]
+        return stream_export(
+            registrations.order_by('created_at'), columns,
+            f'{event.slug or event.pk}-registrations',
+            request.query_params.get('output', 'csv')
+        )
+
     @swagger_auto_schema(
         tags=['Events'],
         operation_description="Register for an event",
@@ -335,8 +395,7 @@ class EventViewSet(viewsets.ModelViewSet):
     )
     @action(detail=False, methods=['get'])
     def categories(self, request):
-        categories = Event.objects.values_list('category', flat=True).distinct()
-        return Response(categories)
+        return Response(facet_values_list('event', 'category'))
 
     @swagger_auto_schema(
         tags=['Events'],
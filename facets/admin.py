@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import FacetCount
+
+@admin.register(FacetCount)
+class FacetCountAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'given', 'dimension', 'value', 'count']
+    list_filter = ['kind', 'dimension']
+    search_fields = ['given', 'value']
+    readonly_fields = ['kind', 'given', 'dimension', 'value', 'count']
@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+class FacetsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'facets'
+    verbose_name = 'Facet Counts'
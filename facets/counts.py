@@ -0,0 +1,179 @@
+import hashlib
+from collections import Counter
+from functools import reduce
+from operator import or_
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from .dimensions import FACET_SOURCES, normalize_param
+from .models import FacetCount
+
+# Pseudo-dimension whose single row counts every visible item
+ALL = '*'
+FALLBACK_CACHE_TIMEOUT = 10 * 60
+# Query parameters that never change which items are counted
+IGNORED_PARAMS = {'page', 'page_size', 'ordering', 'format', 'cursor'}
+
+def facet_values(kind, instance):
+    """{dimension: [values]} for an item, or None when the item is not visible."""
+    _, _, filters, dimensions, _ = FACET_SOURCES[kind]
+    if any(getattr(instance, field) != value for field, value in filters.items()):
+        return None
+    return {dimension: extract(instance, field) for dimension, (extract, field) in dimensions.items()}
+
+def facet_rows(kind, values):
+    """
+    Count table rows an item contributes to: one per value overall, plus one
+    per value among the items sharing each of its exact-match facet values.
+    """
+    rows = Counter()
+    if values is None:
+        return rows
+    exact = FACET_SOURCES[kind][4]
+    pairs = [(dimension, value) for dimension, items in values.items() for value in items]
+    rows[('', ALL, ALL)] += 1
+    for dimension, value in pairs:
+        rows[('', dimension, value)] += 1
+    for given_dimension, given_value in pairs:
+        if given_dimension not in exact:
+            continue
+        given = f'{given_dimension}={given_value}'
+        rows[(given, ALL, ALL)] += 1
+        for dimension, value in pairs:
+            rows[(given, dimension, value)] += 1
+    return rows
+
+def version_key(kind):
+    return f'facets-version:{kind}'
+
+def bump_version(kind):
+    """Invalidate every cached fallback aggregation for a kind."""
+    key = version_key(kind)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+def _row_filter(kind, keys):
+    return Q(kind=kind) & reduce(or_, (Q(given=given, dimension=dimension, value=value)
+                                        for given, dimension, value in keys))
+
+@transaction.atomic
+def apply_rows(kind, delta):
+    """Apply a Counter of row deltas with one UPDATE per distinct delta."""
+    delta = {key: change for key, change in delta.items() if change}
+    if not delta:
+        return
+    existing = set(FacetCount.objects.filter(_row_filter(kind, delta)).values_list('given', 'dimension', 'value'))
+    FacetCount.objects.bulk_create([
+        FacetCount(kind=kind, given=given, dimension=dimension, value=value[:100])
+        for given, dimension, value in delta if (given, dimension, value) not in existing
+    ])
+    by_change = {}
+    for key, change in delta.items():
+        by_change.setdefault(change, []).append(key)
+    for change, keys in by_change.items():
+        FacetCount.objects.filter(_row_filter(kind, keys)).update(count=F('count') + change)
+    transaction.on_commit(lambda: bump_version(kind))
+
+def snapshot_facets(kind, instance):
+    """Remember the stored facet values of an item before it is saved."""
+    instance._previous_facets = None
+    if not instance._state.adding:
+        stored = type(instance).objects.filter(pk=instance.pk).first()
+        if stored is not None:
+            instance._previous_facets = facet_values(kind, stored)
+
+def apply_facet_change(kind, instance):
+    delta = facet_rows(kind, facet_values(kind, instance))
+    delta.subtract(facet_rows(kind, getattr(instance, '_previous_facets', None)))
+    apply_rows(kind, delta)
+
+def remove_facets(kind, instance):
+    delta = Counter()
+    delta.subtract(facet_rows(kind, facet_values(kind, instance)))
+    apply_rows(kind, delta)
+
+def parse_filters(kind, query_params):
+    """
+    Split request parameters into exact facet filters and everything else.
+    Returns ({dimension: value}, has_other_filters).
+    """
+    dimensions, exact = FACET_SOURCES[kind][3], FACET_SOURCES[kind][4]
+    facet_filters, other = {}, False
+    for name, value in query_params.items():
+        if name in IGNORED_PARAMS or value == '':
+            continue
+        if name in dimensions and name in exact:
+            facet_filters[name] = normalize_param(name, value)
+        else:
+            other = True
+    return facet_filters, other
+
+def _shape(rows):
+    facets, total = {}, 0
+    for dimension, value, count in rows:
+        if count <= 0:
+            continue
+        if dimension == ALL:
+            total = count
+        else:
+            facets.setdefault(dimension, {})[value] = count
+    return {'total': total, 'facets': facets}
+
+def table_counts(kind, facet_filters):
+    """Counts for no filter or a single exact facet filter, read straight from the table."""
+    given = '' if not facet_filters else '{}={}'.format(*next(iter(facet_filters.items())))
+    rows = FacetCount.objects.filter(kind=kind, given=given, count__gt=0).values_list('dimension', 'value', 'count')
+    return _shape(rows)
+
+def aggregate_counts(kind, queryset):
+    """Counts computed from the filtered items themselves."""
+    rows = Counter()
+    _, _, filters, dimensions, _ = FACET_SOURCES[kind]
+    fields = {'pk', *filters, *(field for _, field in dimensions.values())}
+    for instance in queryset.only(*fields).iterator():
+        values = facet_values(kind, instance)
+        if values is None:
+            continue
+        rows[(ALL, ALL)] += 1
+        rows.update((dimension, value) for dimension, items in values.items() for value in items)
+    return _shape((dimension, value, count) for (dimension, value), count in rows.items())
+
+def cached_counts(kind, query_params, queryset):
+    """Fallback for combinations the table does not cover, cached until the next facet change."""
+    version = cache.get(version_key(kind), 0)
+    params = '&'.join(f'{name}={value}' for name, value in sorted(query_params.items())
+                      if name not in IGNORED_PARAMS)
+    key = f'facets:{kind}:{version}:{hashlib.md5(params.encode()).hexdigest()}'
+    result = cache.get(key)
+    if result is None:
+        result = aggregate_counts(kind, queryset)
+        cache.set(key, result, FALLBACK_CACHE_TIMEOUT)
+    return result
+
+def source_queryset(kind):
+    app_label, model_name, filters, _, _ = FACET_SOURCES[kind]
+    return apps.get_model(app_label, model_name).objects.filter(**filters)
+
+@transaction.atomic
+def rebuild_facets(kind, batch_size=1000):
+    """Recount the table for one kind from the items. Returns the number of rows written."""
+    rows = Counter()
+    for instance in source_queryset(kind).iterator():
+        rows.update(facet_rows(kind, facet_values(kind, instance)))
+    FacetCount.objects.filter(kind=kind).delete()
+    FacetCount.objects.bulk_create([
+        FacetCount(kind=kind, given=given, dimension=dimension, value=value[:100], count=count)
+        for (given, dimension, value), count in rows.items()
+    ], batch_size=batch_size)
+    transaction.on_commit(lambda: bump_version(kind))
+    return len(rows)
+
+def facet_values_list(kind, dimension):
+    """Values of a dimension that at least one visible item has, from the table."""
+    return list(FacetCount.objects.filter(
+        kind=kind, given='', dimension=dimension, count__gt=0
+    ).order_by('value').values_list('value', flat=True))
@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+# Price bands in ETB: (label, inclusive lower bound, exclusive upper bound)
+PRICE_BANDS = (
+    ('0-500', Decimal('0'), Decimal('500')),
+    ('500-2000', Decimal('500'), Decimal('2000')),
+    ('2000-10000', Decimal('2000'), Decimal('10000')),
+    ('10000+', Decimal('10000'), None),
+)
+
+def price_band(price):
+    if price is None:
+        return None
+    price = Decimal(price)
+    for label, low, high in PRICE_BANDS:
+        if price >= low and (high is None or price < high):
+            return label
+    return None
+
+def price_band_bounds(label):
+    for band, low, high in PRICE_BANDS:
+        if band == label:
+            return low, high
+    return None
+
+def filter_price_band(queryset, name, value):
+    """django-filter method: keep rows whose `name` falls in the band labelled `value`."""
+    bounds = price_band_bounds(value)
+    if bounds is None:
+        return queryset.none()
+    low, high = bounds
+    queryset = queryset.filter(**{f'{name}__gte': low})
+    return queryset.filter(**{f'{name}__lt': high}) if high is not None else queryset
+
+def text(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+def scalar(instance, field):
+    value = getattr(instance, field)
+    return [] if value in (None, '') else [text(value)]
+
+def listed(instance, field):
+    # Case-insensitive like the package category index
+    return sorted({text(value).strip().lower() for value in getattr(instance, field) or [] if value not in (None, '')})
+
+def banded(instance, field):
+    band = price_band(getattr(instance, field))
+    return [band] if band else []
+
+# kind: (app label, model, filters an instance must match to be counted,
+#        {dimension: (value extractor, model field)}, dimensions whose query parameter is an exact match)
+FACET_SOURCES = {
+    'destination': (
+        'destinations', 'Destination', {'status': 'active'},
+        {'category': (scalar, 'category'), 'region': (scalar, 'region'), 'featured': (scalar, 'featured')},
+        {'category', 'region', 'featured'},
+    ),
+    'event': (
+        'events', 'Event', {'status': 'published'},
+        {'category': (scalar, 'category'), 'price_band': (banded, 'price'), 'featured': (scalar, 'featured')},
+        {'category', 'price_band', 'featured'},
+    ),
+    'package': (
+        'packages', 'Package', {'status': 'active'},
+        {
+            'category': (listed, 'category'), 'region': (scalar, 'region'), 'difficulty': (scalar, 'difficulty'),
+            'price_band': (banded, 'effective_min_price'), 'featured': (scalar, 'featured'),
+        },
+        # The package region filter is a substring match, so it goes through the fallback
+        {'category', 'difficulty', 'price_band', 'featured'},
+    ),
+}
+
+def normalize_param(dimension, value):
+    if dimension == 'featured':
+        return 'true' if value.lower() in ('true', '1', 'yes') else 'false'
+    if dimension == 'category':
+        return value.strip().lower()
+    return value
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from facets.dimensions import FACET_SOURCES
+from facets.counts import rebuild_facets
+
+class Command(BaseCommand):
+    help = 'Recount the facet count tables from the destinations, events and packages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=sorted(FACET_SOURCES), help='Rebuild a single kind')
+
+    def handle(self, *args, **options):
+        kinds = [options['only']] if options['only'] else sorted(FACET_SOURCES)
+        for kind in kinds:
+            rows = rebuild_facets(kind)
+            self.stdout.write(self.style.SUCCESS(f'{kind}: wrote {rows} facet rows'))
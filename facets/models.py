@@ -0,0 +1,22 @@
+from django.db import models
+
+class FacetCount(models.Model):
+    """
+    Number of visible items of a kind with `dimension` = `value`, either
+    overall (`given` empty) or among the items matching one other facet
+    value (`given` like "region=amhara").
+    """
+    kind = models.CharField(max_length=20)
+    given = models.CharField(max_length=120, blank=True)
+    dimension = models.CharField(max_length=30)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('kind', 'given', 'dimension', 'value')
+        indexes = [
+            models.Index(fields=['kind', 'given']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} [{self.given or '*'}] {self.dimension}={self.value}: {self.count}"
@@ -0,0 +1,51 @@
+from decimal import Decimal
+from types import SimpleNamespace
+from django.http import QueryDict
+from django.test import SimpleTestCase
+from .counts import ALL, facet_values, facet_rows, parse_filters
+from .dimensions import price_band, price_band_bounds
+
+def package(**fields):
+    values = {
+        'status': 'active', 'category': ['Hiking', 'Cultural'], 'region': 'Amhara',
+        'difficulty': 'Moderate', 'price': Decimal('1500'), 'effective_min_price': Decimal('1500'),
+        'featured': False,
+    }
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+class FacetTests(SimpleTestCase):
+    def test_price_bands(self):
+        self.assertEqual(price_band(Decimal('499.99')), '0-500')
+        self.assertEqual(price_band(500), '500-2000')
+        self.assertEqual(price_band(25000), '10000+')
+        self.assertEqual(price_band_bounds('10000+'), (Decimal('10000'), None))
+        self.assertIsNone(price_band_bounds('cheap'))
+
+    def test_hidden_items_contribute_nothing(self):
+        self.assertIsNone(facet_values('package', package(status='draft')))
+        self.assertEqual(facet_rows('package', None), {})
+
+    def test_rows_cover_overall_and_single_filter_counts(self):
+        rows = facet_rows('package', facet_values('package', package()))
+        self.assertEqual(rows[('', ALL, ALL)], 1)
+        self.assertEqual(rows[('', 'category', 'hiking')], 1)
+        self.assertEqual(rows[('category=hiking', 'category', 'cultural')], 1)
+        self.assertEqual(rows[('featured=false', 'price_band', '500-2000')], 1)
+        # Region is a substring filter for packages, so nothing is conditioned on it
+        self.assertFalse(any(given.startswith('region=') for given, _, _ in rows))
+
+    def test_edit_delta_only_touches_changed_rows(self):
+        before = facet_rows('package', facet_values('package', package()))
+        after = facet_rows('package', facet_values('package', package(featured=True)))
+        delta = after.copy()
+        delta.subtract(before)
+        self.assertEqual(delta[('', 'category', 'hiking')], 0)
+        self.assertEqual(delta[('', 'featured', 'true')], 1)
+        self.assertEqual(delta[('', 'featured', 'false')], -1)
+
+    def test_parse_filters(self):
+        filters, other = parse_filters('package', QueryDict('featured=True&page=2'))
+        self.assertEqual((filters, other), ({'featured': 'true'}, False))
+        filters, other = parse_filters('package', QueryDict('region=amh&difficulty=Easy'))
+        self.assertEqual((filters, other), ({'difficulty': 'Easy'}, True))
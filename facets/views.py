@@ -0,0 +1,23 @@
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from drf_yasg.utils import swagger_auto_schema
+from .counts import parse_filters, table_counts, cached_counts, source_queryset
+
+class FacetsMixin:
+    """
+    Adds a `facets` list action: item counts per value of every filterable
+    dimension, under the same query parameters the list endpoint takes.
+    """
+    facet_kind = None
+
+    @swagger_auto_schema(
+        operation_description="Counts per value of every filterable dimension for the current filters. "
+                              "Accepts the same query parameters as the list endpoint."
+    )
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        facet_filters, other_filters = parse_filters(self.facet_kind, request.query_params)
+        if not other_filters and len(facet_filters) <= 1:
+            return Response(table_counts(self.facet_kind, facet_filters))
+        queryset = self.filter_queryset(source_queryset(self.facet_kind))
+        return Response(cached_counts(self.facet_kind, request.query_params, queryset))
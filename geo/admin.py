@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import MapPoint, MapCell
+
+@admin.register(MapPoint)
+class MapPointAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'object_id', 'label', 'quadkey', 'weight', 'updated_at']
+    list_filter = ['kind']
+    search_fields = ['label', 'quadkey']
+    readonly_fields = ['quadkey', 'updated_at']
+
+@admin.register(MapCell)
+class MapCellAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'level', 'key', 'count']
+    list_filter = ['kind', 'level']
+    search_fields = ['key']
+    readonly_fields = ['kind', 'level', 'key', 'count', 'latitude_sum', 'longitude_sum', 'top']
@@ -0,0 +1,73 @@
+import math
+
+# Depth of the grid index. Level-16 cells are roughly 600 m across at the equator.
+MAX_LEVEL = 16
+# Clusters are cells this many levels below the view zoom: 4x4 clusters per 256px map tile
+CLUSTER_OFFSET = 2
+# Deepest zoom that is still clustered; beyond it clients show the points themselves
+MAX_CLUSTER_ZOOM = MAX_LEVEL - CLUSTER_OFFSET
+# Refuse bounding boxes that would need more tiles than this at the requested zoom
+MAX_TILES = 64
+MAX_LATITUDE = 85.05112878
+
+def tile_xy(latitude, longitude, zoom):
+    """Web Mercator tile containing a point."""
+    latitude = min(max(float(latitude), -MAX_LATITUDE), MAX_LATITUDE)
+    longitude = min(max(float(longitude), -180.0), 180.0)
+    scale = 1 << zoom
+    x = int((longitude + 180.0) / 360.0 * scale)
+    sin = math.sin(math.radians(latitude))
+    y = int((0.5 - math.log((1 + sin) / (1 - sin)) / (4 * math.pi)) * scale)
+    return min(max(x, 0), scale - 1), min(max(y, 0), scale - 1)
+
+def quadkey_from_tile(x, y, zoom):
+    digits = []
+    for level in range(zoom, 0, -1):
+        mask = 1 << (level - 1)
+        digits.append(str((1 if x & mask else 0) + (2 if y & mask else 0)))
+    return ''.join(digits)
+
+def quadkey(latitude, longitude, zoom=MAX_LEVEL):
+    """
+    Quadkey of the cell containing a point. Every prefix is the key of the
+    enclosing cell one level up, so one key addresses all levels at once and
+    the cells under a tile are a contiguous range of keys.
+    """
+    return quadkey_from_tile(*tile_xy(latitude, longitude, zoom), zoom)
+
+def key_range(prefix):
+    """Bounds (inclusive, exclusive) of every key under a cell; '4' sorts after the digits 0-3."""
+    return prefix, prefix + '4'
+
+def enclosing_keys(key, max_zoom=MAX_CLUSTER_ZOOM):
+    """Keys of the tiles at zoom 0..max_zoom that contain a cell."""
+    return [key[:zoom] for zoom in range(min(max_zoom, len(key)) + 1)]
+
+def tiles_for_bbox(south, west, north, east, zoom):
+    """Quadkeys of the tiles at `zoom` covering a bounding box; boxes crossing the antimeridian are split."""
+    if west > east:
+        return tiles_for_bbox(south, west, north, 180.0, zoom) + tiles_for_bbox(south, -180.0, north, east, zoom)
+    min_x, min_y = tile_xy(north, west, zoom)
+    max_x, max_y = tile_xy(south, east, zoom)
+    count = (max_x - min_x + 1) * (max_y - min_y + 1)
+    if count > MAX_TILES:
+        raise ValueError(f'The bounding box covers {count} tiles at zoom {zoom}; zoom in or send a smaller box.')
+    return [quadkey_from_tile(x, y, zoom) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+
+def parse_bbox(value):
+    """Parse 'south,west,north,east' in degrees."""
+    try:
+        south, west, north, east = (float(part) for part in (value or '').split(','))
+    except ValueError:
+        raise ValueError('bbox must be "south,west,north,east".')
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError('bbox is out of range.')
+    return south, west, north, east
+
+def in_bbox(latitude, longitude, bbox):
+    south, west, north, east = bbox
+    if not south <= latitude <= north:
+        return False
+    if west <= east:
+        return west <= longitude <= east
+    return longitude >= west or longitude <= east
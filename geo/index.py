@@ -0,0 +1,208 @@
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from .grid import (
+    CLUSTER_OFFSET, MAX_CLUSTER_ZOOM, quadkey, key_range, enclosing_keys,
+    tiles_for_bbox, in_bbox
+)
+from .models import MapPoint, MapCell
+
+# Representative items kept per cell
+TOP_ITEMS = 3
+TILE_CACHE_TIMEOUT = 60 * 60
+
+# kind: (app label, model, filters an instance must match to be shown, label field, weight field)
+MAP_SOURCES = {
+    'destination': ('destinations', 'Destination', {'status': 'active'}, 'title', 'rating'),
+    'event': ('events', 'Event', {'status': 'published'}, 'title', 'rating'),
+    'business': ('business', 'Business', {'status': 'approved'}, 'name', 'average_rating'),
+}
+
+def tile_cache_key(kind, key):
+    return f'map-clusters:{kind}:{key or "root"}'
+
+def cell_keys(key):
+    """Keys of every cell containing a level-MAX_LEVEL cell, root ('') first."""
+    return [key[:level] for level in range(len(key) + 1)]
+
+def _rank(entry):
+    return -entry['weight'], entry['id']
+
+def _best_points(kind, key):
+    low, high = key_range(key)
+    points = MapPoint.objects.filter(kind=kind, quadkey__gte=low, quadkey__lt=high).order_by('-weight', 'object_id')
+    return [point.summary() for point in points[:TOP_ITEMS]]
+
+def _update_top(kind, keys, object_id, summary):
+    """
+    Fold a point's new summary (None when it left) into the representative
+    lists of the given cells. Only a representative that left or lost weight
+    forces a rescan of the cell, everything else is a merge.
+    """
+    for cell in MapCell.objects.filter(kind=kind, key__in=keys):
+        previous = next((entry for entry in cell.top if entry['id'] == object_id), None)
+        if previous is not None and (summary is None or summary['weight'] < previous['weight']):
+            top = _best_points(kind, cell.key)
+        else:
+            entries = [entry for entry in cell.top if entry['id'] != object_id]
+            if summary is not None:
+                entries.append(summary)
+            top = sorted(entries, key=_rank)[:TOP_ITEMS]
+        if top != cell.top:
+            cell.top = top
+            cell.save(update_fields=['top'])
+
+def _shift_cells(kind, keys, count, latitude, longitude):
+    keys = list(keys)
+    if not keys:
+        return
+    if count > 0:
+        existing = set(MapCell.objects.filter(kind=kind, key__in=keys).values_list('key', flat=True))
+        MapCell.objects.bulk_create([
+            MapCell(kind=kind, level=len(key), key=key) for key in keys if key not in existing
+        ])
+    MapCell.objects.filter(kind=kind, key__in=keys).update(
+        count=F('count') + count,
+        latitude_sum=F('latitude_sum') + latitude,
+        longitude_sum=F('longitude_sum') + longitude,
+    )
+    if count < 0:
+        MapCell.objects.filter(kind=kind, key__in=keys, count__lte=0).delete()
+
+def _invalidate(kind, *keys):
+    tiles = set()
+    for key in keys:
+        if key is not None:
+            tiles.update(enclosing_keys(key))
+    cache.delete_many([tile_cache_key(kind, tile) for tile in tiles])
+
+@transaction.atomic
+def index_point(kind, object_id, latitude, longitude, label, weight):
+    """Add or move a point, updating every cell whose totals or representatives it changes."""
+    latitude, longitude, weight = float(latitude), float(longitude), float(weight or 0)
+    key = quadkey(latitude, longitude)
+    point = MapPoint.objects.filter(kind=kind, object_id=object_id).first()
+    if point is not None and (point.quadkey, point.latitude, point.longitude, point.label, point.weight) == (
+            key, latitude, longitude, label, weight):
+        return
+    if point is None:
+        old_key, old_latitude, old_longitude = None, 0.0, 0.0
+        point = MapPoint(kind=kind, object_id=object_id)
+    else:
+        old_key, old_latitude, old_longitude = point.quadkey, point.latitude, point.longitude
+    point.quadkey, point.latitude, point.longitude = key, latitude, longitude
+    point.label, point.weight = label[:200], weight
+    point.save()
+
+    new_cells = cell_keys(key)
+    old_cells = cell_keys(old_key) if old_key is not None else []
+    shared = [cell for cell in new_cells if cell in set(old_cells)]
+    _shift_cells(kind, [cell for cell in old_cells if cell not in set(shared)], -1, -old_latitude, -old_longitude)
+    _shift_cells(kind, shared, 0, latitude - old_latitude, longitude - old_longitude)
+    _shift_cells(kind, [cell for cell in new_cells if cell not in set(shared)], 1, latitude, longitude)
+    _update_top(kind, [cell for cell in old_cells if cell not in set(shared)], object_id, None)
+    _update_top(kind, new_cells, object_id, point.summary())
+    transaction.on_commit(lambda: _invalidate(kind, old_key, key))
+
+@transaction.atomic
+def remove_point(kind, object_id):
+    point = MapPoint.objects.filter(kind=kind, object_id=object_id).first()
+    if point is None:
+        return
+    point.delete()
+    cells = cell_keys(point.quadkey)
+    _shift_cells(kind, cells, -1, -point.latitude, -point.longitude)
+    _update_top(kind, cells, object_id, None)
+    transaction.on_commit(lambda: _invalidate(kind, point.quadkey))
+
+def _source_values(kind, instance):
+    _, _, filters, label_field, weight_field = MAP_SOURCES[kind]
+    visible = all(getattr(instance, field) == value for field, value in filters.items())
+    if not visible or instance.latitude is None or instance.longitude is None:
+        return None
+    return instance.latitude, instance.longitude, getattr(instance, label_field), getattr(instance, weight_field)
+
+def sync_instance(kind, instance):
+    """Index a saved source object, or drop it from the map when it is hidden or has no coordinates."""
+    values = _source_values(kind, instance)
+    if values is None:
+        remove_point(kind, instance.pk)
+    else:
+        index_point(kind, instance.pk, *values)
+
+def _tile_clusters(kind, tile, level):
+    low, high = key_range(tile)
+    cells = MapCell.objects.filter(kind=kind, level=level, key__gte=low, key__lt=high).values(
+        'key', 'count', 'latitude_sum', 'longitude_sum', 'top'
+    )
+    return [
+        {
+            'key': cell['key'],
+            'count': cell['count'],
+            'latitude': round(cell['latitude_sum'] / cell['count'], 6),
+            'longitude': round(cell['longitude_sum'] / cell['count'], 6),
+            'items': cell['top'],
+        }
+        for cell in cells if cell['count'] > 0
+    ]
+
+def clusters(kind, bbox, zoom):
+    """
+    Grid clusters whose centroid lies in bbox, one per non-empty cell
+    CLUSTER_OFFSET levels below the map zoom. Each covering tile is read from
+    the cache or built from at most 4**CLUSTER_OFFSET cell rows.
+    Raises ValueError when the box needs too many tiles.
+    """
+    zoom = min(max(int(zoom), 0), MAX_CLUSTER_ZOOM)
+    level = zoom + CLUSTER_OFFSET
+    tiles = tiles_for_bbox(*bbox, zoom)
+    cache_keys = {tile: tile_cache_key(kind, tile) for tile in tiles}
+    cached = cache.get_many(list(cache_keys.values()))
+    missing = {}
+    result = []
+    for tile in tiles:
+        tile_clusters = cached.get(cache_keys[tile])
+        if tile_clusters is None:
+            tile_clusters = missing[cache_keys[tile]] = _tile_clusters(kind, tile, level)
+        result.extend(cluster for cluster in tile_clusters if in_bbox(cluster['latitude'], cluster['longitude'], bbox))
+    if missing:
+        cache.set_many(missing, TILE_CACHE_TIMEOUT)
+    return result
+
+def source_queryset(kind):
+    app_label, model_name, filters, _, _ = MAP_SOURCES[kind]
+    return apps.get_model(app_label, model_name).objects.filter(
+        latitude__isnull=False, longitude__isnull=False, **filters
+    )
+
+@transaction.atomic
+def rebuild_index(kind, batch_size=1000):
+    """Recreate the points and cells of one kind from its source model. Returns (points, cells)."""
+    points = []
+    for instance in source_queryset(kind).iterator():
+        latitude, longitude, label, weight = _source_values(kind, instance)
+        latitude, longitude = float(latitude), float(longitude)
+        points.append(MapPoint(
+            kind=kind, object_id=instance.pk, quadkey=quadkey(latitude, longitude),
+            latitude=latitude, longitude=longitude, label=label[:200], weight=float(weight or 0),
+        ))
+    cells = {}
+    for point in sorted(points, key=lambda point: (-point.weight, point.object_id)):
+        for key in cell_keys(point.quadkey):
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = MapCell(kind=kind, level=len(key), key=key, top=[])
+            cell.count += 1
+            cell.latitude_sum += point.latitude
+            cell.longitude_sum += point.longitude
+            if len(cell.top) < TOP_ITEMS:
+                cell.top.append(point.summary())
+    stale_tiles = set(MapCell.objects.filter(kind=kind, level__lte=MAX_CLUSTER_ZOOM).values_list('key', flat=True))
+    MapPoint.objects.filter(kind=kind).delete()
+    MapCell.objects.filter(kind=kind).delete()
+    MapPoint.objects.bulk_create(points, batch_size=batch_size)
+    MapCell.objects.bulk_create(cells.values(), batch_size=batch_size)
+    stale_tiles.update(key for key in cells if len(key) <= MAX_CLUSTER_ZOOM)
+    transaction.on_commit(lambda: cache.delete_many([tile_cache_key(kind, tile) for tile in stale_tiles]))
+    return len(points), len(cells)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from geo.index import MAP_SOURCES, rebuild_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the map grid index (points, cell totals and representatives) from the source models'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=sorted(MAP_SOURCES), help='Rebuild a single kind')
+
+    def handle(self, *args, **options):
+        kinds = [options['only']] if options['only'] else sorted(MAP_SOURCES)
+        for kind in kinds:
+            points, cells = rebuild_index(kind)
+            self.stdout.write(self.style.SUCCESS(f'{kind}: indexed {points} points in {cells} cells'))
@@ -0,0 +1,57 @@
+from django.db import models
+
+class MapPoint(models.Model):
+    """One indexed map pin: where it is and what a cluster shows when it is picked as representative."""
+    KIND_CHOICES = (
+        ('destination', 'Destination'),
+        ('event', 'Event'),
+        ('business', 'Business'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    quadkey = models.CharField(max_length=32)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    label = models.CharField(max_length=200)
+    # Higher ranks first when choosing a cluster's representative items
+    weight = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+        indexes = [
+            models.Index(fields=['kind', 'quadkey']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} @ {self.quadkey}"
+
+    def summary(self):
+        return {
+            'id': self.object_id,
+            'label': self.label,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'weight': self.weight,
+        }
+
+class MapCell(models.Model):
+    """Running totals for one grid cell; the cell's level is the length of its key."""
+    kind = models.CharField(max_length=20, choices=MapPoint.KIND_CHOICES)
+    level = models.PositiveSmallIntegerField()
+    key = models.CharField(max_length=32)
+    count = models.PositiveIntegerField(default=0)
+    latitude_sum = models.FloatField(default=0)
+    longitude_sum = models.FloatField(default=0)
+    # Best few MapPoint summaries in the cell by weight, see geo.index.TOP_ITEMS
+    top = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        unique_together = ('kind', 'key')
+        indexes = [
+            models.Index(fields=['kind', 'level', 'key']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.key or 'root'} ({self.count})"
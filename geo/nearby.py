@@ -0,0 +1,47 @@
+import math
+from django.db.models import Q
+from .grid import MAX_LEVEL, key_range, quadkey_from_tile, tile_xy
+from .models import MapPoint
+from .routes import EARTH_RADIUS_KM, haversine_km
+
+def search_level(latitude, radius_km):
+    """
+    Deepest grid level whose cells are still at least radius_km wide at this
+    latitude, so everything within the radius lies in the 3x3 block of cells
+    around a point.
+    """
+    width = 2 * math.pi * EARTH_RADIUS_KM * max(math.cos(math.radians(float(latitude))), 1e-6)
+    level = int(math.floor(math.log2(width / radius_km)))
+    return min(max(level, 0), MAX_LEVEL)
+
+def neighbour_cells(latitude, longitude, level):
+    """Keys of the cell containing a point and of the cells around it; x wraps at the antimeridian."""
+    x, y = tile_xy(latitude, longitude, level)
+    scale = 1 << level
+    keys = []
+    for dy in (-1, 0, 1):
+        if not 0 <= y + dy < scale:
+            continue
+        for dx in (-1, 0, 1):
+            key = quadkey_from_tile((x + dx) % scale, y + dy, level)
+            if key not in keys:
+                keys.append(key)
+    return keys
+
+def points_within(latitude, longitude, radius_km, kinds):
+    """
+    Indexed points of the given kinds within radius_km of a point, closest
+    first, as (distance in km, MapPoint) pairs. Reads one key range per
+    neighbouring cell instead of every point.
+    """
+    ranges = Q()
+    for key in neighbour_cells(latitude, longitude, search_level(latitude, radius_km)):
+        low, high = key_range(key)
+        ranges |= Q(quadkey__gte=low, quadkey__lt=high)
+    points = list(MapPoint.objects.filter(ranges, kind__in=list(kinds)))
+    if not points:
+        return []
+    distances = haversine_km([point.latitude for point in points], [point.longitude for point in points],
+                             latitude, longitude)
+    found = [(float(distance), point) for distance, point in zip(distances, points) if distance <= radius_km]
+    return sorted(found, key=lambda pair: (pair[0], pair[1].kind, pair[1].object_id))
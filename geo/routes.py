@@ -0,0 +1,63 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+def haversine_km(latitudes, longitudes, latitude, longitude):
+    """Great-circle distances in km from one point to arrays of points."""
+    lat1, lng1 = np.radians(np.asarray(latitudes, dtype=np.float64)), np.radians(np.asarray(longitudes, dtype=np.float64))
+    lat2, lng2 = np.radians(float(latitude)), np.radians(float(longitude))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def distance_matrix(latitudes, longitudes):
+    """Symmetric N x N matrix of great-circle distances in km (float32)."""
+    latitudes, longitudes = np.asarray(latitudes, dtype=np.float64), np.asarray(longitudes, dtype=np.float64)
+    matrix = np.zeros((len(latitudes), len(latitudes)), dtype=np.float32)
+    for row in range(len(latitudes)):
+        matrix[row] = haversine_km(latitudes, longitudes, latitudes[row], longitudes[row])
+    return matrix
+
+def route_length(matrix, order):
+    return float(sum(matrix[a, b] for a, b in zip(order, order[1:])))
+
+def nearest_neighbour(matrix, start=0):
+    """Open path visiting every row once, always moving to the closest unvisited stop."""
+    size = matrix.shape[0]
+    order, visited = [start], np.zeros(size, dtype=bool)
+    visited[start] = True
+    for _ in range(size - 1):
+        distances = np.where(visited, np.inf, matrix[order[-1]])
+        nearest = int(np.argmin(distances))
+        order.append(nearest)
+        visited[nearest] = True
+    return order
+
+def two_opt(matrix, order, max_passes=50):
+    """
+    Improve an open path by reversing segments while that shortens it. The
+    first stop stays fixed; the last may change since the path does not return.
+    """
+    order = list(order)
+    size = len(order)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, size - 1):
+            for j in range(i + 1, size):
+                before = matrix[order[i - 1], order[i]]
+                after = matrix[order[i - 1], order[j]]
+                if j + 1 < size:
+                    before += matrix[order[j], order[j + 1]]
+                    after += matrix[order[i], order[j + 1]]
+                if after + 1e-6 < before:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    improved = True
+        if not improved:
+            break
+    return order
+
+def plan_route(matrix, start=0):
+    """Nearest-neighbour tour polished with 2-opt. Returns (order, length in km)."""
+    if matrix.shape[0] < 2:
+        return list(range(matrix.shape[0])), 0.0
+    order = two_opt(matrix, nearest_neighbour(matrix, start))
+    return order, route_length(matrix, order)
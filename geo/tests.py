@@ -0,0 +1,146 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from business.models import Business
+from .grid import quadkey, key_range, tiles_for_bbox, parse_bbox, in_bbox, enclosing_keys
+from .index import clusters, rebuild_index, tile_cache_key
+from .models import MapCell
+from .routes import haversine_km, distance_matrix, nearest_neighbour, plan_route, route_length
+from .nearby import search_level, neighbour_cells
+
+ADDIS_ABABA = (9.0108, 38.7613)
+LALIBELA = (12.0317, 39.0476)
+
+class GridTests(SimpleTestCase):
+    def test_quadkey_prefixes_are_enclosing_cells(self):
+        key = quadkey(*ADDIS_ABABA)
+        self.assertEqual(len(key), 16)
+        for zoom in range(17):
+            self.assertEqual(quadkey(*ADDIS_ABABA, zoom=zoom), key[:zoom])
+
+    def test_key_range_covers_subtree_only(self):
+        low, high = key_range(quadkey(*ADDIS_ABABA, zoom=6))
+        self.assertTrue(low <= quadkey(*ADDIS_ABABA) < high)
+        self.assertFalse(low <= quadkey(-33.9, 18.4) < high)
+
+    def test_tiles_for_bbox(self):
+        self.assertEqual(tiles_for_bbox(-85, -180, 85, 180, 0), [''])
+        tiles = tiles_for_bbox(8.5, 38.0, 12.5, 39.5, 6)
+        self.assertIn(quadkey(*ADDIS_ABABA, zoom=6), tiles)
+        self.assertIn(quadkey(*LALIBELA, zoom=6), tiles)
+        with self.assertRaises(ValueError):
+            tiles_for_bbox(-60, -170, 60, 170, 10)
+
+    def test_bbox_parsing_and_antimeridian(self):
+        bbox = parse_bbox('-10,170,10,-170')
+        self.assertTrue(in_bbox(0, 175, bbox))
+        self.assertFalse(in_bbox(0, 0, bbox))
+        with self.assertRaises(ValueError):
+            parse_bbox('1,2,3')
+
+    def test_enclosing_keys_stop_at_cluster_zoom(self):
+        key = quadkey(*ADDIS_ABABA)
+        self.assertEqual(enclosing_keys(key, max_zoom=3), ['', key[:1], key[:2], key[:3]])
+
+class RouteTests(SimpleTestCase):
+    def test_haversine(self):
+        distance = haversine_km([ADDIS_ABABA[0]], [ADDIS_ABABA[1]], *LALIBELA)[0]
+        self.assertAlmostEqual(distance, 336, delta=5)
+
+    def test_two_opt_improves_nearest_neighbour(self):
+        # Points along a parallel; from 38.3 nearest neighbour goes east first and has to double back
+        longitudes = [38.0, 38.1, 38.3, 38.4, 38.9]
+        matrix = distance_matrix([9.0] * len(longitudes), longitudes)
+        greedy = nearest_neighbour(matrix, start=2)
+        self.assertEqual(greedy, [2, 3, 1, 0, 4])
+        order, length = plan_route(matrix, start=2)
+        self.assertEqual(order[0], 2)
+        self.assertEqual(sorted(order), list(range(len(longitudes))))
+        self.assertLess(length, route_length(matrix, greedy) - 10)
+        self.assertAlmostEqual(length, route_length(matrix, [2, 1, 0, 3, 4]), delta=0.01)
+
+class NearbyGridTests(SimpleTestCase):
+    def test_search_level_cells_are_wider_than_radius(self):
+        self.assertEqual(search_level(9.0, 50), 9)
+        self.assertLess(search_level(60.0, 50), search_level(0.0, 50))
+
+    def test_neighbour_cells_surround_the_point(self):
+        keys = neighbour_cells(9.03, 38.74, 9)
+        self.assertEqual(len(keys), 9)
+        self.assertIn(quadkey(9.03, 38.74, 9), keys)
+        self.assertIn(quadkey(9.03 + 0.45, 38.74 + 0.45, 9), keys)
+
+    def test_neighbour_cells_wrap_at_antimeridian(self):
+        keys = neighbour_cells(0.1, 179.9, 4)
+        self.assertIn(quadkey(0.1, -179.9, 4), keys)
+
+class IncrementalIndexTests(TestCase):
+    """Saves and deletes keep the cells equal to a rebuild from scratch."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = get_user_model().objects.create_user(username='owner', email='owner@example.com', password='pass')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.businesses = [
+                self.make_business(f'Place {index}', latitude, longitude, rating)
+                for index, (latitude, longitude, rating) in enumerate([
+                    ('9.010800', '38.761300', '4.80'), ('9.020000', '38.750000', '4.50'),
+                    ('9.030000', '38.740000', '4.20'), ('12.031700', '39.047600', '3.90'),
+                    ('12.040000', '39.050000', '3.10'),
+                ])
+            ]
+
+    def make_business(self, name, latitude, longitude, rating):
+        return Business.objects.create(
+            name=name, business_type='hotel', description='Rooms', contact_email='place@example.com',
+            contact_phone='0911000000', region='Amhara', city='Addis Ababa', address='Main road',
+            main_image='https://example.com/place.jpg', status='approved', owner=self.owner,
+            latitude=Decimal(latitude), longitude=Decimal(longitude), average_rating=Decimal(rating),
+        )
+
+    def cells(self):
+        return {
+            cell.key: (cell.count, round(cell.latitude_sum, 6), round(cell.longitude_sum, 6), cell.top)
+            for cell in MapCell.objects.filter(kind='business')
+        }
+
+    def assert_matches_rebuild(self):
+        incremental = self.cells()
+        rebuild_index('business')
+        self.assertEqual(incremental, self.cells())
+
+    def test_move_delete_and_hide_match_a_rebuild(self):
+        first, second, third, fourth, fifth = self.businesses
+        with self.captureOnCommitCallbacks(execute=True):
+            first.average_rating = Decimal('1.00')
+            first.save()
+            second.latitude, second.longitude = Decimal('12.050000'), Decimal('39.060000')
+            second.save()
+            third.status = 'pending'
+            third.save()
+            fourth.delete()
+            fifth.average_rating = Decimal('5.00')
+            fifth.save()
+        self.assertEqual(self.cells()[''][0], 3)
+        self.assert_matches_rebuild()
+
+    def test_changes_invalidate_the_cached_tiles(self):
+        bbox = parse_bbox('8,38,13,40')
+        clusters('business', bbox, 0)
+        clusters('business', bbox, 4)
+        tiles = [tile_cache_key('business', ''), tile_cache_key('business', quadkey(9.0108, 38.7613, zoom=4))]
+        self.assertTrue(all(cache.get(key) is not None for key in tiles))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.businesses[0].latitude = Decimal('9.015000')
+            self.businesses[0].save()
+        self.assertTrue(all(cache.get(key) is None for key in tiles))
+        self.assertEqual(clusters('business', bbox, 0)[0]['count'], 5)
+
+        clusters('business', bbox, 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.businesses[1].status = 'pending'
+            self.businesses[1].save()
+        self.assertTrue(all(cache.get(key) is None for key in tiles))
+        self.assertEqual(clusters('business', bbox, 0)[0]['count'], 4)
@@ -0,0 +1,32 @@
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from .grid import parse_bbox
+from .index import clusters
+
+class MapClustersMixin:
+    """Adds a `clusters` list action to a viewset whose objects are indexed under `map_kind`."""
+    map_kind = None
+
+    @swagger_auto_schema(
+        operation_description="Grid clusters (count, centroid, representative items) inside a bounding box",
+        manual_parameters=[
+            openapi.Parameter('bbox', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                              description='south,west,north,east in degrees'),
+            openapi.Parameter('zoom', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True,
+                              description='Map zoom level'),
+        ]
+    )
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        try:
+            zoom = int(request.query_params.get('zoom', ''))
+        except ValueError:
+            return Response({'error': 'zoom must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = clusters(self.map_kind, parse_bbox(request.query_params.get('bbox')), zoom)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'zoom': zoom, 'clusters': result})
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Package, PackageReview, SavedPackage, Departure
+from .models import Package, PackageReview, SavedPackage, Departure, PackageCategory
 
 @admin.register(Package)
 class PackageAdmin(admin.ModelAdmin):
@@ -54,4 +54,10 @@ class DepartureAdmin(admin.ModelAdmin):
     list_display = ['package', 'start_date', 'end_date', 'price', 'available_slots', 'is_guaranteed']
     list_filter = ['start_date', 'is_guaranteed']
     search_fields = ['package__title']
-    readonly_fields = ['created_at', 'updated_at']
\ No newline at end of file
+    readonly_fields = ['created_at', 'updated_at']
+
+@admin.register(PackageCategory)
+class PackageCategoryAdmin(admin.ModelAdmin):
+    list_display = ['label', 'name', 'package_count']
+    search_fields = ['name', 'label']
+    readonly_fields = ['name', 'package_count']
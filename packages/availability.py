@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from django.db.models import Q
+from .models import Package, Departure
+
+# Widest window one search may cover
+MAX_SEARCH_DAYS = 92
+DEFAULT_SEARCH_DAYS = 30
+
+def _date(value, name):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a date (YYYY-MM-DD).')
+
+def _decimal(value, name):
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f'{name} must be a number.')
+
+def parse_search(params, today):
+    """Validate availability search parameters. Raises ValueError with a client-facing message."""
+    start = _date(params['start'], 'start') if params.get('start') else today
+    start = max(start, today)
+    end = _date(params['end'], 'end') if params.get('end') else start + timedelta(days=DEFAULT_SEARCH_DAYS)
+    if end < start:
+        raise ValueError('end must not be before start.')
+    if (end - start).days > MAX_SEARCH_DAYS:
+        raise ValueError(f'Search at most {MAX_SEARCH_DAYS} days at a time.')
+    try:
+        seats = int(params.get('seats') or 1)
+    except ValueError:
+        raise ValueError('seats must be a whole number.')
+    if seats < 1:
+        raise ValueError('seats must be at least 1.')
+    difficulty = params.get('difficulty') or None
+    if difficulty and difficulty not in dict(Package.DIFFICULTY_CHOICES):
+        raise ValueError('difficulty must be one of Easy, Moderate, Challenging.')
+    return {
+        'start': start,
+        'end': end,
+        'seats': seats,
+        'region': params.get('region') or None,
+        'difficulty': difficulty,
+        'min_price': _decimal(params['min_price'], 'min_price') if params.get('min_price') else None,
+        'max_price': _decimal(params['max_price'], 'max_price') if params.get('max_price') else None,
+    }
+
+def available_departures(start, end, seats, region=None, difficulty=None, min_price=None, max_price=None):
+    """
+    Departures leaving between start and end (inclusive) with at least
+    `seats` open, on active packages, with their package joined in the same
+    query. The leading range on (start_date, available_slots) is what keeps
+    this fast; package conditions only narrow the rows that range returns.
+    A departure without its own price is priced at the package's price.
+    """
+    queryset = Departure.objects.filter(
+        start_date__gte=start,
+        start_date__lte=end,
+        available_slots__gte=seats,
+        package__status='active',
+    ).select_related('package')
+    if region:
+        queryset = queryset.filter(package__region__iexact=region)
+    if difficulty:
+        queryset = queryset.filter(package__difficulty=difficulty)
+    if min_price is not None:
+        queryset = queryset.filter(Q(price__gte=min_price) | Q(price__isnull=True, package__price__gte=min_price))
+    if max_price is not None:
+        queryset = queryset.filter(Q(price__lte=max_price) | Q(price__isnull=True, package__price__lte=max_price))
+    return queryset
@@ -0,0 +1,58 @@
+from django.db import transaction
+from .models import Package, PackageCategory, PackageCategoryMembership
+
+def category_labels(categories):
+    """{normalized name: label} for a package's category list, de-duplicated in order."""
+    labels = {}
+    for category in categories or []:
+        if category is None:
+            continue
+        name = PackageCategory.normalize(category)
+        if name and name not in labels:
+            labels[name] = str(category).strip()[:100]
+    return labels
+
+def refresh_category_counts(category_ids):
+    for category_id in category_ids:
+        count = PackageCategoryMembership.objects.filter(
+            category_id=category_id, package__status='active'
+        ).count()
+        PackageCategory.objects.filter(pk=category_id).update(package_count=count)
+
+def sync_package_categories(package, status_changed=False):
+    """
+    Bring a package's rows in the category index in line with its category
+    list and recount the categories it gained or lost (all of them if its
+    status changed).
+    """
+    labels = category_labels(package.category)
+    with transaction.atomic():
+        categories = {category.name: category for category in PackageCategory.objects.filter(name__in=labels)}
+        for name, label in labels.items():
+            if name not in categories:
+                categories[name], _ = PackageCategory.objects.get_or_create(name=name, defaults={'label': label})
+        wanted = {category.pk for category in categories.values()}
+        current = set(PackageCategoryMembership.objects.filter(package=package).values_list('category_id', flat=True))
+        removed, added = current - wanted, wanted - current
+        if removed:
+            PackageCategoryMembership.objects.filter(package=package, category_id__in=removed).delete()
+        PackageCategoryMembership.objects.bulk_create([
+            PackageCategoryMembership(package=package, category_id=category_id) for category_id in added
+        ])
+        refresh_category_counts((wanted | removed) if status_changed else (added | removed))
+
+def package_ids_in_category(name):
+    """Ids of packages in a category, by equality on the normalized name."""
+    return set(PackageCategoryMembership.objects.filter(
+        category__name=PackageCategory.normalize(name)
+    ).values_list('package_id', flat=True))
+
+def rebuild_category_index():
+    """Recreate the whole category index from the packages' category lists. Returns the number of categories."""
+    with transaction.atomic():
+        PackageCategoryMembership.objects.all().delete()
+        PackageCategory.objects.all().delete()
+        for package in Package.objects.only('id', 'category', 'status').iterator():
+            sync_package_categories(package)
+        refresh_category_counts(PackageCategory.objects.values_list('pk', flat=True))
+    return PackageCategory.objects.count()
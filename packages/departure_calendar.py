@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from core.conditional import make_etag
+from .models import Departure
+
+# The artifact is dropped on change, so the timeout only bounds memory use
+CALENDAR_CACHE_TIMEOUT = 24 * 60 * 60
+
+def calendar_cache_key(package_id):
+    return f'package-calendar:{package_id}'
+
+def build_calendar(package_id, today=None):
+    """
+    Upcoming departures of a package grouped by month, with an ETag over the
+    content. `valid_until` is the first departure date: once that day has
+    passed the artifact holds a past departure and is rebuilt.
+    """
+    today = today or timezone.localdate()
+    departures = Departure.objects.filter(
+        package_id=package_id, start_date__gte=today
+    ).order_by('start_date', 'id').values(
+        'id', 'start_date', 'end_date', 'price', 'available_slots', 'is_guaranteed'
+    )
+    months = []
+    for departure in departures:
+        month = departure['start_date'].strftime('%Y-%m')
+        if not months or months[-1]['month'] != month:
+            months.append({'month': month, 'departures': []})
+        months[-1]['departures'].append({
+            'id': departure['id'],
+            'start_date': departure['start_date'].isoformat(),
+            'end_date': departure['end_date'].isoformat() if departure['end_date'] else None,
+            'price': str(departure['price']) if departure['price'] is not None else None,
+            'available_slots': departure['available_slots'],
+            'is_guaranteed': departure['is_guaranteed'],
+        })
+    first = months[0]['departures'][0]['start_date'] if months else None
+    return {
+        'package': package_id,
+        'months': months,
+        'valid_until': first,
+        'etag': make_etag(package_id, months),
+    }
+
+def package_calendar(package_id, today=None):
+    """The cached calendar artifact, rebuilt when missing or holding a departure that has left."""
+    today = today or timezone.localdate()
+    key = calendar_cache_key(package_id)
+    calendar = cache.get(key)
+    if calendar is None or (calendar['valid_until'] and calendar['valid_until'] < today.isoformat()):
+        calendar = build_calendar(package_id, today)
+        cache.set(key, calendar, CALENDAR_CACHE_TIMEOUT)
+    return calendar
+
+def invalidate_calendar(package_id):
+    # After commit, so a concurrent read cannot cache the old rows again
+    if package_id:
+        transaction.on_commit(lambda: cache.delete(calendar_cache_key(package_id)))
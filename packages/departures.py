@@ -0,0 +1,95 @@
+from datetime import timedelta
+from dateutil.rrule import rrule, DAILY, WEEKLY, MONTHLY, MO, TU, WE, TH, FR, SA, SU
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F, Sum
+from .models import Departure
+from .pricing import refresh_effective_price
+from .departure_calendar import invalidate_calendar
+
+# Largest number of departures one bulk request may write
+MAX_BULK_DEPARTURES = 400
+FREQUENCIES = {'daily': DAILY, 'weekly': WEEKLY, 'monthly': MONTHLY}
+WEEKDAYS = {'MO': MO, 'TU': TU, 'WE': WE, 'TH': TH, 'FR': FR, 'SA': SA, 'SU': SU}
+
+class CapacityError(ValueError):
+    pass
+
+def expand_rule(freq, start, until=None, count=None, interval=1, weekdays=None):
+    """Dates produced by a recurrence rule, capped one past MAX_BULK_DEPARTURES so callers can reject it."""
+    rule = rrule(
+        FREQUENCIES[freq], dtstart=start, interval=interval, until=until,
+        count=min(count, MAX_BULK_DEPARTURES + 1) if count else None,
+        byweekday=[WEEKDAYS[day] for day in weekdays] if weekdays else None,
+    )
+    dates = []
+    for occurrence in rule:
+        dates.append(occurrence.date())
+        if len(dates) > MAX_BULK_DEPARTURES:
+            break
+    return dates
+
+def held_seats(departures):
+    """Seats held by bookings that are not cancelled, per departure id."""
+    Booking = apps.get_model('booking', 'Booking')
+    rows = Booking.objects.filter(departure__in=departures).exclude(status='cancelled').values(
+        'departure_id'
+    ).annotate(seats=Sum('number_of_people'))
+    return {row['departure_id']: row['seats'] or 0 for row in rows}
+
+def bulk_upsert_departures(package, dates, duration_days, fields, capacity=None, on_conflict='skip', batch_size=200):
+    """
+    Create a departure for each date in one transaction. Dates that already
+    have a departure are skipped or, with on_conflict='update', updated in
+    place with only the given fields. ``capacity`` is the total seat count:
+    new departures open with all of it (package.max_group_size when None),
+    existing ones keep their booked seats and open the rest. Raises
+    CapacityError when a departure already holds more seats than capacity.
+    Signals do not fire for bulk writes, so the package's effective price and
+    cached calendar are refreshed once at the end.
+    Returns (created, updated, skipped) lists of dates.
+    """
+    dates = sorted(set(dates))
+    with transaction.atomic():
+        existing = {
+            departure.start_date: departure
+            for departure in Departure.objects.filter(package=package, start_date__in=dates)
+        }
+        to_create, to_update, skipped = [], [], []
+        for start_date in dates:
+            end_date = start_date + timedelta(days=max(duration_days, 1) - 1)
+            departure = existing.get(start_date)
+            if departure is None:
+                to_create.append(Departure(
+                    package=package, start_date=start_date, end_date=end_date,
+                    available_slots=package.max_group_size if capacity is None else capacity, **fields
+                ))
+            elif on_conflict == 'update':
+                departure.end_date = end_date
+                for field, value in fields.items():
+                    setattr(departure, field, value)
+                to_update.append(departure)
+            else:
+                skipped.append(start_date)
+        held = held_seats(to_update) if to_update and capacity is not None else {}
+        if capacity is not None:
+            for departure in to_update:
+                if held.get(departure.pk, 0) > capacity:
+                    raise CapacityError(
+                        f'Departure {departure.start_date} already has {held[departure.pk]} seats booked.'
+                    )
+        Departure.objects.bulk_create(to_create, batch_size=batch_size)
+        if to_update:
+            Departure.objects.bulk_update(to_update, ['end_date', *fields], batch_size=batch_size)
+        if capacity is not None:
+            # Shift open seats by the capacity change rather than writing a count,
+            # so reservations taken meanwhile are kept
+            for departure in to_update:
+                current = (departure.available_slots or 0) + held.get(departure.pk, 0)
+                Departure.objects.filter(pk=departure.pk).update(
+                    available_slots=F('available_slots') + (capacity - current)
+                )
+        if to_create or to_update:
+            refresh_effective_price(package.pk)
+            invalidate_calendar(package.pk)
+    return [d.start_date for d in to_create], [d.start_date for d in to_update], skipped
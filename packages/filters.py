@@ -1,6 +1,8 @@
 from django_filters import rest_framework as filters
 from django_filters.filters import CharFilter
+from facets.dimensions import filter_price_band
 from .models import Package
+from .categories import package_ids_in_category
 
 class JSONFieldFilter(CharFilter):
     def filter(self, qs, value):
@@ -8,17 +10,25 @@ class JSONFieldFilter(CharFilter):
             return qs.filter(**{f"{self.field_name}__contains": value})
         return qs
 
+class CategoryIndexFilter(CharFilter):
+    """Case-insensitive category match through the package category index."""
+    def filter(self, qs, value):
+        if value not in (None, ''):
+            return qs.filter(id__in=package_ids_in_category(value))
+        return qs
+
 class PackageFilter(filters.FilterSet):
-    category = JSONFieldFilter()
-    min_price = filters.NumberFilter(field_name='price', lookup_expr='gte')
-    max_price = filters.NumberFilter(field_name='price', lookup_expr='lte')
+    category = CategoryIndexFilter()
+    min_price = filters.NumberFilter(field_name='effective_min_price', lookup_expr='gte')
+    max_price = filters.NumberFilter(field_name='effective_min_price', lookup_expr='lte')
+    price_band = filters.CharFilter(field_name='effective_min_price', method=filter_price_band)
     region = filters.CharFilter(lookup_expr='icontains')
     difficulty = filters.ChoiceFilter(choices=Package.DIFFICULTY_CHOICES)
     status = filters.ChoiceFilter(choices=Package.STATUS_CHOICES)
 
     class Meta:
         model = Package
-        fields = ['category', 'region', 'featured', 'difficulty', 'status', 'min_price', 'max_price']
+        fields = ['category', 'region', 'featured', 'difficulty', 'status', 'min_price', 'max_price', 'price_band']
         filter_overrides = {
             'JSONField': {
                 'filter_class': JSONFieldFilter,
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from packages.categories import rebuild_category_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the package category index and per-category package counts from the packages'
+
+    def handle(self, *args, **options):
+        categories = rebuild_category_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {categories} categories'))
@@ -1,11 +1,13 @@
 from django.db import models
 from django.utils.text import slugify
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from djongo.models import JSONField
+from core.ratings import RatingHistogramMixin
 
 User = get_user_model()
 
-class Package(models.Model):
+class Package(RatingHistogramMixin, models.Model):
     DIFFICULTY_CHOICES = [
         ('Easy', 'Easy'),
         ('Moderate', 'Moderate'),
@@ -32,6 +34,8 @@ class Package(models.Model):
     duration_in_days = models.IntegerField()
     image = models.CharField(max_length=200, blank=True)  # GridFS ID or URL
     gallery_images = JSONField(default=list)  # Replace ArrayField with JSONField
+    # Responsive variants keyed by original image URL, filled in by uploads.tasks.process_image
+    image_variants = JSONField(default=dict, blank=True)
     category = JSONField(default=list)  # Replace ArrayField with JSONField
     included = JSONField(default=list)  # Replace ArrayField with JSONField
     not_included = JSONField(default=list)  # Replace ArrayField with JSONField
@@ -48,14 +52,41 @@ class Package(models.Model):
     coordinates = JSONField(default=[0.0, 0.0])  # Replace ArrayField with JSONField
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     featured = models.BooleanField(default=False)
+    # Lowest bookable price: price, discounted_price or the cheapest upcoming departure with seats.
+    # Kept current by Package.save and packages.pricing; expires the day that departure leaves.
+    effective_min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, editable=False)
+    effective_price_expires = models.DateField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        self.effective_min_price, self.effective_price_expires = self.effective_price()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'effective_min_price', 'effective_price_expires'}
         super().save(*args, **kwargs)
 
+    def effective_price(self, today=None):
+        """
+        (lowest price a traveller can book today, date of the departure that
+        price comes from or None when it comes from the package itself).
+        """
+        prices = [price for price in (self.price, self.discounted_price) if price is not None and price > 0]
+        best = min(prices) if prices else None
+        expires = None
+        if self.pk is not None:
+            departure = Departure.objects.filter(
+                package_id=self.pk,
+                start_date__gte=today or timezone.localdate(),
+                available_slots__gt=0,
+                price__isnull=False,
+            ).order_by('price', 'start_date').values('price', 'start_date').first()
+            if departure and (best is None or departure['price'] < best):
+                best, expires = departure['price'], departure['start_date']
+        return best, expires
+
     def __str__(self):
         return self.title
 
@@ -66,8 +97,48 @@ class Package(models.Model):
             models.Index(fields=['region']),
             models.Index(fields=['featured']),
             models.Index(fields=['status']),
+            models.Index(fields=['status', 'effective_min_price']),
+            models.Index(fields=['effective_price_expires']),
         ]
 
+class PackageCategory(models.Model):
+    """
+    Category index for packages. ``name`` is the normalized (stripped,
+    lower-case) category, ``label`` its spelling as first seen and
+    ``package_count`` the number of active packages in it.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    label = models.CharField(max_length=100)
+    package_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-package_count', 'name']
+        verbose_name_plural = 'Package categories'
+        indexes = [
+            models.Index(fields=['package_count']),
+        ]
+
+    @staticmethod
+    def normalize(name):
+        return str(name).strip().lower()[:100]
+
+    def __str__(self):
+        return self.label
+
+class PackageCategoryMembership(models.Model):
+    package = models.ForeignKey(Package, on_delete=models.CASCADE, related_name='category_links')
+    category = models.ForeignKey(PackageCategory, on_delete=models.CASCADE, related_name='package_links')
+
+    class Meta:
+        unique_together = ('category', 'package')
+        indexes = [
+            models.Index(fields=['category', 'package']),
+            models.Index(fields=['package']),
+        ]
+
+    def __str__(self):
+        return f"{self.category_id} -> {self.package_id}"
+
 class PackageReview(models.Model):
     id = models.AutoField(primary_key=True)
     package = models.ForeignKey(Package, on_delete=models.CASCADE, related_name='reviews', null=True)
@@ -129,4 +200,6 @@ class Departure(models.Model):
         indexes = [
             models.Index(fields=['start_date']),
             models.Index(fields=['is_guaranteed']),
+            models.Index(fields=['package', 'price', 'start_date']),
+            models.Index(fields=['start_date', 'available_slots']),
         ]
\ No newline at end of file
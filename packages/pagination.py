@@ -0,0 +1,11 @@
+from rest_framework.pagination import CursorPagination
+
+class DepartureCursorPagination(CursorPagination):
+    """
+    Availability results by departure date. A cursor seeks along the
+    (start_date, id) order instead of counting and skipping rows.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    ordering = ('start_date', 'id')
@@ -0,0 +1,27 @@
+from django.utils import timezone
+from facets.counts import snapshot_facets, apply_facet_change
+from .models import Package
+
+def refresh_effective_price(package_id, today=None):
+    """
+    Recompute one package's effective_min_price after a departure changed.
+    Writes with a targeted update (no full save) and moves the package's
+    price band facet when the price changed. Returns True if it changed.
+    """
+    package = Package.objects.filter(pk=package_id).first()
+    if package is None:
+        return False
+    price, expires = package.effective_price(today)
+    if (price, expires) == (package.effective_min_price, package.effective_price_expires):
+        return False
+    snapshot_facets('package', package)
+    Package.objects.filter(pk=package_id).update(effective_min_price=price, effective_price_expires=expires)
+    package.effective_min_price, package.effective_price_expires = price, expires
+    apply_facet_change('package', package)
+    return True
+
+def refresh_expired_prices(today=None):
+    """Refresh packages whose cheapest departure has left. Returns how many prices changed."""
+    today = today or timezone.localdate()
+    expired = Package.objects.filter(effective_price_expires__lt=today).values_list('pk', flat=True)
+    return sum(refresh_effective_price(package_id, today) for package_id in list(expired))
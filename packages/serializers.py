@@ -1,6 +1,10 @@
 from rest_framework import serializers
-from .models import Package, PackageReview, SavedPackage, Departure
+from rest_framework.reverse import reverse
+from django.utils import timezone
+from core.reviews import EMBEDDED_REVIEW_LIMIT, recent_reviews
+from .models import Package, PackageReview, SavedPackage, Departure, PackageCategory
 from users.models import User
+from .departures import MAX_BULK_DEPARTURES, FREQUENCIES, WEEKDAYS, expand_rule
 
 class PackageReviewSerializer(serializers.ModelSerializer):
     user = serializers.SerializerMethodField()
@@ -32,33 +36,137 @@ class DepartureSerializer(serializers.ModelSerializer):
         fields = ['id', 'package', 'start_date', 'end_date', 'price', 'available_slots', 'is_guaranteed']
         read_only_fields = ['id']
 
+class RecurrenceSerializer(serializers.Serializer):
+    freq = serializers.ChoiceField(choices=sorted(FREQUENCIES))
+    start = serializers.DateField()
+    until = serializers.DateField(required=False)
+    count = serializers.IntegerField(required=False, min_value=1)
+    interval = serializers.IntegerField(required=False, min_value=1, default=1)
+    weekdays = serializers.ListField(
+        child=serializers.ChoiceField(choices=sorted(WEEKDAYS)), required=False
+    )
+
+    def validate(self, data):
+        if ('until' in data) == ('count' in data):
+            raise serializers.ValidationError('Give exactly one of until or count.')
+        if 'until' in data and data['until'] < data['start']:
+            raise serializers.ValidationError('until must not be before start.')
+        return data
+
+class DepartureBulkSerializer(serializers.Serializer):
+    """A season of departures for one package, from a recurrence rule or an explicit list of dates."""
+    package = serializers.PrimaryKeyRelatedField(queryset=Package.objects.all())
+    rule = RecurrenceSerializer(required=False)
+    dates = serializers.ListField(child=serializers.DateField(), required=False, allow_empty=False)
+    duration_days = serializers.IntegerField(required=False, min_value=1)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+    available_slots = serializers.IntegerField(required=False, min_value=0)
+    is_guaranteed = serializers.BooleanField(required=False)
+    on_conflict = serializers.ChoiceField(choices=['skip', 'update'], default='skip')
+
+    def validate(self, data):
+        if ('rule' in data) == ('dates' in data):
+            raise serializers.ValidationError('Give exactly one of rule or dates.')
+        if 'rule' in data:
+            rule = data.pop('rule')
+            data['dates'] = expand_rule(
+                rule['freq'], rule['start'], until=rule.get('until'), count=rule.get('count'),
+                interval=rule['interval'], weekdays=rule.get('weekdays'),
+            )
+        if not data['dates']:
+            raise serializers.ValidationError('The rule produces no dates.')
+        if len(set(data['dates'])) > MAX_BULK_DEPARTURES:
+            raise serializers.ValidationError(f'At most {MAX_BULK_DEPARTURES} departures per request.')
+        if min(data['dates']) < timezone.localdate():
+            raise serializers.ValidationError('Departures cannot start in the past.')
+        return data
+
+class DepartureAvailabilitySerializer(serializers.ModelSerializer):
+    """A bookable departure together with the package card it belongs to."""
+    package = serializers.SerializerMethodField()
+    price = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Departure
+        fields = ['id', 'start_date', 'end_date', 'price', 'available_slots', 'is_guaranteed', 'package']
+        read_only_fields = fields
+
+    def get_price(self, obj):
+        price = obj.price if obj.price is not None else obj.package.price
+        return str(price) if price is not None else None
+
+    def get_package(self, obj):
+        package = obj.package
+        return {
+            'id': package.id,
+            'title': package.title,
+            'slug': package.slug,
+            'region': package.region,
+            'difficulty': package.difficulty,
+            'duration': package.duration,
+            'image': package.image,
+            'rating': str(package.rating),
+        }
+
 class PackageListSerializer(serializers.ModelSerializer):
+    rating_histogram = serializers.ReadOnlyField()
+
     class Meta:
         model = Package
         fields = [
             'id', 'title', 'slug', 'category', 'location', 'region',
-            'price', 'discounted_price', 'duration', 'duration_in_days',
-            'image', 'rating', 'featured'
+            'price', 'discounted_price', 'effective_min_price', 'duration', 'duration_in_days',
+            'image', 'image_variants', 'rating', 'rating_histogram', 'featured'
         ]
-        read_only_fields = ['id', 'slug', 'rating']
+        read_only_fields = ['id', 'slug', 'rating', 'effective_min_price', 'image_variants']
 
 class PackageDetailSerializer(serializers.ModelSerializer):
-    reviews = PackageReviewSerializer(many=True, read_only=True)
-    departures = DepartureSerializer(many=True, read_only=True)
-    
+    """
+    Embeds the latest reviews and the next upcoming departures only, so the
+    payload size does not grow with the package's history. The full
+    month-by-month calendar is served from calendar_url.
+    """
+    EMBEDDED_DEPARTURE_LIMIT = 10
+
+    reviews = serializers.SerializerMethodField()
+    rating_histogram = serializers.ReadOnlyField()
+    reviews_url = serializers.SerializerMethodField()
+    departures = serializers.SerializerMethodField()
+    calendar_url = serializers.SerializerMethodField()
+
     class Meta:
         model = Package
         fields = [
             'id', 'user', 'title', 'slug', 'description', 'short_description',
-            'location', 'region', 'price', 'discounted_price', 'duration',
-            'duration_in_days', 'image', 'gallery_images', 'category',
+            'location', 'region', 'price', 'discounted_price', 'effective_min_price', 'duration',
+            'duration_in_days', 'image', 'gallery_images', 'image_variants', 'category',
             'included', 'not_included', 'itinerary', 'departure',
             'departure_time', 'return_time', 'max_group_size', 'min_age',
             'difficulty', 'tour_guide', 'languages', 'rating', 'coordinates',
             'status', 'featured', 'created_at', 'updated_at', 'reviews',
-            'departures'
+            'rating_histogram', 'reviews_url', 'departures', 'calendar_url'
+        ]
+        read_only_fields = [
+            'id', 'user', 'slug', 'rating', 'effective_min_price', 'image_variants', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'slug', 'rating', 'created_at', 'updated_at']
+
+    def get_reviews(self, obj):
+        reviews = recent_reviews(obj.reviews.all(), EMBEDDED_REVIEW_LIMIT)
+        return PackageReviewSerializer(reviews, many=True, context=self.context).data
+
+    def get_reviews_url(self, obj):
+        return reverse('packages:package-reviews', kwargs={'pk': obj.pk},
+                       request=self.context.get('request'))
+
+    def get_calendar_url(self, obj):
+        return reverse('packages:package-calendar', kwargs={'pk': obj.pk},
+                       request=self.context.get('request'))
+
+    def get_departures(self, obj):
+        departures = obj.departures.filter(
+            start_date__gte=timezone.localdate()
+        ).order_by('start_date')[:self.EMBEDDED_DEPARTURE_LIMIT]
+        return DepartureSerializer(departures, many=True).data
 
 class PackageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -97,4 +205,10 @@ class SavedPackageSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+class PackageCategorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PackageCategory
+        fields = ['name', 'label', 'package_count']
+        read_only_fields = fields
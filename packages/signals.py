@@ -1,6 +1,12 @@
-from django.db.models.signals import post_save, post_delete
+from django.db import models
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
-from .models import Package, PackageReview
+from core.ratings import snapshot_review, apply_review_change, remove_review
+from facets.counts import snapshot_facets, apply_facet_change, remove_facets
+from .models import Package, PackageReview, PackageCategoryMembership, Departure
+from .pricing import refresh_effective_price
+from .departure_calendar import invalidate_calendar
+from .categories import category_labels, sync_package_categories, refresh_category_counts
 
 @receiver(post_save, sender=PackageReview)
 @receiver(post_delete, sender=PackageReview)
@@ -8,4 +14,74 @@ def update_package_rating(sender, instance, **kwargs):
     package = instance.package
     reviews = package.reviews.all()
     package.rating = reviews.aggregate(models.Avg('rating'))['rating__avg'] or 0.0
-    package.save()
\ No newline at end of file
+    package.save()
+
+@receiver(pre_save, sender=PackageReview)
+def snapshot_package_review_rating(sender, instance, **kwargs):
+    snapshot_review(instance, 'package')
+
+@receiver(post_save, sender=PackageReview)
+def update_package_rating_histogram(sender, instance, **kwargs):
+    apply_review_change(instance, Package, 'package')
+
+@receiver(post_delete, sender=PackageReview)
+def update_package_rating_histogram_on_delete(sender, instance, **kwargs):
+    remove_review(instance, Package, 'package')
+
+@receiver(pre_save, sender=Package)
+def snapshot_package_facets(sender, instance, **kwargs):
+    snapshot_facets('package', instance)
+
+@receiver(post_save, sender=Package)
+def update_package_facets(sender, instance, **kwargs):
+    apply_facet_change('package', instance)
+
+@receiver(pre_delete, sender=Package)
+def remove_package_facets_on_delete(sender, instance, **kwargs):
+    """
+    Take the package out of the facet counts before the delete cascades to
+    its departures, using the stored row, and hide it inside the delete's
+    transaction. Departure deletes then reprice a hidden package, which
+    contributes no facet rows, whichever order the rows are deleted in.
+    """
+    stored = Package.objects.filter(pk=instance.pk).first()
+    if stored is not None:
+        remove_facets('package', stored)
+        Package.objects.filter(pk=instance.pk).update(status='inactive')
+
+@receiver(pre_save, sender=Package)
+def snapshot_package_categories(sender, instance, **kwargs):
+    instance._previous_categories = None
+    if not instance._state.adding:
+        instance._previous_categories = Package.objects.filter(pk=instance.pk).values('category', 'status').first()
+
+@receiver(post_save, sender=Package)
+def update_category_index(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_categories', None)
+    if created or previous is None:
+        sync_package_categories(instance, status_changed=True)
+        return
+    status_changed = previous['status'] != instance.status
+    if status_changed or category_labels(instance.category) != category_labels(previous['category']):
+        sync_package_categories(instance, status_changed=status_changed)
+
+@receiver(pre_delete, sender=Package)
+def remember_package_categories(sender, instance, **kwargs):
+    instance._category_ids = list(
+        PackageCategoryMembership.objects.filter(package=instance).values_list('category_id', flat=True)
+    )
+
+@receiver(post_delete, sender=Package)
+def update_category_counts_on_delete(sender, instance, **kwargs):
+    refresh_category_counts(getattr(instance, '_category_ids', []))
+
+@receiver(post_save, sender=Departure)
+@receiver(post_delete, sender=Departure)
+def update_effective_price(sender, instance, **kwargs):
+    if instance.package_id:
+        refresh_effective_price(instance.package_id)
+
+@receiver(post_save, sender=Departure)
+@receiver(post_delete, sender=Departure)
+def drop_departure_calendar(sender, instance, **kwargs):
+    invalidate_calendar(instance.package_id)
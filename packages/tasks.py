@@ -0,0 +1,7 @@
+from celery import shared_task
+from .pricing import refresh_expired_prices
+
+@shared_task
+def refresh_package_prices():
+    """Move packages off effective prices that came from departures which have now left."""
+    return refresh_expired_prices()
@@ -1,3 +1,89 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from booking.models import Booking
+from .categories import category_labels
+from .models import Package, Departure
+from .availability import parse_search
+from .departures import MAX_BULK_DEPARTURES, CapacityError, expand_rule, bulk_upsert_departures
 
-# Create your tests here.
+class CategoryIndexTests(SimpleTestCase):
+    def test_category_labels_normalize_and_dedupe(self):
+        self.assertEqual(
+            category_labels([' Hiking ', 'hiking', 'Cultural', '', None]),
+            {'hiking': 'Hiking', 'cultural': 'Cultural'}
+        )
+
+class EffectivePriceTests(SimpleTestCase):
+    def test_discount_beats_list_price(self):
+        package = Package(price=Decimal('1200'), discounted_price=Decimal('950'))
+        self.assertEqual(package.effective_price(), (Decimal('950'), None))
+
+    def test_missing_or_zero_discount_is_ignored(self):
+        self.assertEqual(Package(price=Decimal('1200'), discounted_price=Decimal('0')).effective_price(),
+                         (Decimal('1200'), None))
+        self.assertEqual(Package(price=Decimal('1200')).effective_price(), (Decimal('1200'), None))
+
+class AvailabilitySearchTests(SimpleTestCase):
+    today = date(2026, 1, 5)
+
+    def test_defaults_and_past_start(self):
+        search = parse_search({'start': '2025-12-01'}, self.today)
+        self.assertEqual((search['start'], search['end'], search['seats']), (self.today, date(2026, 2, 4), 1))
+
+    def test_window_and_party_size(self):
+        search = parse_search({'start': '2026-01-10', 'end': '2026-01-20', 'seats': '4'}, self.today)
+        self.assertEqual((search['start'], search['end'], search['seats']), (date(2026, 1, 10), date(2026, 1, 20), 4))
+
+    def test_rejects_bad_input(self):
+        for params in ({'start': '10/01/2026'}, {'start': '2026-01-20', 'end': '2026-01-10'},
+                       {'end': '2026-12-31'}, {'seats': '0'}, {'difficulty': 'Extreme'}, {'max_price': 'cheap'}):
+            with self.assertRaises(ValueError):
+                parse_search(params, self.today)
+
+class RecurrenceTests(SimpleTestCase):
+    def test_daily_season(self):
+        dates = expand_rule('daily', date(2026, 1, 1), until=date(2026, 6, 30))
+        self.assertEqual((len(dates), dates[0], dates[-1]), (181, date(2026, 1, 1), date(2026, 6, 30)))
+
+    def test_weekdays_and_count(self):
+        dates = expand_rule('weekly', date(2026, 1, 1), count=4, weekdays=['MO', 'FR'])
+        self.assertEqual(dates, [date(2026, 1, 2), date(2026, 1, 5), date(2026, 1, 9), date(2026, 1, 12)])
+
+    def test_expansion_stops_past_the_cap(self):
+        self.assertEqual(len(expand_rule('daily', date(2026, 1, 1), count=5000)), MAX_BULK_DEPARTURES + 1)
+
+class BulkUpsertTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='operator', email='op@example.com', password='pass')
+        self.package = Package.objects.create(
+            user=self.user, title='Simien Trek', description='Trek', short_description='Trek',
+            location='Simien', region='Amhara', price=Decimal('500'), duration='3 days', duration_in_days=3,
+            departure='Gondar', departure_time=time(7), return_time=time(18), max_group_size=10,
+            min_age=12, difficulty='Moderate', tour_guide='Guide', status='active',
+        )
+        self.start = timezone.localdate() + timedelta(days=30)
+        self.departure = Departure.objects.create(
+            package=self.package, start_date=self.start, end_date=self.start + timedelta(days=2),
+            price=Decimal('450'), available_slots=6, is_guaranteed=True,
+        )
+        Booking.objects.create(user=self.user, package=self.package, departure=self.departure, number_of_people=4)
+
+    def test_update_keeps_booked_seats_and_unsent_fields(self):
+        bulk_upsert_departures(self.package, [self.start], 3, {'price': Decimal('400')}, on_conflict='update')
+        self.departure.refresh_from_db()
+        self.assertEqual((self.departure.available_slots, self.departure.is_guaranteed), (6, True))
+        self.assertEqual(self.departure.price, Decimal('400'))
+
+    def test_capacity_change_shifts_open_seats(self):
+        bulk_upsert_departures(self.package, [self.start], 3, {}, capacity=12, on_conflict='update')
+        self.departure.refresh_from_db()
+        self.assertEqual(self.departure.available_slots, 8)
+
+    def test_capacity_below_booked_seats_is_rejected(self):
+        with self.assertRaises(CapacityError):
+            bulk_upsert_departures(self.package, [self.start], 3, {}, capacity=3, on_conflict='update')
+        self.departure.refresh_from_db()
+        self.assertEqual(self.departure.available_slots, 6)
@@ -1,28 +1,38 @@
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status, filters, serializers
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, IsAdminUser
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from .models import Package, PackageReview, SavedPackage, Departure
+from .models import Package, PackageReview, SavedPackage, Departure, PackageCategory
 from .serializers import (
     PackageSerializer, PackageListSerializer, PackageDetailSerializer,
-    PackageReviewSerializer, SavedPackageSerializer, DepartureSerializer
+    PackageReviewSerializer, SavedPackageSerializer, DepartureSerializer,
+    PackageCategorySerializer, DepartureAvailabilitySerializer, DepartureBulkSerializer
 )
 from .permissions import IsPackageOwnerOrReadOnly, IsReviewOwnerOrReadOnly
 from .filters import PackageFilter
-
-class PackageViewSet(viewsets.ModelViewSet):
+from .availability import MAX_SEARCH_DAYS, DEFAULT_SEARCH_DAYS, parse_search, available_departures
+from .pagination import DepartureCursorPagination
+from .departure_calendar import package_calendar
+from .departures import bulk_upsert_departures, CapacityError
+from core.conditional import etag_matches, not_modified
+from facets.views import FacetsMixin
+from facets.counts import facet_values_list
+
+class PackageViewSet(FacetsMixin, viewsets.ModelViewSet):
+    facet_kind = 'package'
     queryset = Package.objects.all()
     serializer_class = PackageSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = PackageFilter
     search_fields = ['title', 'description', 'location']
-    ordering_fields = ['price', 'created_at', 'updated_at']
+    ordering_fields = ['price', 'effective_min_price', 'created_at', 'updated_at']
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -40,6 +50,12 @@ class PackageViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         if self.action == 'list':
             return self.queryset.filter(status='active')
+        if self.action == 'calendar' and not self.request.user.is_staff:
+            # Owners can preview the calendar of their draft or inactive packages
+            visible = Q(status='active')
+            if self.request.user.is_authenticated:
+                visible |= Q(user=self.request.user)
+            return self.queryset.filter(visible)
         return self.queryset
 
     @swagger_auto_schema(
@@ -98,13 +114,17 @@ class PackageViewSet(viewsets.ModelViewSet):
 
     @swagger_auto_schema(
         tags=['Package Reviews'],
-        operation_description="Get all reviews for a specific package",
+        operation_description="Get the reviews for a specific package, newest first and paginated",
         responses={200: PackageReviewSerializer(many=True)}
     )
     @action(detail=True, methods=['get'])
     def reviews(self, request, pk=None):
         package = self.get_object()
-        reviews = package.reviews.all()
+        reviews = package.reviews.select_related('user').order_by('-created_at')
+        page = self.paginate_queryset(reviews)
+        if page is not None:
+            serializer = PackageReviewSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = PackageReviewSerializer(reviews, many=True)
         return Response(serializer.data)
 
@@ -133,13 +153,57 @@ class PackageViewSet(viewsets.ModelViewSet):
 
     @swagger_auto_schema(
         tags=['Tour Packages'],
-        operation_description="Get list of all package categories",
-        responses={200: openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_STRING))}
+        operation_description="Upcoming departures of a package grouped by month, with prices and remaining seats. "
+                              "Supports If-None-Match.",
+        responses={200: "Calendar", 304: "Not Modified", 404: "Not Found"}
+    )
+    @action(detail=True, methods=['get'])
+    def calendar(self, request, pk=None):
+        package = self.get_object()
+        calendar = package_calendar(package.pk)
+        if etag_matches(request, calendar['etag']):
+            return not_modified(calendar['etag'])
+        response = Response({'package': calendar['package'], 'months': calendar['months']})
+        response['ETag'] = calendar['etag']
+        return response
+
+    @swagger_auto_schema(
+        tags=['Tour Packages'],
+        operation_description="Search bookable departures across all active packages by date window and party size",
+        manual_parameters=[
+            openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_STRING, format='date',
+                              description='First departure date (default today)'),
+            openapi.Parameter('end', openapi.IN_QUERY, type=openapi.TYPE_STRING, format='date',
+                              description=f'Last departure date (default start + {DEFAULT_SEARCH_DAYS} days, '
+                                          f'at most {MAX_SEARCH_DAYS} days after start)'),
+            openapi.Parameter('seats', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Party size (default 1)'),
+            openapi.Parameter('region', openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Exact region, any case'),
+            openapi.Parameter('difficulty', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=[choice for choice, _ in Package.DIFFICULTY_CHOICES]),
+            openapi.Parameter('min_price', openapi.IN_QUERY, type=openapi.TYPE_NUMBER),
+            openapi.Parameter('max_price', openapi.IN_QUERY, type=openapi.TYPE_NUMBER),
+        ],
+        responses={200: DepartureAvailabilitySerializer(many=True), 400: "Bad Request"}
+    )
+    @action(detail=False, methods=['get'], pagination_class=DepartureCursorPagination)
+    def availability(self, request):
+        try:
+            search = parse_search(request.query_params, timezone.localdate())
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        page = self.paginate_queryset(available_departures(**search))
+        serializer = DepartureAvailabilitySerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+    @swagger_auto_schema(
+        tags=['Tour Packages'],
+        operation_description="List package categories with the number of active packages in each",
+        responses={200: PackageCategorySerializer(many=True)}
     )
     @action(detail=False, methods=['get'])
     def categories(self, request):
-        categories = Package.objects.values_list('category', flat=True).distinct()
-        return Response(categories)
+        categories = PackageCategory.objects.filter(package_count__gt=0)
+        return Response(PackageCategorySerializer(categories, many=True).data)
 
     @swagger_auto_schema(
         tags=['Tour Packages'],
@@ -148,8 +212,7 @@ class PackageViewSet(viewsets.ModelViewSet):
     )
     @action(detail=False, methods=['get'])
     def regions(self, request):
-        regions = Package.objects.values_list('region', flat=True).distinct()
-        return Response(regions)
+        return Response(facet_values_list('package', 'region'))
 
     @swagger_auto_schema(
         tags=['Tour Packages'],
@@ -222,7 +285,7 @@ class PackageViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 class PackageReviewViewSet(viewsets.ModelViewSet):
-    queryset = PackageReview.objects.all()
+    queryset = PackageReview.objects.select_related('user').order_by('-created_at')
     serializer_class = PackageReviewSerializer
     permission_classes = [IsReviewOwnerOrReadOnly]
 
@@ -324,4 +387,38 @@ class DepartureViewSet(viewsets.ModelViewSet):
         package = get_object_or_404(Package, pk=self.request.data.get('package'))
         if package.user != self.request.user and not self.request.user.is_staff:
             raise serializers.ValidationError('You can only add departures to your own packages')
-        serializer.save(package=package)
\ No newline at end of file
+        serializer.save(package=package)
+
+    @swagger_auto_schema(
+        tags=['Package Departures'],
+        operation_description="Create or update many departures of one package from a recurrence rule "
+                              "(freq, start, until or count, interval, weekdays) or an explicit list of dates",
+        request_body=DepartureBulkSerializer,
+        responses={201: "Created, updated and skipped dates", 400: "Bad Request", 403: "Forbidden"}
+    )
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        serializer = DepartureBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        package = data['package']
+        if package.user != request.user and not request.user.is_staff:
+            return Response(
+                {'error': 'You can only add departures to your own packages'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        # Only fields the client sent, so updating a season does not reset the rest
+        fields = {field: data[field] for field in ('price', 'is_guaranteed') if field in data}
+        try:
+            created, updated, skipped = bulk_upsert_departures(
+                package, data['dates'], data.get('duration_days', package.duration_in_days),
+                fields, capacity=data.get('available_slots'), on_conflict=data['on_conflict']
+            )
+        except CapacityError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'package': package.pk,
+            'created': [day.isoformat() for day in created],
+            'updated': [day.isoformat() for day in updated],
+            'skipped': [day.isoformat() for day in skipped],
+        }, status=status.HTTP_201_CREATED)
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import ImageAsset, UploadSession
+
+@admin.register(ImageAsset)
+class ImageAssetAdmin(admin.ModelAdmin):
+    list_display = ('id', 'target_type', 'target_id', 'role', 'status', 'owner', 'created_at')
+    list_filter = ('status', 'target_type', 'role')
+    search_fields = ('target_id', 'original_name')
+    readonly_fields = ('variants', 'width', 'height', 'size', 'created_at', 'updated_at')
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'filename', 'owner', 'status', 'received_bytes', 'total_size', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('filename', 'file_id')
+    readonly_fields = ('file_id', 'received_bytes', 'created_at', 'updated_at')
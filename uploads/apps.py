@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+class UploadsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'uploads'
+    verbose_name = 'Media Uploads'
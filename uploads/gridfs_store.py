@@ -0,0 +1,141 @@
+import hashlib
+import re
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from gridfs import GridFSBucket, NoFile
+from pymongo import MongoClient
+
+# GridFS chunk size; every uploaded piece except the last must be a whole number of these
+GRIDFS_CHUNK_SIZE = 255 * 1024
+# Largest piece a client may send in one request
+MAX_UPLOAD_PIECE = 16 * GRIDFS_CHUNK_SIZE
+BUCKET_NAME = 'fs'
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+_client = None
+
+class RangeError(ValueError):
+    pass
+
+def database():
+    global _client
+    if _client is None:
+        _client = MongoClient(settings.DATABASES['default']['CLIENT']['host'])
+    return _client[settings.GRIDFS_DATABASE]
+
+def bucket():
+    return GridFSBucket(database(), bucket_name=BUCKET_NAME, chunk_size_bytes=GRIDFS_CHUNK_SIZE)
+
+def object_id(value):
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+def parse_content_range(header):
+    """Parse 'bytes start-end/total' from an upload request into (start, end, total)."""
+    match = CONTENT_RANGE.match((header or '').strip())
+    if not match:
+        raise RangeError('Content-Range must look like "bytes start-end/total".')
+    start, end = int(match.group(1)), int(match.group(2))
+    total = None if match.group(3) == '*' else int(match.group(3))
+    if end < start or (total is not None and end >= total):
+        raise RangeError('Content-Range is out of bounds.')
+    return start, end, total
+
+def parse_range(header, length):
+    """
+    Parse a single-range Range header against a file of the given length.
+    Returns (start, end) inclusive, None when the header is absent or not a
+    byte range we serve, and raises RangeError when it cannot be satisfied.
+    """
+    match = RANGE.match((header or '').strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.group(1), match.group(2)
+    if first == '':
+        suffix = int(last)
+        if suffix == 0:
+            raise RangeError('Empty suffix range.')
+        return max(length - suffix, 0), length - 1
+    start = int(first)
+    end = min(int(last), length - 1) if last else length - 1
+    if start >= length or end < start:
+        raise RangeError('Range not satisfiable.')
+    return start, end
+
+def write_piece(file_id, offset, stream, length):
+    """
+    Write `length` bytes read from `stream` as GridFS chunks of files_id
+    starting at `offset`. Each chunk is upserted on (files_id, n), so a
+    retried piece overwrites instead of duplicating.
+    """
+    chunks = database()[f'{BUCKET_NAME}.chunks']
+    n = offset // GRIDFS_CHUNK_SIZE
+    remaining = length
+    while remaining > 0:
+        data = stream.read(min(GRIDFS_CHUNK_SIZE, remaining))
+        if not data:
+            break
+        # A short read can split a chunk; keep reading until the chunk is whole
+        while len(data) < min(GRIDFS_CHUNK_SIZE, remaining):
+            more = stream.read(min(GRIDFS_CHUNK_SIZE, remaining) - len(data))
+            if not more:
+                break
+            data += more
+        chunks.replace_one({'files_id': file_id, 'n': n}, {'files_id': file_id, 'n': n, 'data': data}, upsert=True)
+        remaining -= len(data)
+        n += 1
+    return length - remaining
+
+def finalize_file(file_id, filename, length, content_type, metadata=None):
+    """Insert the files document that turns the uploaded chunks into a readable GridFS file."""
+    database()[f'{BUCKET_NAME}.files'].replace_one({'_id': file_id}, {
+        '_id': file_id,
+        'length': length,
+        'chunkSize': GRIDFS_CHUNK_SIZE,
+        'uploadDate': datetime.utcnow(),
+        'filename': filename,
+        'contentType': content_type,
+        'metadata': metadata or {},
+    }, upsert=True)
+
+def sha256_hex(file_id):
+    """SHA-256 of the chunks written for a file, read in order one chunk at a time."""
+    digest = hashlib.sha256()
+    for chunk in database()[f'{BUCKET_NAME}.chunks'].find({'files_id': file_id}, sort=[('n', 1)]):
+        digest.update(chunk['data'])
+    return digest.hexdigest()
+
+def discard_chunks(file_id):
+    database()[f'{BUCKET_NAME}.chunks'].delete_many({'files_id': file_id})
+
+def open_file(file_id):
+    try:
+        return bucket().open_download_stream(file_id)
+    except NoFile:
+        return None
+
+def iter_range(grid_out, start, end):
+    """
+    Yield bytes start..end (inclusive) chunk by chunk. After the first seek
+    each piece is a GridFS chunk payload handed on as-is, so no extra
+    buffering happens between MongoDB and the response.
+    """
+    grid_out.seek(start)
+    remaining = end - start + 1
+    try:
+        while remaining > 0:
+            data = grid_out.readchunk()
+            if not data:
+                break
+            if len(data) > remaining:
+                data = data[:remaining]
+            remaining -= len(data)
+            yield data
+    finally:
+        grid_out.close()
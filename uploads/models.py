@@ -0,0 +1,90 @@
+import uuid
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+class ImageAsset(models.Model):
+    """An uploaded original and the responsive variants rendered from it."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    TARGET_CHOICES = [
+        ('business', 'Business'),
+        ('event', 'Event'),
+        ('destination', 'Destination'),
+        ('package', 'Package'),
+        ('blog', 'Blog Post'),
+    ]
+    ROLE_CHOICES = [
+        ('main', 'Main image'),
+        ('gallery', 'Gallery image'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='image_assets')
+    target_type = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    target_id = models.CharField(max_length=64)
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='main')
+    original = models.CharField(max_length=500)
+    original_url = models.CharField(max_length=500)
+    original_name = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveIntegerField(default=0)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    variants = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', 'created_at']),
+            models.Index(fields=['target_type', 'target_id']),
+            models.Index(fields=['status']),
+        ]
+
+    def __str__(self):
+        return f"{self.target_type}:{self.target_id} {self.original_name or self.pk}"
+
+class UploadSession(models.Model):
+    """
+    A resumable upload into GridFS. Pieces are written straight into the
+    chunks collection under a file id reserved when the session starts; the
+    files document is only written on completion, so readers never see a
+    partial file.
+    """
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('complete', 'Complete'),
+        ('aborted', 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    file_id = models.CharField(max_length=24, unique=True)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    total_size = models.PositiveBigIntegerField()
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    # Optional hex SHA-256 of the whole file, checked when the upload is completed
+    checksum = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', 'status']),
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
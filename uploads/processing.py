@@ -0,0 +1,75 @@
+from io import BytesIO
+from django.apps import apps
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Widths rendered for every image, and the formats each width is encoded in
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+VARIANT_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+# target_type: (app label, model, main image field, gallery field)
+IMAGE_TARGETS = {
+    'business': ('business', 'Business', 'main_image', 'gallery_images'),
+    'event': ('events', 'Event', None, 'images'),
+    'destination': ('destinations', 'Destination', None, 'images'),
+    'package': ('packages', 'Package', 'image', 'gallery_images'),
+    'blog': ('blog', 'BlogPost', 'imageUrl', None),
+}
+
+def target_model(target_type):
+    app_label, model_name, _, _ = IMAGE_TARGETS[target_type]
+    return apps.get_model(app_label, model_name)
+
+def target_owner_id(target):
+    for field in ('owner_id', 'organizer_id', 'user_id', 'author_id'):
+        if hasattr(target, field):
+            return getattr(target, field)
+    return None
+
+def variant_widths(original_width):
+    """Fixed widths no larger than the original; small originals still get one variant."""
+    widths = [width for width in VARIANT_WIDTHS if width <= original_width]
+    return widths or [original_width]
+
+def render_variants(fileobj, storage, prefix):
+    """
+    Render every width/format pair from an image file into storage under
+    prefix. Returns (width, height, variants) where variants is a list of
+    dicts with url, width, height and format, smallest first.
+    """
+    with Image.open(fileobj) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+        original_width, original_height = image.size
+        variants = []
+        for width in variant_widths(original_width):
+            height = max(1, round(original_height * width / original_width))
+            resized = image.resize((width, height), Image.LANCZOS) if width != original_width else image
+            for extension, options in VARIANT_FORMATS.items():
+                frame = resized.convert('RGB') if options['format'] == 'JPEG' else resized
+                buffer = BytesIO()
+                frame.save(buffer, **options)
+                name = storage.save(f'{prefix}/{width}w.{extension}', ContentFile(buffer.getvalue()))
+                variants.append({
+                    'url': storage.url(name),
+                    'width': width,
+                    'height': height,
+                    'format': extension,
+                })
+    return original_width, original_height, variants
+
+def srcset_metadata(width, height, variants):
+    """Group variants into one srcset string per format, ready for <picture>/<img>."""
+    srcset = {}
+    for variant in variants:
+        srcset.setdefault(variant['format'], []).append(f"{variant['url']} {variant['width']}w")
+    return {
+        'width': width,
+        'height': height,
+        'srcset': {fmt: ', '.join(entries) for fmt, entries in srcset.items()},
+        'variants': variants,
+    }
@@ -0,0 +1,124 @@
+import os
+import re
+import uuid
+from bson import ObjectId
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+from .gridfs_store import GRIDFS_CHUNK_SIZE, MAX_UPLOAD_PIECE
+from .models import ImageAsset, UploadSession
+from .processing import IMAGE_TARGETS, target_model, target_owner_id, srcset_metadata
+
+MAX_IMAGE_UPLOAD_SIZE = getattr(settings, 'MAX_IMAGE_UPLOAD_SIZE', 15 * 1024 * 1024)
+MAX_GRIDFS_UPLOAD_SIZE = getattr(settings, 'MAX_GRIDFS_UPLOAD_SIZE', 2 * 1024 * 1024 * 1024)
+SHA256_HEX = re.compile(r'^[0-9a-f]{64}$')
+
+class ImageAssetSerializer(serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImageAsset
+        fields = [
+            'id', 'target_type', 'target_id', 'role', 'original_url', 'original_name',
+            'content_type', 'size', 'width', 'height', 'status', 'variants', 'srcset',
+            'error', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def get_srcset(self, obj):
+        if obj.status != 'ready':
+            return None
+        return srcset_metadata(obj.width, obj.height, obj.variants)['srcset']
+
+class ImageUploadSerializer(serializers.Serializer):
+    # ImageField already checks the upload decodes as an image
+    file = serializers.ImageField()
+    target_type = serializers.ChoiceField(choices=ImageAsset.TARGET_CHOICES)
+    target_id = serializers.CharField(max_length=64)
+    role = serializers.ChoiceField(choices=ImageAsset.ROLE_CHOICES, default='main')
+
+    def validate_file(self, value):
+        if value.size > MAX_IMAGE_UPLOAD_SIZE:
+            raise serializers.ValidationError(
+                f'Images must be smaller than {MAX_IMAGE_UPLOAD_SIZE // (1024 * 1024)} MB.'
+            )
+        return value
+
+    def validate(self, data):
+        _, _, main_field, gallery_field = IMAGE_TARGETS[data['target_type']]
+        if data['role'] == 'main' and not main_field:
+            data['role'] = 'gallery'
+        elif data['role'] == 'gallery' and not gallery_field:
+            raise serializers.ValidationError({'role': 'This target only has a main image.'})
+        try:
+            target = target_model(data['target_type']).objects.filter(pk=data['target_id']).first()
+        except (ValueError, TypeError):
+            raise serializers.ValidationError({'target_id': 'Not a valid id for this target.'})
+        if target is None:
+            raise serializers.ValidationError({'target_id': 'Target not found.'})
+        user = self.context['request'].user
+        if target_owner_id(target) != user.id and not user.is_staff:
+            raise serializers.ValidationError({'target_id': 'You can only add images to your own listings.'})
+        return data
+
+    def create(self, validated_data):
+        upload = validated_data['file']
+        storage = self.context['storage']
+        asset_id = uuid.uuid4()
+        extension = os.path.splitext(upload.name)[1].lower() or '.jpg'
+        # storage.save copies the upload chunk by chunk, so large originals are never held in memory
+        name = storage.save(f'images/{asset_id}/original{extension}', upload)
+        return ImageAsset.objects.create(
+            id=asset_id,
+            owner=self.context['request'].user,
+            target_type=validated_data['target_type'],
+            target_id=validated_data['target_id'],
+            role=validated_data['role'],
+            original=name,
+            original_url=storage.url(name),
+            original_name=upload.name[:255],
+            content_type=getattr(upload, 'content_type', '') or '',
+            size=upload.size,
+        )
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    chunk_size = serializers.SerializerMethodField()
+    max_piece_size = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'file_id', 'filename', 'content_type', 'total_size', 'received_bytes', 'checksum',
+            'status', 'chunk_size', 'max_piece_size', 'download_url', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'file_id', 'received_bytes', 'status', 'created_at', 'updated_at']
+
+    def get_chunk_size(self, obj):
+        return GRIDFS_CHUNK_SIZE
+
+    def get_max_piece_size(self, obj):
+        return MAX_UPLOAD_PIECE
+
+    def get_download_url(self, obj):
+        if obj.status != 'complete':
+            return None
+        return reverse('uploads:gridfs-file', kwargs={'file_id': obj.file_id}, request=self.context.get('request'))
+
+    def validate_total_size(self, value):
+        if value > MAX_GRIDFS_UPLOAD_SIZE:
+            raise serializers.ValidationError(
+                f'Uploads must be smaller than {MAX_GRIDFS_UPLOAD_SIZE // (1024 * 1024)} MB.'
+            )
+        return value
+
+    def validate_checksum(self, value):
+        value = value.strip().lower()
+        if value and not SHA256_HEX.match(value):
+            raise serializers.ValidationError('checksum must be a hex SHA-256 digest.')
+        return value
+
+    def create(self, validated_data):
+        validated_data['owner'] = self.context['request'].user
+        validated_data['file_id'] = str(ObjectId())
+        return super().create(validated_data)
@@ -0,0 +1,10 @@
+from django.conf import settings
+from django.core.files.storage import get_storage_class
+
+def image_storage():
+    """
+    Storage for originals and variants. Defaults to the local filesystem under
+    MEDIA_ROOT; set IMAGE_STORAGE to e.g. storages.backends.s3boto3.S3Boto3Storage
+    to serve them from object storage.
+    """
+    return get_storage_class(getattr(settings, 'IMAGE_STORAGE', None))()
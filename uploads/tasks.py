@@ -0,0 +1,73 @@
+import logging
+from datetime import timedelta
+from celery import shared_task
+from django.db import transaction
+from django.utils import timezone
+from . import gridfs_store
+from .models import ImageAsset, UploadSession
+from .processing import IMAGE_TARGETS, target_model, render_variants, srcset_metadata
+from .storage import image_storage
+
+logger = logging.getLogger(__name__)
+
+def attach_to_target(asset):
+    """Point the target's image field at the original and record its variants."""
+    _, _, main_field, gallery_field = IMAGE_TARGETS[asset.target_type]
+    with transaction.atomic():
+        target = target_model(asset.target_type).objects.select_for_update().filter(pk=asset.target_id).first()
+        if target is None:
+            return False
+        update_fields = []
+        if asset.role == 'main' and main_field:
+            setattr(target, main_field, asset.original_url)
+            update_fields.append(main_field)
+        elif gallery_field:
+            gallery = list(getattr(target, gallery_field) or [])
+            if asset.original_url not in gallery:
+                gallery.append(asset.original_url)
+                setattr(target, gallery_field, gallery)
+                update_fields.append(gallery_field)
+        if asset.status == 'ready':
+            variants = dict(target.image_variants or {})
+            variants[asset.original_url] = srcset_metadata(asset.width, asset.height, asset.variants)
+            target.image_variants = variants
+            update_fields.append('image_variants')
+        if update_fields:
+            target.save(update_fields=update_fields)
+    return True
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def process_image(self, asset_id):
+    asset = ImageAsset.objects.filter(pk=asset_id).first()
+    if asset is None or asset.status == 'ready':
+        return
+    ImageAsset.objects.filter(pk=asset_id).update(status='processing')
+    storage = image_storage()
+    try:
+        with storage.open(asset.original, 'rb') as original:
+            width, height, variants = render_variants(original, storage, f'images/{asset.pk}')
+    except OSError as exc:
+        if self.request.retries < self.max_retries:
+            ImageAsset.objects.filter(pk=asset_id).update(status='pending')
+            raise self.retry(exc=exc)
+        logger.exception('Rendering variants for image %s failed', asset_id)
+        ImageAsset.objects.filter(pk=asset_id).update(status='failed', error=str(exc))
+        return
+    except Exception as exc:
+        # Undecodable or oversized images will not get better on retry; never leave them 'processing'
+        ImageAsset.objects.filter(pk=asset_id).update(status='failed', error=str(exc) or type(exc).__name__)
+        raise
+    asset.width, asset.height, asset.variants, asset.status = width, height, variants, 'ready'
+    asset.save(update_fields=['width', 'height', 'variants', 'status', 'updated_at'])
+    attach_to_target(asset)
+
+@shared_task
+def purge_stale_upload_sessions(max_age_hours=24):
+    """Abort open uploads that have not received a piece for a while and drop their chunks."""
+    cutoff = timezone.now() - timedelta(hours=max_age_hours)
+    stale = UploadSession.objects.filter(status='open', updated_at__lt=cutoff)
+    purged = 0
+    for session in stale.iterator():
+        gridfs_store.discard_chunks(gridfs_store.object_id(session.file_id))
+        purged += UploadSession.objects.filter(pk=session.pk, status='open').update(status='aborted')
+    return purged
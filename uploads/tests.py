@@ -0,0 +1,169 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+import mongomock
+import mongomock.gridfs
+from django.contrib.auth import get_user_model
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+from . import gridfs_store
+from .gridfs_store import GRIDFS_CHUNK_SIZE, RangeError, parse_content_range, parse_range
+from .models import UploadSession
+from .processing import VARIANT_FORMATS, render_variants, srcset_metadata, variant_widths
+
+class ImageVariantTests(SimpleTestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.storage = FileSystemStorage(location=self.media_root, base_url='/media/')
+
+    def tearDown(self):
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _image(self, width, height):
+        buffer = BytesIO()
+        Image.new('RGB', (width, height), (200, 120, 40)).save(buffer, format='PNG')
+        buffer.seek(0)
+        return buffer
+
+    def test_widths_never_upscale(self):
+        self.assertEqual(variant_widths(800), [320, 640])
+        self.assertEqual(variant_widths(200), [200])
+
+    def test_render_variants_writes_every_width_and_format(self):
+        width, height, variants = render_variants(self._image(1200, 600), self.storage, 'images/test')
+        self.assertEqual((width, height), (1200, 600))
+        self.assertEqual(len(variants), 3 * len(VARIANT_FORMATS))
+        for variant in variants:
+            self.assertEqual(variant['height'], variant['width'] // 2)
+            name = variant['url'][len('/media/'):]
+            self.assertTrue(self.storage.exists(name))
+
+    def test_srcset_groups_by_format(self):
+        _, _, variants = render_variants(self._image(700, 700), self.storage, 'images/test')
+        metadata = srcset_metadata(700, 700, variants)
+        self.assertEqual(
+            metadata['srcset']['webp'],
+            '/media/images/test/320w.webp 320w, /media/images/test/640w.webp 640w'
+        )
+
+class RangeParsingTests(SimpleTestCase):
+    def test_content_range(self):
+        self.assertEqual(parse_content_range('bytes 0-261119/1000000'), (0, 261119, 1000000))
+        self.assertEqual(parse_content_range('bytes 10-19/*'), (10, 19, None))
+        with self.assertRaises(RangeError):
+            parse_content_range('bytes 20-10/100')
+        with self.assertRaises(RangeError):
+            parse_content_range('items 0-1/2')
+
+    def test_range(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=990-5000', 1000), (990, 999))
+        self.assertIsNone(parse_range(None, 1000))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 1000))
+        with self.assertRaises(RangeError):
+            parse_range('bytes=1000-', 1000)
+
+class GridFSUploadTests(APITestCase):
+    """Resumable uploads and ranged downloads against an in-memory MongoDB."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        mongomock.gridfs.enable_gridfs_integration()
+
+    def setUp(self):
+        patcher = mock.patch.object(gridfs_store, '_client', mongomock.MongoClient())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = get_user_model().objects.create_user(username='uploader', email='up@example.com', password='pass')
+        self.client.force_authenticate(user=self.user)
+
+    def start(self, data, **fields):
+        response = self.client.post(reverse('uploads:upload-session-list'), dict(
+            filename='clip.bin', content_type='application/octet-stream', total_size=len(data), **fields
+        ), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def put(self, session_id, body, content_range):
+        return self.client.generic(
+            'PUT', reverse('uploads:upload-session-chunk', args=[session_id]), body,
+            content_type='application/octet-stream', HTTP_CONTENT_RANGE=content_range,
+        )
+
+    def piece(self, session_id, data, start, end):
+        return self.put(session_id, data[start:end], f'bytes {start}-{end - 1}/{len(data)}')
+
+    def complete(self, session_id):
+        return self.client.post(reverse('uploads:upload-session-complete', args=[session_id]))
+
+    def download(self, file_id, **headers):
+        return self.client.get(reverse('uploads:gridfs-file', args=[file_id]), **headers)
+
+    def test_resumed_upload_reassembles_the_file(self):
+        data = os.urandom(2 * GRIDFS_CHUNK_SIZE + 100)
+        session_id = self.start(data, checksum=hashlib.sha256(data).hexdigest())
+        self.assertEqual(self.piece(session_id, data, 0, GRIDFS_CHUNK_SIZE).status_code, status.HTTP_200_OK)
+
+        # The client reconnects, asks where to resume and retries a piece that already arrived
+        response = self.client.get(reverse('uploads:upload-session-detail', args=[session_id]))
+        self.assertEqual(response['Upload-Offset'], str(GRIDFS_CHUNK_SIZE))
+        self.assertEqual(self.piece(session_id, data, 0, GRIDFS_CHUNK_SIZE).status_code, status.HTTP_200_OK)
+        response = self.piece(session_id, data, 2 * GRIDFS_CHUNK_SIZE, len(data))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        self.assertEqual(self.piece(session_id, data, GRIDFS_CHUNK_SIZE, len(data)).status_code, status.HTTP_200_OK)
+        response = self.complete(session_id)
+        self.assertEqual(response.data['status'], 'complete')
+        response = self.download(response.data['file_id'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), data)
+
+    def test_size_mismatches_are_rejected(self):
+        data = os.urandom(1000)
+        session_id = self.start(data)
+        response = self.put(session_id, data, 'bytes 0-999/2000')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        response = self.put(session_id, data[:500], 'bytes 0-999/1000')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.complete(session_id).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(UploadSession.objects.get(pk=session_id).received_bytes, 0)
+
+    def test_checksum_mismatch_aborts_the_upload(self):
+        data = os.urandom(1000)
+        session_id = self.start(data, checksum=hashlib.sha256(b'something else').hexdigest())
+        self.assertEqual(self.piece(session_id, data, 0, len(data)).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.complete(session_id).status_code, status.HTTP_400_BAD_REQUEST)
+        session = UploadSession.objects.get(pk=session_id)
+        self.assertEqual(session.status, 'aborted')
+        self.assertIsNone(gridfs_store.open_file(gridfs_store.object_id(session.file_id)))
+        self.assertEqual(gridfs_store.database()['fs.chunks'].count_documents({}), 0)
+
+    def test_range_request_returns_partial_content(self):
+        data = os.urandom(5000)
+        session_id = self.start(data)
+        self.piece(session_id, data, 0, len(data))
+        file_id = self.complete(session_id).data['file_id']
+
+        response = self.download(file_id, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/5000')
+        self.assertEqual(b''.join(response.streaming_content), data[10:20])
+
+        response = self.download(file_id, HTTP_RANGE='bytes=-100')
+        self.assertEqual(b''.join(response.streaming_content), data[-100:])
+        response = self.download(file_id, HTTP_RANGE='bytes=6000-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+        etag = self.download(file_id)['ETag']
+        response = self.download(file_id, HTTP_RANGE='bytes=10-19', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,14 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import ImageAssetViewSet, UploadSessionViewSet, GridFSFileView
+
+app_name = 'uploads'
+
+router = DefaultRouter()
+router.register(r'images', ImageAssetViewSet, basename='image')
+router.register(r'sessions', UploadSessionViewSet, basename='upload-session')
+
+urlpatterns = [
+    path('', include(router.urls)),
+    path('files/<str:file_id>/', GridFSFileView.as_view(), name='gridfs-file'),
+]
@@ -0,0 +1,260 @@
+from django.db import transaction
+from django.utils import timezone
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from . import gridfs_store
+from .gridfs_store import GRIDFS_CHUNK_SIZE, MAX_UPLOAD_PIECE, RangeError
+from .models import ImageAsset, UploadSession
+from .serializers import ImageAssetSerializer, ImageUploadSerializer, UploadSessionSerializer
+from .storage import image_storage
+from .tasks import attach_to_target, process_image
+
+class ImageAssetViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                        mixins.ListModelMixin, viewsets.GenericViewSet):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def get_queryset(self):
+        queryset = ImageAsset.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(owner=self.request.user)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return ImageUploadSerializer
+        return ImageAssetSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['storage'] = image_storage()
+        return context
+
+    @swagger_auto_schema(
+        tags=['Media'],
+        operation_description="Upload an image for a business, event, destination, package or blog post. "
+                              "The original is stored straight away and responsive WebP/JPEG variants are "
+                              "rendered in the background; poll the returned asset until its status is ready.",
+        request_body=ImageUploadSerializer,
+        responses={202: ImageAssetSerializer, 400: "Bad Request"}
+    )
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        asset = serializer.save()
+        attach_to_target(asset)
+        transaction.on_commit(lambda: process_image.delay(str(asset.pk)))
+        return Response(ImageAssetSerializer(asset).data, status=status.HTTP_202_ACCEPTED)
+
+    @swagger_auto_schema(
+        tags=['Media'],
+        operation_description="List the images you uploaded",
+        responses={200: ImageAssetSerializer(many=True)}
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        tags=['Media'],
+        operation_description="Retrieve an uploaded image with its processing status and variants",
+        responses={200: ImageAssetSerializer, 404: "Not Found"}
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable uploads into GridFS. Start a session with the file's name and
+    size, PUT pieces with a Content-Range header in order, and complete it.
+    After a dropped connection, GET the session and resume at received_bytes.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(owner=self.request.user)
+
+    @swagger_auto_schema(
+        tags=['Media'],
+        operation_description="Start a resumable upload",
+        request_body=UploadSessionSerializer,
+        responses={201: UploadSessionSerializer, 400: "Bad Request"}
+    )
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        tags=['Media'],
+        operation_description="Get an upload session; received_bytes is the offset to resume from",
+        responses={200: UploadSessionSerializer, 404: "Not Found"}
+    )
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        response['Upload-Offset'] = response.data['received_bytes']
+        return response
+
+    @swagger_auto_schema(
+        tags=['Media'],
+        operation_description="Abort an upload and discard the pieces received so far",
+        responses={204: "No Content"}
+    )
+    def destroy(self, request, *args, **kwargs):
+        session = self.get_object()
+        if session.status == 'complete':
+            return Response({'error': 'Completed uploads cannot be aborted'}, status=status.HTTP_400_BAD_REQUEST)
+        gridfs_store.discard_chunks(gridfs_store.object_id(session.file_id))
+        session.status = 'aborted'
+        session.save(update_fields=['status', 'updated_at'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @swagger_auto_schema(
+        tags=['Media'],
+        operation_description="Upload the next piece of the file as the raw request body. Pieces must start at "
+                              "received_bytes and, except for the last one, be a multiple of chunk_size bytes.",
+        manual_parameters=[
+            openapi.Parameter('Content-Range', openapi.IN_HEADER, type=openapi.TYPE_STRING, required=True,
+                              description="bytes start-end/total"),
+        ],
+        responses={200: UploadSessionSerializer, 409: "Offset does not match", 416: "Bad range"}
+    )
+    @action(detail=True, methods=['put'], url_path='chunk')
+    def chunk(self, request, pk=None):
+        session = self.get_object()
+        if session.status != 'open':
+            return Response({'error': f'Upload is {session.status}'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start, end, total = gridfs_store.parse_content_range(request.META.get('HTTP_CONTENT_RANGE'))
+        except RangeError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        length = end - start + 1
+        if total not in (None, session.total_size) or end >= session.total_size:
+            return Response({'error': 'Content-Range does not match the upload size'},
+                            status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        if end < session.received_bytes:
+            # A retry of a piece that already arrived; nothing to do
+            return Response(self.get_serializer(session).data)
+        if start != session.received_bytes:
+            return Response({'error': 'Piece does not start at the received offset',
+                             'received_bytes': session.received_bytes}, status=status.HTTP_409_CONFLICT)
+        is_last = end + 1 == session.total_size
+        if length > MAX_UPLOAD_PIECE or (not is_last and length % GRIDFS_CHUNK_SIZE):
+            return Response({'error': f'Pieces must be a multiple of {GRIDFS_CHUNK_SIZE} bytes '
+                                      f'and at most {MAX_UPLOAD_PIECE} bytes'},
+                            status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        if int(request.META.get('CONTENT_LENGTH') or 0) != length:
+            return Response({'error': 'Content-Length does not match Content-Range'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        written = gridfs_store.write_piece(gridfs_store.object_id(session.file_id), start, request.stream, length)
+        if written != length:
+            return Response({'error': 'Upload interrupted', 'received_bytes': session.received_bytes},
+                            status=status.HTTP_400_BAD_REQUEST)
+        advanced = UploadSession.objects.filter(
+            pk=session.pk, status='open', received_bytes=start
+        ).update(received_bytes=end + 1, updated_at=timezone.now())
+        session.refresh_from_db()
+        if not advanced:
+            return Response({'error': 'Another piece was accepted first',
+                             'received_bytes': session.received_bytes}, status=status.HTTP_409_CONFLICT)
+        response = Response(self.get_serializer(session).data)
+        response['Upload-Offset'] = session.received_bytes
+        return response
+
+    @swagger_auto_schema(
+        tags=['Media'],
+        operation_description="Finish an upload once every byte has been received; when the session has a "
+                              "checksum, the data is verified first and a mismatch aborts the upload",
+        responses={200: UploadSessionSerializer, 400: "Upload incomplete or checksum mismatch"}
+    )
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        session = self.get_object()
+        if session.status == 'complete':
+            return Response(self.get_serializer(session).data)
+        if session.status != 'open' or session.received_bytes != session.total_size:
+            return Response({'error': 'Upload is not complete', 'received_bytes': session.received_bytes},
+                            status=status.HTTP_400_BAD_REQUEST)
+        file_id = gridfs_store.object_id(session.file_id)
+        if session.checksum and gridfs_store.sha256_hex(file_id) != session.checksum:
+            # The pieces cannot be told apart, so the whole upload has to start again
+            gridfs_store.discard_chunks(file_id)
+            session.status = 'aborted'
+            session.save(update_fields=['status', 'updated_at'])
+            return Response({'error': 'Checksum does not match the uploaded data'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        gridfs_store.finalize_file(
+            file_id, session.filename, session.total_size,
+            session.content_type, metadata={'owner': request.user.pk, 'session': str(session.pk)}
+        )
+        session.status = 'complete'
+        session.save(update_fields=['status', 'updated_at'])
+        return Response(self.get_serializer(session).data)
+
+class GridFSFileView(APIView):
+    """
+    Stream a GridFS file with Range, ETag and conditional request support.
+    Files are immutable once written, so the ETag is derived from the id and
+    length and responses can be cached indefinitely.
+    """
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        tags=['Media'],
+        operation_description="Download a stored file; honours Range, If-Range and If-None-Match",
+        responses={200: "File content", 206: "Partial content", 304: "Not Modified", 416: "Bad range"}
+    )
+    def get(self, request, file_id):
+        oid = gridfs_store.object_id(file_id)
+        grid_out = gridfs_store.open_file(oid) if oid else None
+        if grid_out is None:
+            raise Http404
+        length = grid_out.length
+        etag = quote_etag(f'{file_id}-{length}')
+        headers = {
+            'ETag': etag,
+            'Accept-Ranges': 'bytes',
+            'Cache-Control': 'public, max-age=31536000, immutable',
+            'Last-Modified': http_date(grid_out.upload_date.timestamp()),
+        }
+        if etag in [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+            grid_out.close()
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        range_header = request.META.get('HTTP_RANGE')
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range and if_range.strip() != etag:
+            range_header = None
+        try:
+            byte_range = gridfs_store.parse_range(range_header, length)
+        except RangeError:
+            grid_out.close()
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{length}'
+            return response
+
+        start, end = byte_range or (0, length - 1)
+        response = StreamingHttpResponse(
+            gridfs_store.iter_range(grid_out, start, end) if length else iter(()),
+            status=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+            content_type=grid_out.content_type or 'application/octet-stream',
+        )
+        for name, value in headers.items():
+            response[name] = value
+        response['Content-Length'] = max(end - start + 1, 0)
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{length}'
+        response['Content-Disposition'] = f'inline; filename="{grid_out.filename or file_id}"'
+        return response